@@ -1,26 +1,26 @@
 from util.functions import (
-    get_news_for_ticker, 
+    get_news_for_tickers, 
+    display_news_feed,
     risk_calculator_tab, 
     create_interactive_visualizations, 
     display_option_price_factors, 
+    create_volatility_surface,
+    create_portfolio_view,
+    create_scenario_view,
     #create_risk_matrix,
     show_risk_explanation
 )
-from util.risk_matrix import calculate_impact_score, calculate_probability_score, create_matrix
+from util.risk_matrix import create_matrix, get_universe_scores
+from util.risk_history import DIAS_TRAYECTORIA, get_risk_history
+from util.fundamentals import get_fundamentals_cache
 from util.anthropic_util import display_chat_interface, get_claude_response, initialize_claude
-from util.finviz import INDUSTRIES, get_finviz_dataframe
+from util.finviz import INDUSTRIES, get_finviz_snapshot
 
 import streamlit as st
-import yfinance as yf  # Necesitas instalar esto: pip install yfinance
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import norm
-import plotly.graph_objects as go
 
-
-from datetime import datetime, timedelta
+# Sin descargas ni librerías pesadas al importar: cada pestaña carga sus datos
+# (y plotly / yfinance) solo en la rama que los necesita.
 
 with st.sidebar:
     display_chat_interface()
@@ -166,6 +166,8 @@ with tab1:
                 
          #[El resto del código sigue igual...]
         elif current_section == "Tipos de Instrumentos":
+            import plotly.graph_objects as go
+
             st.subheader("🔧 Tipos de Instrumentos")
             selected_pill = st.pills("", options=["Opciones", "Futuros", "Forwards"], default="Opciones")
             
@@ -314,8 +316,6 @@ with tab1:
 
 # Contenido para la pestaña de Análisis
 with tab2:
-    finviz_data = get_finviz_dataframe(filtros='')
-
     selected_pill = st.pills(
         "Industria",
         options=INDUSTRIES,
@@ -323,6 +323,10 @@ with tab2:
     )
 
     if selected_pill:
+        # Finviz se descarga la primera vez que se elige una industria, no al abrir la app
+        # Una sola versión del screener para la tabla y los scores (un refresco puede terminar entre dos lecturas)
+        snapshot = get_finviz_snapshot('')
+        finviz_data = snapshot[1]
         finviz_data_filtered = finviz_data[0:0]
         tickers_options = finviz_data[finviz_data['Sector'] == selected_pill][['Company']].to_dict(orient="index").keys()
         if selected_pill == 'All':
@@ -344,8 +348,24 @@ with tab2:
         
         # MATRIZ RIESGO ------------------------------------------------------------------------------------------
         try:
+            # Scores precalculados para todo el universo en cada descarga: la selección solo los busca
+            normalizaciones = {"Todo el mercado": 'universe', "Su sector": 'sector'}
+            normalization = normalizaciones[st.radio("Normalizar los scores contra", list(normalizaciones), horizontal=True)]
+            scores = get_universe_scores('', normalization, snapshot).select(finviz_data_filtered.index)
+
+            # Historia de scores de las fotos diarias del screener: solo se puntúan los días nuevos
+            history = get_risk_history(normalization)
+            history.sync()
+            trails = None
+            if len(history.dates) > 1:
+                dias = st.slider("Días de trayectoria", min_value=2, max_value=len(history.dates),
+                                 value=min(DIAS_TRAYECTORIA, len(history.dates)))
+                trails = history.trails(finviz_data_filtered.index, dias)
+            else:
+                st.caption("La trayectoria de los scores aparecerá cuando haya fotos del screener de al menos dos días.")
+
             # Display risk matrix
-            fig = create_matrix(finviz_data_filtered)
+            fig = create_matrix(finviz_data_filtered, scores, trails)
             st.plotly_chart(fig)
             
             # Display risk categories
@@ -353,27 +373,22 @@ with tab2:
             
             risk_df = pd.DataFrame({
                 'Company': finviz_data_filtered['Company'],
-                'Impact Score': calculate_impact_score(finviz_data_filtered),
-                'Probability Score': calculate_probability_score(finviz_data_filtered),
+                'Impact Score': scores.impact,
+                'Probability Score': scores.probability,
                 'Beta': finviz_data_filtered['Beta'],
                 'ROA': finviz_data_filtered['Return on Assets'],
                 'ROE': finviz_data_filtered['Return on Equity'],
                 'ROI': finviz_data_filtered['Return on Investment'],
                 'Performance (Year)': finviz_data_filtered['Performance (Year)'],
+                'Risk Category': scores.category,
             })
-            
-            def categorize_risk(row):
-                if row['Impact Score'] > 0.5 and row['Probability Score'] > 0.5:
-                    return "Alto riesgo"
-                elif row['Impact Score'] > 0.5:
-                    return "Riesgo de impacto"
-                elif row['Probability Score'] > 0.5:
-                    return "Riesgo de evento adverso"
-                else:
-                    return "Bajo riesgo"
-            
-            risk_df['Risk Category'] = risk_df.apply(categorize_risk, axis=1)
-            st.dataframe(risk_df)
+            if trails is not None:
+                changes = trails.category_changes()
+                risk_df['Cambio de categoría'] = (changes['Antes'] + " → " + changes['Ahora']).reindex(risk_df.index).fillna("")
+                if len(changes):
+                    st.warning(f"Cambiaron de categoría desde la foto anterior: {', '.join(changes.index)}")
+            porcentajes = ['ROA', 'ROE', 'ROI', 'Performance (Year)']
+            st.dataframe(risk_df.style.format("{:.2%}", subset=porcentajes, na_rep="-"))
             
         except Exception as e:
             st.error(f"Error al procesar el archivo: {str(e)}")
@@ -398,71 +413,42 @@ with tab2:
 
         create_interactive_visualizations()
 
+        create_volatility_surface()
+
+        create_portfolio_view()
+
+        create_scenario_view()
+
         
       
 #4ta TAB --------------------------------------------------------------------------------------------------------------
 
 # Contenido para la pestaña de Noticias
-# Contenido para la pestaña de Noticias
-
-get_news_for_ticker('')
 
 with tab4:
     st.header("📰 Noticias de Mercado")
     
-    # Selector de ticker para noticias
-    ticker_input = st.text_input("Ingresa el nombre del ticker:", "")
+    # Selector de tickers para noticias (varios separados por comas)
+    ticker_input = st.text_input("Ingresa uno o varios tickers separados por comas (ej. AAPL, MSFT):", "")
+    offline_news = st.checkbox("Usar noticias de ejemplo (sin conexión)", value=False)
+    tickers_news = list(dict.fromkeys(t.strip().upper() for t in ticker_input.split(",") if t.strip()))
     
-    if ticker_input:
-        ticker_input = ticker_input.upper()
-        with st.spinner(f'Cargando noticias para {ticker_input}...'):
-            news_dfs = get_news_for_ticker(ticker_input)
+    if tickers_news:
+        ticker_input = tickers_news[0] if len(tickers_news) == 1 else st.selectbox("Información del mercado de:", tickers_news)
+        with st.spinner(f'Cargando noticias para {", ".join(tickers_news)}...'):
+            news_df = get_news_for_tickers(tickers_news, offline=offline_news)
             
-            if news_dfs:
-                def display_news_column(df_list, idx):
-                    for _, row in df_list[idx].iterrows():
-                        if 'thumbnail' in row and not pd.isna(row['thumbnail']) and row['thumbnail'].get('resolutions'):
-                            # Obtener la primera resolución disponible
-                            img_url = row['thumbnail']['resolutions'][0]['url']
-                            st.image(img_url, use_container_width=True)
-                        else:
-                            # Si no hay imagen, mostrar un placeholder
-                            st.markdown("🖼️ *No hay imagen disponible*")
-                    
-                        # Contenedor de la noticia
-                        st.markdown(f"""
-                        **📑 {row['title']}**
-
-                        **Fuente:** {row['publisher']}  
-                        **Fecha:** {row['providerPublishTime'].strftime('%Y-%m-%d %H:%M')}
-                        
-                        [Leer la noticia completa]({row['link']})
-                        """)
-                        
-                        # Si hay enlaces relacionados
-                        if 'relatedTickers' in row and row['relatedTickers']:
-                            st.markdown("**Tickers relacionados:** " + ", ".join(row['relatedTickers']))
-
-                        st.divider()
-
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    display_news_column(news_dfs, 0)
-
-                with col2:
-                    display_news_column(news_dfs, 1)
-
-                with col3:
-                    display_news_column(news_dfs, 2)
+            if news_df is not None:
+                display_news_feed(news_df)
 
                 
                 # Mostrar información del ticker
 
                 
                 try:
-                    ticker = yf.Ticker(ticker_input)
-                    info = ticker.info
+                    # Fichas de todos los tickers pedidos en paralelo: cambiar de ticker ya no descarga nada
+                    fundamentals = get_fundamentals_cache(offline_news)
+                    info = fundamentals.prefetch(tickers_news)[ticker_input]
                     
                     st.markdown("---")
                     st.subheader("📊 Información del Mercado")
@@ -500,13 +486,18 @@ with tab4:
                         **Descripción del negocio:**  
                         {info.get('longBusinessSummary', 'No hay descripción disponible.')}
                         """)
+
+                    stats = fundamentals.stats()
+                    st.caption(f"Caché de fundamentales: {stats['hits']} aciertos en memoria, "
+                               f"{stats['disk_hits']} en disco, {stats['misses']} descargas "
+                               f"({stats['hit_rate']:.0%} de acierto)")
                         
                 except Exception as e:
                     st.info("Ticker no encontrado: verifica el nombre del ticker escrito")
             else:
-                st.warning(f"No se encontraron noticias recientes para {ticker_input}")
+                st.warning(f"No se encontraron noticias recientes para {', '.join(tickers_news)}")
     else:
-        st.info("👆 Ingresa un símbolo de ticker para ver sus noticias relacionadas")
+        st.info("👆 Ingresa uno o varios símbolos de ticker para ver sus noticias relacionadas")
         
     # Disclaimer
     st.markdown("""
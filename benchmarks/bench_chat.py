@@ -0,0 +1,55 @@
+"""
+Chat con Claude: respuesta completa (messages.create) frente a streaming
+(messages.stream). Mide el tiempo hasta ver el primer texto y hasta el
+final, y el coste de crear un cliente por pregunta frente a reutilizarlo.
+Corre contra el transporte de benchmarks/claude_stub.py, sin red.
+
+    python -m benchmarks.bench_chat --latency 0.5 --token-latency 0.02
+"""
+import argparse
+import time
+
+from benchmarks.claude_stub import claude_stub_transport
+from util.anthropic_util import get_claude_response, initialize_claude, stream_claude_response
+
+PREGUNTA = "¿Qué es una opción call?"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="segundos hasta el primer token")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="segundos entre tokens")
+    parser.add_argument("--clients", type=int, default=20, help="clientes a crear para medir la inicialización")
+    args = parser.parse_args()
+
+    transport = claude_stub_transport(latency=args.latency, token_latency=args.token_latency)
+    client = initialize_claude(api_key="stub", transport=transport)
+
+    start = time.perf_counter()
+    respuesta = get_claude_response(client, PREGUNTA)
+    completa = time.perf_counter() - start
+
+    start = time.perf_counter()
+    primero = None
+    chunks = []
+    for chunk in stream_claude_response(client, PREGUNTA):
+        if primero is None:
+            primero = time.perf_counter() - start
+        chunks.append(chunk)
+    streaming = time.perf_counter() - start
+    assert "".join(chunks) == respuesta, "el streaming no reconstruye la misma respuesta"
+
+    start = time.perf_counter()
+    for _ in range(args.clients):
+        initialize_claude(api_key="stub")  # transporte real: contexto SSL y pool nuevos, sin hacer peticiones
+    por_cliente = (time.perf_counter() - start) / args.clients
+
+    print(f"latencia {args.latency:.2f}s al primer token, {args.token_latency * 1000:.0f} ms por token, "
+          f"{len(chunks)} fragmentos")
+    print(f"  {'completa':<10} primer texto {completa * 1000:8.1f} ms   final {completa * 1000:8.1f} ms")
+    print(f"  {'streaming':<10} primer texto {primero * 1000:8.1f} ms   final {streaming * 1000:8.1f} ms")
+    print(f"  crear un cliente: {por_cliente * 1000:.1f} ms, más conexión y handshake TLS en su primera petición")
+
+
+if __name__ == "__main__":
+    main()
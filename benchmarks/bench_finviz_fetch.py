@@ -0,0 +1,44 @@
+"""
+Compara la descarga (y parseo) secuencial de las cinco vistas de Finviz con la paralela.
+
+Corre contra el servidor local de benchmarks/finviz_stub.py, sin red:
+    python -m benchmarks.bench_finviz_fetch --latency 0.3 --rows 2000
+"""
+import argparse
+import time
+
+from benchmarks.finviz_stub import finviz_stub_server
+from util.finviz import VISTAS, descargar_contenido, descargar_vistas, get_session, parsear_vista
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="latencia por petición (s)")
+    parser.add_argument("--rows", type=int, default=2000, help="tickers por vista")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with finviz_stub_server(args.latency, args.rows) as endpoint:
+        session = get_session()
+
+        # Calentar el pool de conexiones
+        descargar_vistas("", session=session, endpoint=endpoint, api_key="stub")
+
+        secuencial, paralelo = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for vista in VISTAS:
+                parsear_vista(vista, descargar_contenido(vista, "", session, endpoint=endpoint, api_key="stub"))
+            secuencial.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            descargar_vistas("", session=session, endpoint=endpoint, api_key="stub")
+            paralelo.append(time.perf_counter() - start)
+
+    print(f"latencia por vista: {args.latency:.3f}s, {len(VISTAS)} vistas, {args.rows} filas")
+    print(f"secuencial: {min(secuencial):.3f}s")
+    print(f"paralelo:   {min(paralelo):.3f}s ({min(secuencial) / min(paralelo):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
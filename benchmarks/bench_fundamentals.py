@@ -0,0 +1,51 @@
+"""
+Fichas de varios tickers con util.fundamentals: descarga secuencial frente a
+concurrente, caché en memoria y, tras un "reinicio", el nivel en SQLite. Usa
+las fichas grabadas (RecordedInfo) con una latencia simulada, sin red.
+
+    python -m benchmarks.bench_fundamentals --latency 0.5
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from util.fundamentals import FUNDAMENTALS_FIXTURE, FundamentalsCache, RecordedInfo
+
+
+def medir(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="latencia por petición (s)")
+    parser.add_argument("--fixture", default=FUNDAMENTALS_FIXTURE)
+    args = parser.parse_args()
+
+    with open(args.fixture) as f:
+        data = json.load(f)
+    tickers = list(data["info"])
+    print(f"{len(tickers)} tickers, latencia {args.latency:.2f}s por petición")
+
+    # Como antes: una llamada a .info por ticker, una detrás de otra
+    fetcher = RecordedInfo(data, args.latency)
+    print(f"  {'sin caché':<22} {medir(lambda: [fetcher(t) for t in tickers]) * 1000:8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "fundamentals.sqlite")
+        cache = FundamentalsCache(RecordedInfo(data, args.latency), db_path=db_path)
+        print(f"  {'prefetch concurrente':<22} {medir(lambda: cache.prefetch(tickers)) * 1000:8.1f} ms")
+        print(f"  {'memoria':<22} {medir(lambda: [cache.get(t) for t in tickers]) * 1000:8.1f} ms")
+
+        # Proceso nuevo: memoria vacía, las fichas siguen en disco
+        reiniciada = FundamentalsCache(RecordedInfo(data, args.latency), db_path=db_path)
+        print(f"  {'disco tras reiniciar':<22} {medir(lambda: reiniciada.prefetch(tickers)) * 1000:8.1f} ms")
+        print(f"  stats: {cache.stats()}  |  tras reiniciar: {reiniciada.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Resuelve 100k cotizaciones sintéticas con util.implied_vol y muestra el
+tiempo y el diagnóstico de convergencia.
+
+    python -m benchmarks.bench_implied_vol --n 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from util.greeks import bs_greeks
+from util.implied_vol import implied_volatility
+from util.pricing import black_scholes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000, help="número de cotizaciones")
+    parser.add_argument("--max-iter", type=int, default=50, help="iteraciones de Newton antes de pasar a Brent")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    S = 100.0
+    K = rng.uniform(50, 150, args.n)
+    T = rng.uniform(7 / 365, 2, args.n)
+    r = 0.03
+    sigma = rng.uniform(0.05, 1.2, args.n)
+    call = rng.random(args.n) < 0.5
+    price = black_scholes(S, K, T, r, sigma, call)
+
+    start = time.perf_counter()
+    result = implied_volatility(price, S, K, T, r, call, max_iter=args.max_iter)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.n:,} cotizaciones en {elapsed * 1000:.1f} ms ({args.n / elapsed:,.0f} cotizaciones/s)")
+    for clave, valor in result.summary().items():
+        print(f"  {clave}: {valor}")
+
+    # Error en sigma donde el precio es sensible a la volatilidad (vega > 1e-4)
+    vega = bs_greeks(S, K, T, r, sigma, call)['vega']
+    bien_condicionados = result.converged & (vega > 1e-4)
+    print(f"  error max en sigma (vega > 1e-4): {np.max(np.abs(result.sigma - sigma)[bien_condicionados]):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Mide nodos/s de util.lattice entre 1.000 y 5.000 pasos, para un contrato y
+para un lote, y el error de la put americana frente a una referencia.
+
+    python -m benchmarks.bench_lattice --batch 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from util.lattice import METHODS, lattice_price
+
+# Put americana S=K=100, T=1, r=5%, sigma=20% (binomial y trinomial de 20.000 pasos coinciden)
+REFERENCIA_PUT = 6.090372
+
+
+def _nodos(steps, method):
+    """Nodos visitados por un árbol sin extrapolar"""
+    return (steps + 1) ** 2 if method == 'trinomial' else (steps + 1) * (steps + 2) // 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, nargs="*", default=[1000, 2000, 3000, 4000, 5000])
+    parser.add_argument("--batch", type=int, default=64, help="contratos por lote")
+    args = parser.parse_args()
+
+    strikes = np.linspace(80, 120, args.batch)
+    lattice_price(100.0, 100.0, 1.0, 0.05, 0.2, 'put', steps=10)  # calentamiento
+    for method in METHODS:
+        print(f"{method}")
+        for steps in args.steps:
+            # Richardson añade un árbol de steps/2
+            nodos = _nodos(steps, method) + _nodos(steps // 2, method)
+
+            start = time.perf_counter()
+            price = lattice_price(100.0, 100.0, 1.0, 0.05, 0.2, 'put', steps=steps, method=method)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            lattice_price(100.0, strikes, 1.0, 0.05, 0.2, 'put', steps=steps, method=method)
+            batch = time.perf_counter() - start
+
+            print(f"  {steps:>5} pasos: 1 contrato {single * 1000:7.1f} ms ({nodos / single:>13,.0f} nodos/s)   "
+                  f"lote de {args.batch} {batch * 1000:8.1f} ms ({nodos * args.batch / batch:>13,.0f} nodos/s)   "
+                  f"error {abs(price - REFERENCIA_PUT):.1e}")
+
+
+if __name__ == "__main__":
+    main()
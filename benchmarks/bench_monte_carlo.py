@@ -0,0 +1,42 @@
+"""
+Mide trayectorias/s de util.monte_carlo según el número de procesos y
+comprueba que el precio no cambia con el reparto entre procesos.
+
+    python -m benchmarks.bench_monte_carlo --paths 400000 --payoff asian
+"""
+import argparse
+import os
+
+from util.monte_carlo import PAYOFFS, price_monte_carlo
+from util.pricing import black_scholes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=400_000, help="número de trayectorias")
+    parser.add_argument("--steps", type=int, default=252, help="fechas de observación por trayectoria")
+    parser.add_argument("--payoff", choices=PAYOFFS, default="asian")
+    parser.add_argument("--workers", type=int, nargs="*", help="procesos a probar (por defecto 1, 2, 4... hasta los núcleos)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, *(2**i for i in range(1, cores.bit_length()) if 2**i <= cores), cores})
+    S, K, T, r, sigma = 100.0, 100.0, 1.0, 0.03, 0.25
+    print(f"{args.paths:,} trayectorias x {args.steps} pasos, payoff {args.payoff}, {cores} núcleos")
+    if args.payoff == "european":
+        print(f"  Black-Scholes: {black_scholes(S, K, T, r, sigma, 'call'):.6f}")
+
+    base = None
+    for n in workers:
+        result = price_monte_carlo(S, K, T, r, sigma, "call", args.payoff, n_paths=args.paths, n_steps=args.steps,
+                                   barrier=130.0, n_workers=n, seed=args.seed)
+        base = base if base is not None else result.price
+        print(f"  {n:>2} procesos: {result.n_paths / result.elapsed:>12,.0f} trayectorias/s  "
+              f"precio {result.price:.6f} ± {result.std_error:.6f}  "
+              f"(sin control ± {result.std_error_plain:.6f})  "
+              f"{'igual' if result.price == base else 'DISTINTO'}")
+
+
+if __name__ == "__main__":
+    main()
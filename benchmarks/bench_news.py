@@ -0,0 +1,45 @@
+"""
+Noticias de varios tickers con util.news: secuencial frente a concurrente y
+con la caché caliente. Usa las respuestas grabadas (RecordedNews) con una
+latencia simulada por petición, sin red.
+
+    python -m benchmarks.bench_news --latency 0.3
+"""
+import argparse
+import json
+import time
+
+from util.news import NEWS_FIXTURE, NewsService, RecordedNews
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="latencia por petición (s)")
+    parser.add_argument("--fixture", default=NEWS_FIXTURE)
+    args = parser.parse_args()
+
+    with open(args.fixture) as f:
+        data = json.load(f)
+    tickers = list(data["news"])
+
+    resultados = []
+    for nombre, workers in (("secuencial", 1), ("concurrente", len(tickers))):
+        fetcher = RecordedNews(data, args.latency)
+        service = NewsService(fetcher, max_workers=workers)
+        start = time.perf_counter()
+        news_df = service.get_news(tickers)
+        frio = time.perf_counter() - start
+        start = time.perf_counter()
+        service.get_news(tickers)
+        caliente = time.perf_counter() - start
+        resultados.append((nombre, frio, caliente, fetcher.calls, len(news_df)))
+
+    total = sum(len(v) for v in data["news"].values())
+    print(f"{len(tickers)} tickers, {total} noticias grabadas, latencia {args.latency:.2f}s por petición")
+    for nombre, frio, caliente, calls, unicas in resultados:
+        print(f"  {nombre:<12} {frio * 1000:8.1f} ms   con caché {caliente * 1000:6.1f} ms   "
+              f"{calls} peticiones, {unicas} noticias sin repetir")
+
+
+if __name__ == "__main__":
+    main()
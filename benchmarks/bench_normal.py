@@ -0,0 +1,58 @@
+"""
+Microbenchmark y precisión de util.normal frente a scipy.stats.norm.
+
+    python -m benchmarks.bench_normal
+"""
+import math
+import timeit
+
+import numpy as np
+from scipy.stats import norm
+
+from util.normal import norm_cdf, norm_pdf
+from util.pricing import black_scholes
+
+
+def _tiempo(stmt, number):
+    """Mejor de 5 repeticiones, en microsegundos por llamada"""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def precision():
+    x = np.linspace(-37, 37, 200001)
+    ref_cdf, ref_pdf = norm.cdf(x), norm.pdf(x)
+    tiny = np.finfo(float).tiny
+
+    escalar_cdf = np.array([norm_cdf(float(v)) for v in x])
+    escalar_pdf = np.array([norm_pdf(float(v)) for v in x])
+    print("Precisión en [-37, 37] (frente a scipy.stats.norm)")
+    print(f"  arrays   cdf: max abs {np.max(np.abs(norm_cdf(x) - ref_cdf)):.1e}"
+          f"   pdf: max abs {np.max(np.abs(norm_pdf(x) - ref_pdf)):.1e}")
+    print(f"  escalar  cdf: max abs {np.max(np.abs(escalar_cdf - ref_cdf)):.1e}, "
+          f"max rel {np.max(np.abs(escalar_cdf - ref_cdf) / np.maximum(ref_cdf, tiny)):.1e}"
+          f"   pdf: max rel {np.max(np.abs(escalar_pdf - ref_pdf) / np.maximum(ref_pdf, tiny)):.1e}")
+
+
+def velocidad():
+    print("\nTiempo por llamada (µs)            scipy.stats   util.normal   speedup")
+    casos = [("escalar float", 0.3, 20000), ("array 0-d", np.asarray(0.3), 20000)]
+    casos += [(f"array {n:>9,}", np.random.default_rng(0).standard_normal(n), max(1, 200000 // n)) for n in (10, 1000, 1000000)]
+    for nombre, x, number in casos:
+        for etiqueta, ref, nuevo in (("cdf", norm.cdf, norm_cdf), ("pdf", norm.pdf, norm_pdf)):
+            t_ref = _tiempo(lambda: ref(x), number)
+            t_new = _tiempo(lambda: nuevo(x), number)
+            print(f"  {etiqueta} {nombre:<28} {t_ref:11.2f}   {t_new:11.2f}   {t_ref / t_new:6.1f}x")
+
+    def bs_scipy(S, K, T, r, sigma):
+        d1 = (math.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * math.sqrt(T))
+        d2 = d1 - sigma * math.sqrt(T)
+        return S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
+
+    t_ref = _tiempo(lambda: bs_scipy(100.0, 100.0, 0.25, 0.02, 0.2), 5000)
+    t_new = _tiempo(lambda: black_scholes(100.0, 100.0, 0.25, 0.02, 0.2), 5000)
+    print(f"\n  black_scholes escalar: scipy.stats {t_ref:.1f} µs, util.normal {t_new:.1f} µs ({t_ref / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    precision()
+    velocidad()
@@ -0,0 +1,66 @@
+"""
+Historia de scores de riesgo sobre fotos diarias sintéticas del screener:
+puntuación inicial, carga, sincronización incremental al llegar un día
+nuevo y trayectoria de un año para 500 tickers. Trabaja en un directorio
+temporal.
+
+    python -m benchmarks.bench_risk_history --rows 10000 --days 252 --tickers 500
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.finviz_stub import generar_csv
+from util.finviz import VISTAS, construir_dataframe, parsear_vista
+from util.risk_history import RiskHistory, update_risk_history
+from util.snapshot_store import write_snapshot
+
+
+def _medir(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000, help="tickers del universo")
+    parser.add_argument("--days", type=int, default=252, help="fotos diarias")
+    parser.add_argument("--tickers", type=int, default=500, help="tickers de la trayectoria")
+    args = parser.parse_args()
+
+    df = construir_dataframe({vista: parsear_vista(vista, generar_csv(vista, args.rows)) for vista in VISTAS})
+    fechas = pd.bdate_range(end="2026-10-16", periods=args.days)
+    rng = np.random.default_rng(0)
+
+    def foto(fecha, root):
+        dia = df.copy()
+        dia['Short Float'] *= rng.uniform(0.8, 1.2, len(dia))
+        write_snapshot(dia, fecha, root)
+
+    with tempfile.TemporaryDirectory() as snapshots, tempfile.TemporaryDirectory() as root:
+        for fecha in fechas[:-1]:
+            foto(fecha, snapshots)
+        history = RiskHistory('universe', snapshots, root)
+
+        nuevas, ms = _medir(lambda: update_risk_history('universe', snapshots, root))
+        print(f"{args.rows:,} tickers, {args.days} días")
+        print(f"  puntuar {len(nuevas)} fotos (una vez):     {ms:9.1f} ms")
+        cargados, ms = _medir(history.sync)
+        print(f"  cargar {cargados} días en memoria:         {ms:9.1f} ms")
+        _, ms = _medir(history.sync)
+        print(f"  sync sin fotos nuevas:            {ms:9.1f} ms")
+        foto(fechas[-1], snapshots)
+        cargados, ms = _medir(history.sync)
+        print(f"  sync con {cargados} foto nueva:            {ms:9.1f} ms")
+        trails, ms = _medir(lambda: history.trails(df.index[:args.tickers], args.days))
+        print(f"  trayectoria {trails.impact.shape[0]} días x {args.tickers} tickers: {ms:9.1f} ms")
+        changes, ms = _medir(trails.category_changes)
+        print(f"  cambios de categoría ({len(changes)}):      {ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
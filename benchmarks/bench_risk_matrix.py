@@ -0,0 +1,62 @@
+"""
+Scores de la matriz de riesgo sobre un universo sintético del tamaño de
+Finviz: util.risk_matrix.score_risk frente al cálculo anterior (min/max por
+columna con pandas, dos veces, y categoría con DataFrame.apply por fila).
+
+    python -m benchmarks.bench_risk_matrix --rows 10000
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from benchmarks.finviz_stub import generar_csv
+from util.finviz import VISTAS, construir_dataframe, parsear_vista
+from util.risk_matrix import score_risk
+
+
+def _norm(s):
+    return (s - s.min()) / (s.max() - s.min())
+
+
+def scores_pandas(df):
+    """El cálculo anterior de app.py, como referencia"""
+    impact = 0.4 * _norm(df['Volatility (Month)']) + 0.4 * _norm(df['Total Debt/Equity']) + 0.2 * _norm(df['Market Cap'])
+    probability = (0.4 * _norm(df['Relative Strength Index (14)']) + 0.3 * _norm(df['Average Volume'] / df['Volume'])
+                   + 0.3 * _norm(df['Short Float']))
+    risk_df = df[[]].assign(**{'Impact Score': impact, 'Probability Score': probability})
+
+    def categorize_risk(row):
+        if row['Impact Score'] > 0.5 and row['Probability Score'] > 0.5:
+            return "Alto riesgo"
+        elif row['Impact Score'] > 0.5:
+            return "Riesgo de impacto"
+        elif row['Probability Score'] > 0.5:
+            return "Riesgo de evento adverso"
+        return "Bajo riesgo"
+
+    risk_df['Risk Category'] = risk_df.apply(categorize_risk, axis=1)
+    return risk_df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000, help="tickers del universo")
+    args = parser.parse_args()
+
+    df = construir_dataframe({vista: parsear_vista(vista, generar_csv(vista, args.rows)) for vista in VISTAS})
+    referencia = scores_pandas(df)
+    scores = score_risk(df)
+    iguales = (np.allclose(scores.impact, referencia['Impact Score'])
+               and np.allclose(scores.probability, referencia['Probability Score'])
+               and (scores.category == referencia['Risk Category'].to_numpy()).all())
+
+    antes = min(timeit.repeat(lambda: scores_pandas(df), number=1, repeat=3))
+    ahora = min(timeit.repeat(lambda: score_risk(df), number=10, repeat=5)) / 10
+    print(f"{len(df):,} tickers")
+    print(f"  pandas + apply: {antes * 1000:8.1f} ms")
+    print(f"  score_risk:     {ahora * 1000:8.1f} ms ({antes / ahora:,.0f}x)  {'iguales' if iguales else 'DISTINTOS'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Simulador de escenarios: rejilla spot x vol x tasa sobre una cartera
+sintética, con 1, 2, 4... procesos leyendo de memoria compartida.
+
+    python -m benchmarks.bench_scenarios --positions 1000 --spot 41 --vol 31 --rate 7
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.generate_portfolio import generar_cartera
+from util.portfolio import Portfolio
+from util.scenarios import run_scenarios, scenario_grid
+
+AS_OF = "2026-10-16"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--positions", type=int, default=1_000)
+    parser.add_argument("--spot", type=int, default=41, help="puntos de spot entre -30%% y +30%%")
+    parser.add_argument("--vol", type=int, default=31, help="puntos de volatilidad entre -10 y +20 pts")
+    parser.add_argument("--rate", type=int, default=7, help="puntos de tasa entre -2 y +2 pts")
+    parser.add_argument("--workers", type=int, nargs="*", help="procesos a probar (por defecto 1, 2, 4... hasta los núcleos)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, *(2**i for i in range(1, cores.bit_length()) if 2**i <= cores), cores})
+
+    arrays = Portfolio(generar_cartera(args.positions, AS_OF), AS_OF, 0.03).arrays()
+    scenarios = scenario_grid(np.linspace(-0.3, 0.3, args.spot), np.linspace(-0.1, 0.2, args.vol),
+                              np.linspace(-0.02, 0.02, args.rate))
+    print(f"{len(scenarios):,} escenarios x {args.positions:,} posiciones, {cores} núcleos")
+
+    base = None
+    for n in workers:
+        start = time.perf_counter()
+        pnl = run_scenarios(arrays, scenarios, n_workers=n)
+        elapsed = time.perf_counter() - start
+        base = pnl if base is None else base
+        print(f"  {n:>2} procesos: {elapsed * 1000:8.1f} ms ({len(scenarios) * args.positions / elapsed:,.0f} revaluaciones/s)  "
+              f"peor P&L {pnl.min():>14,.0f}  {'igual' if np.array_equal(pnl, base) else 'DISTINTO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Carga del screener desde util.snapshot_store frente a parsear los CSV de
+las cinco vistas, primera lectura en frío de ScreenerCache con y sin foto en
+disco, y lectura de la historia de un factor entre fotos diarias. Escribe las
+fotos en un directorio temporal.
+
+    python -m benchmarks.bench_snapshot_store --rows 10000 --days 60 --download 3
+"""
+import argparse
+import os
+import tempfile
+import time
+import timeit
+
+import pandas as pd
+
+from benchmarks.finviz_stub import generar_csv
+from util.finviz import VISTAS, construir_dataframe, parsear_vista, seed_from_snapshot
+from util.screener_cache import ScreenerCache
+from util.snapshot_store import factor_history, read_snapshot, snapshot_path, write_snapshot
+
+
+def _ms(stmt, number=5):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000, help="tickers del universo")
+    parser.add_argument("--days", type=int, default=60, help="fotos diarias a escribir")
+    parser.add_argument("--download", type=float, default=3.0, help="segundos de la descarga simulada de Finviz")
+    args = parser.parse_args()
+
+    contenidos = {vista: generar_csv(vista, args.rows) for vista in VISTAS}
+    df = construir_dataframe({vista: parsear_vista(vista, contenido) for vista, contenido in contenidos.items()})
+    fechas = pd.bdate_range(end="2026-10-16", periods=args.days)
+
+    with tempfile.TemporaryDirectory() as root:
+        for fecha in fechas:
+            write_snapshot(df, fecha, root)
+        csv_bytes = sum(len(c) for c in contenidos.values())
+        arrow_bytes = os.path.getsize(snapshot_path(fechas[-1], root))
+        memoria = df.memory_usage(deep=True).sum(), read_snapshot(root=root).memory_usage(deep=True).sum()
+
+        print(f"{len(df):,} tickers, {args.days} fotos")
+        print(f"  en disco: CSV {csv_bytes / 1e6:.1f} MB   Arrow {arrow_bytes / 1e6:.1f} MB")
+        print(f"  en memoria: {memoria[0] / 1e6:.1f} MB -> {memoria[1] / 1e6:.1f} MB con tipos compactos")
+        print(f"  parsear los 5 CSV:                 {_ms(lambda: construir_dataframe({v: parsear_vista(v, c) for v, c in contenidos.items()})):8.1f} ms")
+        print(f"  última foto completa:              {_ms(lambda: read_snapshot(root=root)):8.1f} ms")
+        print(f"  última foto, 2 columnas:           {_ms(lambda: read_snapshot(columns=['Beta', 'Short Float'], root=root)):8.1f} ms")
+
+        def descargar(filtros):
+            time.sleep(args.download)
+            return df
+
+        for nombre, sembrar in (("sin foto", False), ("con foto", True)):
+            cache = ScreenerCache(descargar)
+            start = time.perf_counter()
+            if sembrar:
+                seed_from_snapshot(cache, root)
+            cache.get('')
+            print(f"  arranque en frío, {nombre}:          {(time.perf_counter() - start) * 1000:8.1f} ms"
+                  f"   (descarga simulada de {args.download:.0f} s)")
+        print(f"  Short Float, {args.days} días x todos:      {_ms(lambda: factor_history('Short Float', root=root), 1):8.1f} ms")
+        print(f"  Short Float, {args.days} días x 5 tickers:  "
+              f"{_ms(lambda: factor_history('Short Float', tickers=list(df.index[:5]), root=root), 1):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark de arranque en frío de los módulos de la app.
+
+Mide con `python -X importtime` cuánto cuesta importar util.* por encima de
+lo que la app carga siempre (streamlit, pandas, numpy) y comprueba que al
+importar:
+  - no se abre ninguna conexión de red,
+  - no se cargan librerías pesadas que solo usan algunas pestañas.
+
+Sale con código 1 si se supera el presupuesto:
+    python -m benchmarks.bench_startup --budget-ms 250
+"""
+import argparse
+import subprocess
+import sys
+
+BASE = ["streamlit", "pandas", "numpy"]
+MODULOS = ["util.functions", "util.finviz", "util.risk_matrix", "util.anthropic_util"]
+
+# Librerías que solo deben cargarse cuando se pinta lo que las usa
+PROHIBIDAS = ["matplotlib", "seaborn", "plotly.express", "plotly.graph_objects", "scipy.stats", "yfinance", "anthropic"]
+
+# Cualquier intento de conexión durante el import hace fallar el proceso hijo
+SIN_RED = """
+import socket
+def _bloquear(*args, **kwargs):
+    raise RuntimeError("conexión de red durante el import")
+socket.socket.connect = _bloquear
+socket.create_connection = _bloquear
+"""
+
+
+def _python(codigo, *flags):
+    return subprocess.run([sys.executable, *flags, "-c", codigo], capture_output=True, text=True)
+
+
+def medir_imports():
+    """Devuelve {módulo: µs acumulados} de los imports de primer nivel"""
+    codigo = "\n".join(f"import {m}" for m in BASE + MODULOS)
+    resultado = _python(codigo, "-X", "importtime")
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr)
+    tiempos = {}
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if nombre.strip() in BASE + MODULOS:
+            try:
+                tiempos[nombre.strip()] = int(acumulado)
+            except ValueError:
+                pass
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="presupuesto para importar util.* con streamlit/pandas/numpy ya cargados")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ok = True
+
+    muestras = [medir_imports() for _ in range(args.repeat)]
+    base_ms = min(sum(m.get(mod, 0) for mod in BASE) for m in muestras) / 1000
+    util_ms = min(sum(m.get(mod, 0) for mod in MODULOS) for m in muestras) / 1000
+    print(f"{'+'.join(BASE)}: {base_ms:8.1f} ms")
+    print(f"util.* (incremental): {util_ms:8.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    if util_ms > args.budget_ms:
+        ok = False
+        print("  -> FUERA DE PRESUPUESTO")
+
+    # Solo cuentan las que carga util.*, no las que ya trae streamlit
+    codigo = (
+        "import sys\n" + "\n".join(f"import {m}" for m in BASE)
+        + "\nantes = set(sys.modules)\n" + "\n".join(f"import {m}" for m in MODULOS)
+        + f"\nprint(','.join(m for m in {PROHIBIDAS!r} if m in sys.modules and m not in antes))"
+    )
+    cargadas = _python(codigo).stdout.strip()
+    print(f"librerías pesadas cargadas al importar: {cargadas or 'ninguna'}")
+    ok = ok and not cargadas
+
+    red = _python(SIN_RED + "\n".join(f"import {m}" for m in MODULOS))
+    print(f"import sin red: {'ok' if red.returncode == 0 else 'FALLA'}")
+    if red.returncode != 0:
+        ok = False
+        print(red.stderr.strip().splitlines()[-1])
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
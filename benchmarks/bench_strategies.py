@@ -0,0 +1,46 @@
+"""
+Tiempo de util.strategies para una estrategia de 10 patas sobre 10k precios:
+payoff al vencimiento, P&L antes del vencimiento y análisis (equilibrios y extremos).
+
+    python -m benchmarks.bench_strategies --legs 10 --points 10000
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from util.strategies import Leg, LegMatrix, analyze_strategy, expiry_pnl, price_legs, strategy_pnl
+
+
+def _ms(fn, number=20):
+    """Mejor de 5 repeticiones, en milisegundos por llamada"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legs", type=int, default=10)
+    parser.add_argument("--points", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    legs = price_legs([
+        Leg(rng.choice(['call', 'put']), rng.choice(['long', 'short']), float(rng.uniform(80, 120)),
+            float(rng.integers(1, 4)), 0.25)
+        for _ in range(args.legs)
+    ], 100.0, 0.02, 0.25)
+    matrix = LegMatrix.from_legs(legs)
+    prices = np.linspace(50, 150, args.points)
+
+    print(f"{args.legs} patas x {args.points:,} precios")
+    print(f"  payoff al vencimiento: {_ms(lambda: expiry_pnl(matrix, prices, 0.02, 0.25)):.2f} ms")
+    print(f"  P&L a 30 días:         {_ms(lambda: strategy_pnl(matrix, prices, 30 / 365, 0.02, 0.25)):.2f} ms")
+    print(f"  análisis:              {_ms(lambda: analyze_strategy(matrix, 0.02, 0.25)):.3f} ms")
+
+    calendar = LegMatrix.from_legs([Leg(leg.option_type, leg.side, leg.strike, leg.quantity, 0.25 * (1 + i % 2), leg.premium)
+                                    for i, leg in enumerate(legs)])
+    print(f"  análisis con dos vencimientos (numérico): {_ms(lambda: analyze_strategy(calendar, 0.02, 0.25), 5):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
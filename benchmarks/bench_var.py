@@ -0,0 +1,55 @@
+"""
+VaR Monte Carlo con revaluación completa: 10k escenarios x 1k posiciones,
+con 1, 2, 4... procesos. También mide el paramétrico y el histórico.
+
+    python -m benchmarks.bench_var --scenarios 10000 --positions 1000
+"""
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.generate_portfolio import generar_cartera, generar_historico
+from util.portfolio import Portfolio
+from util.var import historical_var, log_returns, monte_carlo_var, parametric_var
+
+AS_OF = "2026-10-16"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--positions", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, nargs="*", help="procesos a probar (por defecto 1, 2, 4... hasta los núcleos)")
+    parser.add_argument("--horizon", type=int, default=1, help="días hábiles")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, *(2**i for i in range(1, cores.bit_length()) if 2**i <= cores), cores})
+
+    portfolio = Portfolio(generar_cartera(args.positions, AS_OF), AS_OF, 0.03)
+    arrays = portfolio.arrays()
+    prices = generar_historico(AS_OF)[list(arrays.underlyings)]
+    cov = np.cov(log_returns(prices), rowvar=False)
+    print(f"{args.scenarios:,} escenarios x {args.positions:,} posiciones ({len(arrays.underlyings)} subyacentes), {cores} núcleos")
+
+    by_underlying = portfolio.by_underlying().reindex(list(arrays.underlyings))
+    result = parametric_var(by_underlying['dollar_delta'], by_underlying['dollar_gamma'], cov, 0.99, args.horizon,
+                            by_underlying['dollar_theta'])
+    print(f"  paramétrico delta-gamma:    VaR99 {result.var:>12,.0f}  ES {result.es:>12,.0f}  {result.elapsed * 1000:8.1f} ms")
+
+    result = historical_var(arrays, log_returns(prices, args.horizon), 0.99, args.horizon)
+    print(f"  histórico ({result.n_scenarios} fechas):    VaR99 {result.var:>12,.0f}  ES {result.es:>12,.0f}  {result.elapsed * 1000:8.1f} ms")
+
+    base = None
+    for n in workers:
+        result = monte_carlo_var(arrays, cov, 0.99, args.horizon, args.scenarios, n_workers=n, seed=0)
+        base = base if base is not None else result.var
+        revaluaciones = result.n_scenarios * args.positions / result.elapsed
+        print(f"  Monte Carlo, {n:>2} procesos:   VaR99 {result.var:>12,.0f}  ES {result.es:>12,.0f}  "
+              f"{result.elapsed * 1000:8.1f} ms ({revaluaciones:,.0f} revaluaciones/s)  "
+              f"{'igual' if result.var == base else 'DISTINTO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Transporte httpx que imita la API de mensajes de Anthropic, sin red.
+
+Responde a POST /v1/messages con una respuesta fija, completa (JSON) o en
+streaming (eventos SSE), con una latencia hasta el primer token y otra por
+token configurables.
+
+Uso:
+    client = initialize_claude(api_key='stub', transport=claude_stub_transport(latency=0.5))
+    st.write_stream(stream_claude_response(client, "¿Qué es una opción call?"))
+"""
+import json
+import time
+
+RESPUESTA = (
+    "Una opción call da el derecho, pero no la obligación, de comprar el subyacente a un precio "
+    "fijado (strike) hasta una fecha de vencimiento. Se paga una prima por ese derecho: si al vencer "
+    "el precio supera al strike más la prima, la operación da beneficio; si no, la pérdida máxima es "
+    "la prima pagada."
+)
+
+
+def _tokens(text):
+    # Trozos del tamaño de un token aproximado: cada palabra con su espacio
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + words[-1:]
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def _stream_events(tokens, model, latency, token_latency):
+    time.sleep(latency)
+    yield _sse("message_start", {"type": "message_start", "message": {
+        "id": "msg_stub", "type": "message", "role": "assistant", "model": model, "content": [],
+        "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 20, "output_tokens": 1}}})
+    yield _sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                       "content_block": {"type": "text", "text": ""}})
+    for i, token in enumerate(tokens):
+        if i:
+            time.sleep(token_latency)
+        yield _sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                           "delta": {"type": "text_delta", "text": token}})
+    yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield _sse("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                 "usage": {"output_tokens": len(tokens)}})
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+def claude_stub_transport(text=RESPUESTA, latency=0.5, token_latency=0.02):
+    """
+    httpx.MockTransport para initialize_claude(transport=...)
+
+    latency: segundos hasta el primer token; token_latency: segundos entre tokens.
+    Sin streaming la respuesta llega entera tras latency + token_latency * (tokens - 1).
+    `transport.requests` cuenta las peticiones recibidas.
+    """
+    import httpx
+
+    tokens = _tokens(text)
+
+    def handler(request):
+        transport.requests += 1
+        body = json.loads(request.content)
+        if body.get("stream"):
+            return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                                  content=_stream_events(tokens, body["model"], latency, token_latency))
+        time.sleep(latency + token_latency * (len(tokens) - 1))
+        return httpx.Response(200, json={
+            "id": "msg_stub", "type": "message", "role": "assistant", "model": body["model"],
+            "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 20, "output_tokens": len(tokens)}})
+
+    transport = httpx.MockTransport(handler)
+    transport.requests = 0
+    return transport
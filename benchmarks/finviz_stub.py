@@ -0,0 +1,124 @@
+"""
+Servidor HTTP local que imita el endpoint de exportación de Finviz.
+
+Sirve un CSV sintético por vista (111, 141, 161, 171, 131) con las columnas
+que usa get_finviz_dataframe, añadiendo una latencia configurable por
+petición para poder medir la descarga paralela sin conexión a internet.
+
+Uso:
+    with finviz_stub_server(latency=0.2, n_rows=500) as endpoint:
+        descargar_vistas('', endpoint=endpoint, api_key='stub')
+"""
+import contextlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+SECTORS = [
+    "Basic Materials", "Communication Services", "Consumer Cyclical", "Consumer Defensive",
+    "Energy", "Financial", "Healthcare", "Industrials", "Real Estate", "Technology", "Utilities",
+]
+
+COLUMNAS_VISTA = {
+    111: ["No.", "Ticker", "Company", "Sector", "Industry", "Country", "Market Cap", "P/E", "Price", "Change", "Volume"],
+    141: ["No.", "Ticker", "Performance (Week)", "Performance (Month)", "Performance (Year)",
+          "Volatility (Week)", "Volatility (Month)", "Average Volume", "Relative Volume", "Price", "Change", "Volume"],
+    161: ["No.", "Ticker", "Market Cap", "Total Debt/Equity", "Return on Assets", "Return on Equity",
+          "Return on Investment", "Price", "Change", "Volume"],
+    171: ["No.", "Ticker", "Beta", "Average True Range", "Relative Strength Index (14)", "Price", "Change", "Volume"],
+    131: ["No.", "Ticker", "Market Cap", "Outstanding", "Float", "Short Float", "Short Ratio", "Average Volume",
+          "Price", "Change", "Volume"],
+}
+
+
+def _pct(values):
+    return [f"{v:.2f}%" for v in values]
+
+
+def generar_csv(vista, n_rows=500, seed=0):
+    """Genera el CSV sintético de una vista; los mismos tickers en todas las vistas."""
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:04d}" for i in range(n_rows)]
+    columnas = {
+        "No.": [str(i + 1) for i in range(n_rows)],
+        "Ticker": tickers,
+        "Company": [f"Company {t}" for t in tickers],
+        "Sector": [SECTORS[i % len(SECTORS)] for i in range(n_rows)],
+        "Industry": ["Stub"] * n_rows,
+        "Country": ["USA"] * n_rows,
+        "Market Cap": [f"{v:.2f}" for v in rng.uniform(50, 2e6, n_rows)],
+        "P/E": [f"{v:.2f}" for v in rng.uniform(5, 60, n_rows)],
+        "Price": [f"{v:.2f}" for v in rng.uniform(5, 500, n_rows)],
+        "Change": _pct(rng.normal(0, 2, n_rows)),
+        "Volume": [str(v) for v in rng.integers(1e5, 5e7, n_rows)],
+        "Performance (Week)": _pct(rng.normal(0, 4, n_rows)),
+        "Performance (Month)": _pct(rng.normal(0, 8, n_rows)),
+        "Performance (Year)": _pct(rng.normal(10, 30, n_rows)),
+        "Volatility (Week)": _pct(rng.uniform(0.5, 8, n_rows)),
+        "Volatility (Month)": _pct(rng.uniform(0.5, 8, n_rows)),
+        "Average Volume": [f"{v:.2f}" for v in rng.uniform(1e2, 5e4, n_rows)],
+        "Relative Volume": [f"{v:.2f}" for v in rng.uniform(0.2, 3, n_rows)],
+        "Total Debt/Equity": [f"{v:.2f}" for v in rng.uniform(0, 3, n_rows)],
+        "Return on Assets": _pct(rng.normal(5, 8, n_rows)),
+        "Return on Equity": _pct(rng.normal(12, 15, n_rows)),
+        "Return on Investment": _pct(rng.normal(9, 12, n_rows)),
+        "Beta": [f"{v:.2f}" for v in rng.uniform(0.2, 2.5, n_rows)],
+        "Average True Range": [f"{v:.2f}" for v in rng.uniform(0.1, 20, n_rows)],
+        "Relative Strength Index (14)": [f"{v:.2f}" for v in rng.uniform(15, 85, n_rows)],
+        "Outstanding": [f"{v:.2f}" for v in rng.uniform(10, 5e3, n_rows)],
+        "Float": [f"{v:.2f}" for v in rng.uniform(10, 5e3, n_rows)],
+        "Short Float": _pct(rng.uniform(0.1, 25, n_rows)),
+        "Short Ratio": [f"{v:.2f}" for v in rng.uniform(0.1, 10, n_rows)],
+    }
+    nombres = COLUMNAS_VISTA[vista]
+    lineas = [",".join(f'"{c}"' for c in nombres)]
+    for i in range(n_rows):
+        lineas.append(",".join(f'"{columnas[c][i]}"' for c in nombres))
+    return ("\n".join(lineas) + "\n").encode("utf-8")
+
+
+@contextlib.contextmanager
+def finviz_stub_server(latency=0.2, n_rows=500, host="127.0.0.1"):
+    """
+    Arranca el servidor en un hilo y devuelve el endpoint a usar en generar_url.
+
+    Args:
+        latency: Segundos de espera antes de responder cada petición
+        n_rows: Número de tickers por vista
+    """
+    cuerpos = {vista: generar_csv(vista, n_rows) for vista in COLUMNAS_VISTA}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            vista = int(query.get("v", ["0"])[0])
+            time.sleep(latency)
+            if vista not in cuerpos:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = cuerpos[vista]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_port}/export.ashx"
+    finally:
+        server.shutdown()
+        server.server_close()
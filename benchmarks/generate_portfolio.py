@@ -0,0 +1,103 @@
+"""
+Genera una cartera sintética de opciones con el formato de util.portfolio y,
+con --history, los históricos de precios de sus subyacentes para util.var.
+
+    python -m benchmarks.generate_portfolio --n 300 --out data/fixtures/portfolio_sample.csv
+    python -m benchmarks.generate_portfolio --history data/fixtures/price_history_sample.csv
+
+Los vencimientos se reparten entre 1 y 24 meses desde --as-of (hoy por
+defecto). Con extensión .parquet se escribe en Parquet. Los históricos son
+dos años de días hábiles con un factor de mercado y otro por sector, y
+terminan en el spot de la cartera.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Subyacentes con precio y volatilidad aproximados y el sector de Finviz
+SUBYACENTES = {
+    'AAPL': (230.0, 0.25, 'Technology'),
+    'MSFT': (420.0, 0.22, 'Technology'),
+    'NVDA': (130.0, 0.50, 'Technology'),
+    'AMZN': (185.0, 0.32, 'Consumer Cyclical'),
+    'TSLA': (240.0, 0.60, 'Consumer Cyclical'),
+    'JPM': (210.0, 0.22, 'Financial'),
+    'GS': (480.0, 0.27, 'Financial'),
+    'XOM': (115.0, 0.24, 'Energy'),
+    'CVX': (150.0, 0.23, 'Energy'),
+    'JNJ': (160.0, 0.16, 'Healthcare'),
+    'PFE': (29.0, 0.26, 'Healthcare'),
+    'KO': (70.0, 0.15, 'Consumer Defensive'),
+    'WMT': (80.0, 0.18, 'Consumer Defensive'),
+    'CAT': (370.0, 0.28, 'Industrials'),
+    'NEE': (80.0, 0.24, 'Utilities'),
+}
+
+
+def generar_cartera(n, as_of=None, seed=0):
+    rng = np.random.default_rng(seed)
+    as_of = pd.Timestamp(as_of or pd.Timestamp.today().normalize())
+    tickers = rng.choice(list(SUBYACENTES), n)
+    spot = np.array([SUBYACENTES[t][0] for t in tickers])
+    vol = np.array([SUBYACENTES[t][1] for t in tickers]) * rng.uniform(0.9, 1.2, n)
+    strike = np.round(spot * rng.uniform(0.8, 1.2, n) / 5) * 5
+    dias = rng.integers(30, 730, n)
+    return pd.DataFrame({
+        'position_id': [f"P{i:05d}" for i in range(n)],
+        'underlying': tickers,
+        'option_type': rng.choice(['call', 'put'], n),
+        'strike': strike,
+        'expiry': [(as_of + pd.Timedelta(days=int(d))).date().isoformat() for d in dias],
+        'quantity': rng.choice([-20, -10, -5, 5, 10, 20, 50], n),
+        'spot': spot,
+        'volatility': np.round(vol, 4),
+        'multiplier': 100,
+        'sector': [SUBYACENTES[t][2] for t in tickers],
+    })
+
+
+def generar_historico(as_of=None, days=504, seed=0):
+    rng = np.random.default_rng(seed)
+    as_of = pd.Timestamp(as_of or pd.Timestamp.today().normalize())
+    tickers = list(SUBYACENTES)
+    sectores = sorted({sector for _, _, sector in SUBYACENTES.values()})
+    vol = np.array([SUBYACENTES[t][1] for t in tickers]) / np.sqrt(252)
+
+    # Retorno diario = 50% mercado + 25% sector + 25% idiosincrático (en varianza)
+    mercado = rng.standard_normal((days, 1))
+    sector = rng.standard_normal((days, len(sectores)))[:, [sectores.index(SUBYACENTES[t][2]) for t in tickers]]
+    propio = rng.standard_normal((days, len(tickers)))
+    z = np.sqrt(0.5) * mercado + 0.5 * sector + 0.5 * propio
+    log_prices = np.cumsum(z * vol - vol**2 / 2, axis=0)
+    log_prices += np.log([SUBYACENTES[t][0] for t in tickers]) - log_prices[-1]
+
+    fechas = pd.bdate_range(end=as_of, periods=days, name='Date')
+    return pd.DataFrame(np.round(np.exp(log_prices), 4), index=fechas, columns=tickers)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=300, help="número de posiciones")
+    parser.add_argument("--out", default="data/fixtures/portfolio_sample.csv")
+    parser.add_argument("--as-of", default=None, help="fecha de referencia (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=None, help="escribe los históricos de precios en esta ruta y termina")
+    args = parser.parse_args()
+
+    if args.history:
+        historico = generar_historico(args.as_of, seed=args.seed)
+        historico.to_csv(args.history)
+        print(f"{historico.shape[0]} días x {historico.shape[1]} tickers -> {args.history}")
+        return
+
+    df = generar_cartera(args.n, args.as_of, args.seed)
+    if args.out.endswith(('.parquet', '.pq')):
+        df.to_parquet(args.out, index=False)
+    else:
+        df.to_csv(args.out, index=False)
+    print(f"{len(df)} posiciones -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Graba las fichas (yf.Ticker(...).info) de varios tickers en
+data/fixtures/fundamentals_sample.json para usar util.fundamentals sin
+conexión (RecordedInfo).
+
+    python -m benchmarks.record_fundamentals --tickers AAPL,MSFT,NVDA               # desde yfinance
+    python -m benchmarks.record_fundamentals --tickers AAPL,MSFT,NVDA --synthetic   # sin red
+
+La versión sintética solo trae los campos que muestra la pestaña de noticias.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from util.fundamentals import FUNDAMENTALS_FIXTURE, yfinance_info
+
+SECTORES = [("Technology", "Consumer Electronics"), ("Technology", "Software - Infrastructure"),
+            ("Technology", "Semiconductors"), ("Consumer Cyclical", "Auto Manufacturers"),
+            ("Financial Services", "Asset Management")]
+
+
+def grabar_yfinance(tickers):
+    return {"recorded_at": datetime.now(timezone.utc).isoformat(), "source": "yfinance",
+            "info": {ticker: yfinance_info(ticker) for ticker in tickers}}
+
+
+def generar_sintetica(tickers, recorded_at="2026-10-16T15:00:00+00:00"):
+    rng = np.random.default_rng(0)
+    info = {}
+    for i, ticker in enumerate(tickers):
+        sector, industria = SECTORES[i % len(SECTORES)]
+        precio = round(float(rng.uniform(50, 900)), 2)
+        info[ticker] = {
+            "symbol": ticker,
+            "shortName": f"{ticker} Inc.",
+            "currentPrice": precio,
+            "regularMarketChangePercent": round(float(rng.normal(0, 1.5)), 2),
+            "volume": int(rng.integers(5_000_000, 120_000_000)),
+            "marketCap": int(precio * rng.integers(1_000_000_000, 15_000_000_000)),
+            "sector": sector,
+            "industry": industria,
+            "country": "United States",
+            "fullTimeEmployees": int(rng.integers(10_000, 200_000)),
+            "longBusinessSummary": f"{ticker} Inc. (datos de ejemplo para trabajar sin conexión).",
+        }
+    return {"recorded_at": recorded_at, "source": "synthetic", "info": info}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", default="AAPL,MSFT,NVDA,TSLA,SPY")
+    parser.add_argument("--synthetic", action="store_true", help="generar sin red")
+    parser.add_argument("--out", default=FUNDAMENTALS_FIXTURE)
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    data = generar_sintetica(tickers) if args.synthetic else grabar_yfinance(tickers)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    print(f"{args.out}: fichas de {len(data['info'])} tickers")
+
+
+if __name__ == "__main__":
+    main()
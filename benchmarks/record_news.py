@@ -0,0 +1,91 @@
+"""
+Graba las noticias de varios tickers en data/fixtures/news_sample.json para
+usar util.news sin conexión (RecordedNews).
+
+    python -m benchmarks.record_news --tickers AAPL,MSFT,NVDA               # desde yfinance
+    python -m benchmarks.record_news --tickers AAPL,MSFT,NVDA --synthetic   # sin red
+
+La versión sintética usa el formato de yf.Ticker(...).news. Parte de las
+noticias mencionan a dos tickers y aparecen en la respuesta de ambos, como
+en Yahoo, para poder probar la deduplicación por link.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from util.news import NEWS_FIXTURE, yfinance_news
+
+PUBLISHERS = ["Reuters", "Bloomberg", "Yahoo Finance", "Barron's", "MarketWatch", "Investor's Business Daily"]
+TITULARES = [
+    "{t} beats earnings estimates as revenue climbs",
+    "Options traders brace for volatility in {t} ahead of earnings",
+    "Analysts raise {t} price target after strong guidance",
+    "{t} shares slip as sector rotation continues",
+    "Implied volatility on {t} hits three-month low",
+    "{t} announces buyback program",
+    "Why {t} stock is moving today",
+    "Unusual call activity spotted in {t}",
+]
+# Resoluciones de las miniaturas de Yahoo (la original y las reducidas)
+RESOLUCIONES = [("original", 1200, 800), ("140x140", 140, 140)]
+
+
+def grabar_yfinance(tickers):
+    return {"recorded_at": datetime.now(timezone.utc).isoformat(), "source": "yfinance",
+            "news": {ticker: yfinance_news(ticker) for ticker in tickers}}
+
+
+def _miniatura(uuid):
+    return {"resolutions": [
+        {"url": f"https://s.yimg.com/uu/api/res/1.2/{uuid}/{tag}.jpg", "width": ancho, "height": alto, "tag": tag}
+        for tag, ancho, alto in RESOLUCIONES
+    ]}
+
+
+def generar_sintetica(tickers, por_ticker=12, recorded_at="2026-10-16T15:00:00+00:00"):
+    rng = np.random.default_rng(0)
+    fin = int(datetime.fromisoformat(recorded_at).timestamp())
+    news = {ticker: [] for ticker in tickers}
+    for i, ticker in enumerate(tickers):
+        for j in range(por_ticker):
+            uuid = f"{ticker.lower()}-{j:03d}"
+            relacionados = [ticker]
+            # Una de cada cuatro noticias también sale en el siguiente ticker
+            if j % 4 == 0 and len(tickers) > 1:
+                relacionados.append(tickers[(i + 1) % len(tickers)])
+            article = {
+                "uuid": uuid,
+                "title": TITULARES[j % len(TITULARES)].format(t=" & ".join(relacionados)),
+                "publisher": PUBLISHERS[int(rng.integers(len(PUBLISHERS)))],
+                "link": f"https://finance.yahoo.com/news/{uuid}.html",
+                "providerPublishTime": fin - int(rng.integers(0, 7 * 24 * 3600)),
+                "type": "STORY",
+                "relatedTickers": relacionados,
+            }
+            if j % 5:
+                article["thumbnail"] = _miniatura(uuid)
+            for relacionado in relacionados:
+                news[relacionado].append(article)
+    return {"recorded_at": recorded_at, "source": "synthetic", "news": news}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", default="AAPL,MSFT,NVDA,TSLA,SPY")
+    parser.add_argument("--synthetic", action="store_true", help="generar sin red")
+    parser.add_argument("--out", default=NEWS_FIXTURE)
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    data = generar_sintetica(tickers) if args.synthetic else grabar_yfinance(tickers)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    print(f"{args.out}: {sum(len(v) for v in data['news'].values())} noticias de {len(tickers)} tickers")
+
+
+if __name__ == "__main__":
+    main()
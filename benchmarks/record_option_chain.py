@@ -0,0 +1,97 @@
+"""
+Graba la cadena de opciones de un ticker en data/fixtures/option_chain_<TICKER>.json
+para usar util.vol_surface sin conexión (RecordedTicker).
+
+    python -m benchmarks.record_option_chain --ticker SPY               # desde yfinance
+    python -m benchmarks.record_option_chain --ticker SPY --synthetic   # sin red, a partir de SVI
+
+La versión sintética valora calls y puts con Black-Scholes sobre una sonrisa
+SVI típica de índice (skew negativo) y añade un spread bid/ask, con el mismo
+formato de columnas que devuelve yfinance.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from util.pricing import black_scholes
+from util.vol_surface import FIXTURES_DIR, SVIParams
+
+COLUMNAS = ["contractSymbol", "strike", "lastPrice", "bid", "ask", "volume", "openInterest",
+            "impliedVolatility", "inTheMoney"]
+
+
+def grabar_yfinance(ticker, max_expiries):
+    import yfinance as yf
+
+    fuente = yf.Ticker(ticker)
+    opciones = list(fuente.options[:max_expiries])
+    chains = {}
+    for expiry in opciones:
+        chain = fuente.option_chain(expiry)
+        chains[expiry] = {
+            "calls": chain.calls[COLUMNAS].to_dict(orient="records"),
+            "puts": chain.puts[COLUMNAS].to_dict(orient="records"),
+            "underlying": {"regularMarketPrice": chain.underlying.get("regularMarketPrice")},
+        }
+    return {"ticker": ticker, "recorded_at": datetime.now(timezone.utc).isoformat(), "source": "yfinance",
+            "options": opciones, "chains": chains}
+
+
+def generar_sintetica(ticker, spot=580.0, recorded_at="2026-10-16T15:00:00+00:00"):
+    rng = np.random.default_rng(0)
+    as_of = datetime.fromisoformat(recorded_at)
+    dias = [14, 30, 60, 91, 182, 365]
+    opciones, chains = [], {}
+    for d in dias:
+        expiry = (as_of + timedelta(days=d)).date().isoformat()
+        T = d / 365
+        # Sonrisa con skew negativo; ATM ~21% a un año y más alta en los plazos cortos
+        params = SVIParams(a=0.028 * T + 0.002 * T**2, b=0.12 * np.sqrt(T), rho=-0.65, m=0.02, sigma=0.12)
+        strikes = np.round(spot * np.linspace(0.7, 1.3, 49))
+        k = np.log(strikes / spot)
+        iv = np.sqrt(params.total_variance(k) / T)
+        opciones.append(expiry)
+        chain = {"underlying": {"regularMarketPrice": spot}}
+        for tipo in ("call", "put"):
+            precio = black_scholes(spot, strikes, T, 0.0, iv, tipo)
+            spread = np.maximum(0.01, 0.02 * precio + 0.05 * rng.random(strikes.size))
+            chain[tipo + "s"] = [
+                {
+                    "contractSymbol": f"{ticker}{expiry.replace('-', '')[2:]}{tipo[0].upper()}{int(K * 1000):08d}",
+                    "strike": float(K),
+                    "lastPrice": round(float(p), 2),
+                    "bid": round(max(float(p - s / 2), 0.0), 2),
+                    "ask": round(float(p + s / 2), 2),
+                    "volume": int(rng.integers(0, 5000)),
+                    "openInterest": int(rng.integers(0, 50000)),
+                    "impliedVolatility": float(v),
+                    "inTheMoney": bool(K < spot) if tipo == "call" else bool(K > spot),
+                }
+                for K, p, s, v in zip(strikes, precio, spread, iv)
+            ]
+        chains[expiry] = chain
+    return {"ticker": ticker, "recorded_at": recorded_at, "source": "synthetic-svi", "options": opciones,
+            "chains": chains}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticker", default="SPY")
+    parser.add_argument("--max-expiries", type=int, default=8)
+    parser.add_argument("--synthetic", action="store_true", help="generar sin red a partir de una sonrisa SVI")
+    args = parser.parse_args()
+
+    ticker = args.ticker.upper()
+    data = generar_sintetica(ticker) if args.synthetic else grabar_yfinance(ticker, args.max_expiries)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    ruta = os.path.join(FIXTURES_DIR, f"option_chain_{ticker}.json")
+    with open(ruta, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    print(f"{ruta}: {len(data['options'])} vencimientos")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,112 @@
 import streamlit as st
-from anthropic import Anthropic
 
-def initialize_claude():
-    """Inicializa el cliente de Claude con la API key"""
-    api_key = st.secrets["ANTHROPIC_API_KEY"]
-    return Anthropic(api_key=api_key)
+# Parámetros de cada consulta al chat
+MODELO_CLAUDE = "claude-3-opus-20240229"
+MAX_TOKENS_CLAUDE = 1000
+TEMPERATURA_CLAUDE = 0.7
+SYSTEM_PROMPT = "Eres un asistente experto en finanzas y mercados. Proporciona respuestas concisas y precisas."
+
+# Conexiones HTTP que el cliente compartido mantiene abiertas (una por sesión que pregunta a la vez)
+MAX_CONEXIONES_CLAUDE = 10
+
+
+def initialize_claude(api_key=None, transport=None, base_url=None):
+    """
+    Crea un cliente de Claude con su propio pool de conexiones
+
+    Parámetros:
+    api_key: Por defecto st.secrets["ANTHROPIC_API_KEY"]
+    transport: httpx.BaseTransport para no salir a la red (p. ej. httpx.MockTransport,
+        ver benchmarks/claude_stub.py)
+    base_url: Otro endpoint compatible (un servidor local de pruebas)
+    """
+    import httpx
+    from anthropic import Anthropic  # import pesado: solo cuando se usa el chat
+
+    if api_key is None:
+        api_key = st.secrets["ANTHROPIC_API_KEY"]
+    limits = httpx.Limits(max_connections=MAX_CONEXIONES_CLAUDE, max_keepalive_connections=MAX_CONEXIONES_CLAUDE)
+    http_client = httpx.Client(transport=transport, limits=limits)
+    return Anthropic(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+@st.cache_resource
+def get_claude_client():
+    """Cliente de Claude compartido por todas las sesiones: se reutilizan las conexiones (TLS incluido)"""
+    return initialize_claude()
+
+
+def _claude_request(question, context=""):
+    return dict(
+        model=MODELO_CLAUDE,
+        max_tokens=MAX_TOKENS_CLAUDE,
+        temperature=TEMPERATURA_CLAUDE,
+        system=SYSTEM_PROMPT,
+        messages=[
+            {
+                "role": "user",
+                "content": f"Contexto: {context}\nPregunta: {question}"
+            }
+        ]
+    )
+
 
 def get_claude_response(client, question, context=""):
     """
-    Obtiene una respuesta de Claude
+    Obtiene una respuesta de Claude (espera a la respuesta completa)
     Args:
         client: Cliente de Anthropic
         question: Pregunta del usuario
         context: Contexto adicional opcional
     """
     try:
-        message = client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1000,
-            temperature=0.7,
-            system="Eres un asistente experto en finanzas y mercados. Proporciona respuestas concisas y precisas.",
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Contexto: {context}\nPregunta: {question}"
-                }
-            ]
-        )
+        message = client.messages.create(**_claude_request(question, context))
         # Extraer solo el texto de la respuesta
         clean_response = message.content[0].text
         return clean_response
     except Exception as e:
         return f"Error al obtener respuesta: {str(e)}"
 
+
+def stream_claude_response(client, question, context=""):
+    """
+    Respuesta de Claude por fragmentos de texto, a medida que llegan
+
+    Generador para st.write_stream: lo primero se ve en cuanto llega el
+    primer token. Un error corta la respuesta y se muestra como texto.
+    """
+    try:
+        with client.messages.stream(**_claude_request(question, context)) as stream:
+            yield from stream.text_stream
+    except Exception as e:
+        yield f"\n\nError al obtener respuesta: {str(e)}"
+
+
 def display_chat_interface():
     st.subheader("💬 Consulta con IA")
-    
+
     # Inicializar el historial de chat si no existe
     if "messages" not in st.session_state:
         st.session_state.messages = []
-    
+
     # Mostrar mensajes anteriores
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
-    
+
     # Input del usuario
     if prompt := st.chat_input("Escribe tu pregunta aquí..."):
         # Mostrar mensaje del usuario
         with st.chat_message("user"):
             st.markdown(prompt)
         st.session_state.messages.append({"role": "user", "content": prompt})
-        
-        # Obtener y mostrar respuesta de Claude
+
+        # Mostrar la respuesta de Claude mientras llega
         with st.chat_message("assistant"):
-            client = initialize_claude()
-            response = get_claude_response(client, prompt)
-            st.markdown(response)
+            try:
+                client = get_claude_client()
+            except Exception as e:
+                st.error(f"No se pudo conectar con Claude: {e}")
+                return
+            response = st.write_stream(stream_claude_response(client, prompt))
             st.session_state.messages.append({"role": "assistant", "content": response})
-            
\ No newline at end of file
@@ -0,0 +1,68 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch_concurrently(fetcher, keys, max_workers, thread_name_prefix="fetch"):
+    """
+    Llama a fetcher(key) para cada key en paralelo (hasta max_workers hilos)
+
+    Un error en una key no corta las demás: se devuelve aparte.
+
+    Returns:
+        tuple: ({key: resultado}, {key: excepción})
+    """
+    keys = list(keys)
+    if not keys:
+        return {}, {}
+
+    def fetch_one(key):
+        try:
+            return key, fetcher(key), None
+        except Exception as e:
+            return key, None, e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys)), thread_name_prefix=thread_name_prefix) as executor:
+        fetched = list(executor.map(fetch_one, keys))
+    results = {key: value for key, value, error in fetched if error is None}
+    errors = {key: error for key, _, error in fetched if error is not None}
+    return results, errors
+
+
+class RecordedFetcher:
+    """
+    Base de los sustitutos de yfinance que reproducen respuestas grabadas en JSON.
+
+    El JSON guarda {ticker: respuesta} bajo la clave `campo`; `fixture` es la
+    ruta por defecto. latency simula el tiempo de respuesta de cada petición
+    y `calls` cuenta las peticiones. Cada llamada devuelve una copia, como
+    una respuesta nueva. Las subclases definen campo, fixture, copy y missing.
+    """
+    campo = None
+    fixture = None
+
+    def __init__(self, data, latency=0.0):
+        self._data = {ticker.upper(): response for ticker, response in data[self.campo].items()}
+        self.latency = latency
+        self.calls = 0
+
+    @classmethod
+    def from_fixture(cls, path=None, latency=0.0):
+        with open(path or cls.fixture) as f:
+            return cls(json.load(f), latency)
+
+    def copy(self, response):
+        return response
+
+    def missing(self, ticker):
+        """Respuesta para un ticker que no está grabado"""
+        raise LookupError(f"Sin datos grabados para {ticker}")
+
+    def __call__(self, ticker):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        ticker = ticker.upper()
+        if ticker not in self._data:
+            return self.missing(ticker)
+        return self.copy(self._data[ticker])
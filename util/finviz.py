@@ -1,7 +1,15 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-import requests
 import pandas as pd
 
+from util.screener_cache import ScreenerCache
+from util.snapshot_store import SNAPSHOT_DIR, list_snapshots, read_snapshot, snapshot_path, write_snapshot_async
+
 # Crear el diccionario con las industrias
 INDUSTRIES = [
     "All",
@@ -19,59 +27,259 @@ INDUSTRIES = [
     "Custom"
 ]
 
+# Vistas de exportación de Finviz y el archivo donde se guarda cada una
+VISTAS = {
+    111: "data/finviz_technical111.csv",
+    141: "data/finviz_performance141.csv",
+    161: "data/finviz_financial161.csv",
+    171: "data/finviz_technical171.csv",
+    131: "data/finviz_ownership131.csv",
+}
+
+# Marca para las columnas de porcentaje ('12.34%' -> 0.1234)
+PORCENTAJE = object()
+
+# Columnas que se leen de cada vista y su tipo (None: inferido por pandas)
+COLUMNAS_VISTA = {
+    111: {'Ticker': str, 'Company': str, 'Sector': str, 'Market Cap': 'float64', 'Volume': 'float64'},
+    141: {'Ticker': str, 'Performance (Year)': PORCENTAJE, 'Volatility (Month)': PORCENTAJE, 'Average Volume': 'float64'},
+    161: {'Ticker': str, 'Total Debt/Equity': 'float64', 'Return on Assets': PORCENTAJE, 'Return on Equity': PORCENTAJE,
+          'Return on Investment': PORCENTAJE},
+    171: {'Ticker': str, 'Beta': 'float64', 'Relative Strength Index (14)': 'float64'},
+    131: {'Ticker': str, 'Short Float': PORCENTAJE},
+}
+
+# Guardar también los CSV en data/ (en segundo plano) tras cada descarga
+PERSISTIR_CSV = False
+
+# Guardar la foto del día del screener completo en util.snapshot_store (en segundo plano)
+PERSISTIR_SNAPSHOTS = True
+
+# Al arrancar, servir la última foto guardada mientras se descarga la nueva
+SEMBRAR_DESDE_SNAPSHOT = True
+
+# Caché del screener: segundos hasta refrescar y número de filtros guardados
+TTL_SCREENER = 15 * 60
+MAX_FILTROS_SCREENER = 8
+
+# Timeout por vista (conexión, lectura) en segundos y número de reintentos
+TIMEOUT_VISTA = (5, 30)
+REINTENTOS_VISTA = 3
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Devuelve la sesión HTTP compartida del proceso.
+
+    Una sola sesión con un pool de conexiones del tamaño del número de vistas,
+    de modo que las descargas paralelas reutilizan conexiones keep-alive.
+    Los reintentos (con backoff) se aplican a errores de conexión y 429/5xx.
+    """
+    # requests/urllib3 se importan aquí: no hace falta cargarlos hasta la primera descarga
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 
-def generar_url(vista, filtros):
-    return st.secrets["FINVIZ_ENDPOINT"] + "?v=" + str(vista) + "&f=" + filtros + "&auth=" + st.secrets["FINVIZ_API_KEY"]
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=REINTENTOS_VISTA,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(VISTAS), max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
 
 
-def descargar_datos(vista, filtros, ruta):
-    response = requests.get(generar_url(vista, filtros))
+def generar_url(vista, filtros, endpoint=None, api_key=None):
+    endpoint = endpoint or st.secrets["FINVIZ_ENDPOINT"]
+    api_key = api_key or st.secrets["FINVIZ_API_KEY"]
+    return endpoint + "?v=" + str(vista) + "&f=" + filtros + "&auth=" + api_key
+
+
+def descargar_contenido(vista, filtros, session=None, timeout=TIMEOUT_VISTA, endpoint=None, api_key=None):
+    """Descarga una vista y devuelve el cuerpo de la respuesta en memoria"""
+    session = session or get_session()
+    response = session.get(generar_url(vista, filtros, endpoint, api_key), timeout=timeout)
     if response.status_code == 200:
-        with open(ruta, "wb") as f:
-            f.write(response.content)
-    else:
-        raise Exception("Error en la descarga de datos de Finviz")
+        return response.content
+    raise Exception(f"Error en la descarga de datos de Finviz (vista {vista})")
 
-#guardar archivos en una carpeta para descargarlos y unir los tres archivos
-@st.cache_data
-def get_finviz_dataframe(filtros):
-    overview_path = "data/finviz_technical111.csv"
-    performance_path = "data/finviz_performance141.csv"
-    financial_path = "data/finviz_financial161.csv"
-    technical_path = "data/finviz_technical171.csv"
-    ownership_path = "data/finviz_ownership131.csv"
-
-    descargar_datos(111, filtros, overview_path)
-    descargar_datos(141, filtros, performance_path)
-    descargar_datos(161, filtros, financial_path)
-    descargar_datos(171, filtros, technical_path)
-    descargar_datos(131, filtros, ownership_path)
-
-    # los archivos descargados los convertimos en DFrame cada uno
-    overview_df = pd.read_csv(overview_path, index_col=1)
-    performance_df = pd.read_csv(performance_path, index_col=1)
-    financial_df = pd.read_csv(financial_path, index_col=1)
-    technical_df = pd.read_csv(technical_path, index_col=1)
-    ownership_df = pd.read_csv(ownership_path, index_col=1)
-
-    # convertir porcentajes a decimal
-    performance_df['Volatility (Month)'] = performance_df['Volatility (Month)'].str.rstrip('%').astype('float') / 100.0
-    ownership_df['Short Float'] = ownership_df['Short Float'].str.rstrip('%').astype('float') / 100.0
-    
+
+def descargar_datos(vista, filtros, ruta, session=None, timeout=TIMEOUT_VISTA, endpoint=None, api_key=None):
+    contenido = descargar_contenido(vista, filtros, session, timeout, endpoint, api_key)
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+
+
+def _porcentaje(valor):
+    """Convierte '12.34%' en 0.1234 durante el parseo; vacío o '-' es NaN"""
+    valor = valor.strip().rstrip('%')
+    if not valor or valor == '-':
+        return float('nan')
+    return float(valor) / 100.0
+
+
+def parsear_vista(vista, contenido):
+    """
+    Parsea el CSV de una vista directamente desde memoria.
+
+    Solo lee las columnas de COLUMNAS_VISTA con su tipo; las columnas de
+    porcentaje se convierten a decimal en el propio parseo.
+    """
+    spec = COLUMNAS_VISTA[vista]
+    dtype = {col: tipo for col, tipo in spec.items() if tipo not in (PORCENTAJE, None)}
+    converters = {col: _porcentaje for col, tipo in spec.items() if tipo is PORCENTAJE}
+    return pd.read_csv(
+        io.BytesIO(contenido),
+        usecols=list(spec),
+        dtype=dtype,
+        converters=converters,
+        na_values=['-'],
+        index_col='Ticker',
+    )
+
+
+def _descargar_y_parsear(vista, filtros, session, timeout, endpoint, api_key):
+    contenido = descargar_contenido(vista, filtros, session, timeout, endpoint, api_key)
+    return contenido, parsear_vista(vista, contenido)
+
+
+def descargar_vistas(filtros, vistas=tuple(VISTAS), session=None, timeout=TIMEOUT_VISTA, endpoint=None, api_key=None):
+    """
+    Descarga y parsea todas las vistas en paralelo sobre la misma sesión HTTP.
+
+    Args:
+        filtros: Filtros de Finviz (parámetro f de la URL)
+        vistas: Números de vista a descargar
+        timeout: Timeout por vista (conexión, lectura)
+
+    Returns:
+        tuple: ({vista: bytes}, {vista: DataFrame})
+
+    Cada vista se parsea en cuanto llega su respuesta, mientras las demás
+    siguen descargándose. La latencia total es aproximadamente la de la vista
+    más lenta en lugar de la suma de todas. Si alguna vista falla, se propaga
+    su excepción.
+    """
+    session = session or get_session()
+    # Resolver las credenciales una sola vez, no en cada hilo
+    endpoint = endpoint or st.secrets["FINVIZ_ENDPOINT"]
+    api_key = api_key or st.secrets["FINVIZ_API_KEY"]
+
+    with ThreadPoolExecutor(max_workers=len(vistas), thread_name_prefix="finviz") as executor:
+        futures = {
+            vista: executor.submit(_descargar_y_parsear, vista, filtros, session, timeout, endpoint, api_key)
+            for vista in vistas
+        }
+        resultados = {vista: future.result() for vista, future in futures.items()}
+
+    contenidos = {vista: contenido for vista, (contenido, _) in resultados.items()}
+    frames = {vista: df for vista, (_, df) in resultados.items()}
+    return contenidos, frames
+
+
+def guardar_snapshot(contenidos, vistas=VISTAS):
+    """
+    Escribe los CSV descargados en disco en un hilo en segundo plano.
+
+    Args:
+        contenidos: Diccionario {vista: bytes} devuelto por descargar_vistas
+        vistas: Diccionario {vista: ruta del archivo}
+
+    Returns:
+        threading.Thread: El hilo de escritura (ya iniciado)
+    """
+    def escribir():
+        for vista, contenido in contenidos.items():
+            with open(vistas[vista], "wb") as f:
+                f.write(contenido)
+
+    thread = threading.Thread(target=escribir, name="finviz-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+
+def construir_dataframe(frames):
+    """Une las vistas parseadas en el DataFrame que usa la app"""
+    overview_df = frames[111]
     output_df = pd.DataFrame({
         'Company': overview_df['Company'],
         'Sector': overview_df['Sector'],
         'Market Cap': overview_df['Market Cap'],
         'Volume': overview_df['Volume'],
     }, index=overview_df.index) #nuevo data frame que combina los cuatro anteriores
-    
+
     #merge columns we want to use
-    output_df = output_df.join(performance_df[['Performance (Year)', 'Volatility (Month)', 'Average Volume']])
-    output_df = output_df.join(financial_df[['Total Debt/Equity', 'Return on Assets', 'Return on Equity', 'Return on Investment']])
-    output_df = output_df.join(technical_df[['Beta', 'Relative Strength Index (14)']])
-    output_df = output_df.join(ownership_df[['Short Float']])
+    output_df = output_df.join(frames[141][['Performance (Year)', 'Volatility (Month)', 'Average Volume']])
+    output_df = output_df.join(frames[161][['Total Debt/Equity', 'Return on Assets', 'Return on Equity', 'Return on Investment']])
+    output_df = output_df.join(frames[171][['Beta', 'Relative Strength Index (14)']])
+    output_df = output_df.join(frames[131][['Short Float']])
     output_df = output_df.dropna()
 
     return output_df
 
-get_finviz_dataframe('')
+
+def cargar_finviz(filtros):
+    """Descarga las vistas, las une en memoria y opcionalmente guarda los CSV"""
+    contenidos, frames = descargar_vistas(filtros)
+    if PERSISTIR_CSV:
+        guardar_snapshot(contenidos)
+    df = construir_dataframe(frames)
+    # Solo el universo completo: las fotos filtradas no serían comparables entre días
+    if PERSISTIR_SNAPSHOTS and not filtros:
+        write_snapshot_async(df)
+    return df
+
+
+def seed_from_snapshot(cache, root=SNAPSHOT_DIR):
+    """
+    Carga en la caché el universo completo ('') desde la última foto en disco
+
+    La foto cuenta con su antigüedad real (mtime del archivo): si ya pasó el
+    TTL, la primera lectura la devuelve al instante y descarga Finviz en
+    segundo plano. Returns: True si había una foto legible.
+    """
+    fechas = list_snapshots(root)
+    if not fechas:
+        return False
+    path = snapshot_path(fechas[-1], root)
+    try:
+        age = time.time() - os.path.getmtime(path)
+        df = read_snapshot(fechas[-1], root=root)
+    except Exception:
+        return False  # foto ilegible: se descarga como siempre
+    return cache.seed('', df, age)
+
+
+@st.cache_resource
+def get_screener_cache(ttl=TTL_SCREENER, max_entries=MAX_FILTROS_SCREENER):
+    """Caché del screener compartida por todas las sesiones del proceso"""
+    cache = ScreenerCache(cargar_finviz, ttl=ttl, max_entries=max_entries)
+    if SEMBRAR_DESDE_SNAPSHOT:
+        seed_from_snapshot(cache)
+    return cache
+
+
+def get_finviz_dataframe(filtros):
+    """
+    Devuelve el screener para esos filtros.
+
+    Solo la primera carga de cada filtro espera a Finviz; después se sirve la
+    última versión y, si ya pasó el TTL, se refresca en segundo plano.
+    """
+    return get_screener_cache().get(filtros)
+
+
+def get_finviz_snapshot(filtros):
+    """Como get_finviz_dataframe, pero devuelve (fetched_at, df): fetched_at cambia con cada refresco"""
+    return get_screener_cache().get_entry(filtros)
@@ -1,17 +1,27 @@
+import html
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import yfinance as yf  # Necesitas instalar esto: pip install yfinance
-from datetime import datetime, timedelta
 
-from scipy.stats import norm
-import plotly.graph_objects as go
+from util.finviz import get_screener_cache
+from util.greeks import bs_greeks
+from util.implied_vol import implied_volatility
+from util.lattice import lattice_greeks
+from util.monte_carlo import BARRIER_TYPES, price_monte_carlo
+from util.news import ANCHO_MINIATURA, get_news_service, thumbnail_url
+from util.portfolio import COLUMNAS_REQUERIDAS, PORTFOLIO_EJEMPLO, Portfolio
+from util.pricing import black_scholes
+from util.scenarios import scenario_grid, stream_scenarios
+from util.sensitivity import (COARSE_POINTS, FINE_POINTS, SURFACE_FACTORS, get_sensitivity_grid,
+                              sensitivity_bounds, sensitivity_surface)
+from util.strategies import (SIDES, STRATEGIES, Leg, LegMatrix, analyze_strategy, expiry_pnl, preset_legs,
+                              price_legs, strategy_pnl)
+from util.var import portfolio_var
+from util.vol_surface import FIXTURES_DIR, build_vol_surface, fixture_tickers, get_chain_source
 
-from scipy.stats import norm
-import plotly.express as px
+# plotly, scipy y yfinance se importan dentro de cada función: así importar este
+# módulo es barato y cada librería solo se carga cuando se pinta lo que la usa.
 
 
 
@@ -23,6 +33,8 @@ import plotly.express as px
 
 
 def create_risk_matrix():
+    import plotly.graph_objects as go
+
     # Título y descripción
     #st.header("Matriz de Riesgo - Derivados Financieros")
     st.write("Evalúa el riesgo de tu operación con derivados basado en diferentes factores.")
@@ -283,122 +295,144 @@ def options_tab():
 
 # Ver NOTICIAS -----------------------------------------------------------------------------------------------------------------------------
 
-def get_news_for_ticker(ticker_symbol):
-    """
-    Obtiene noticias relacionadas con un ticker específico
+# Noticias que se pintan al abrir la pestaña y con cada "Cargar más noticias"
+NOTICIAS_POR_PAGINA = 9
+
+
+def get_news_for_tickers(tickers, offline=False):
     """
-    try:
-        ticker = yf.Ticker(ticker_symbol)
-        news = ticker.news
+    Obtiene noticias de uno o varios tickers, sin repetir, de la más reciente a la más antigua
 
-        print(ticker)
-        
-        if news:
-            news_df = pd.DataFrame(news)
-            news_df['providerPublishTime'] = pd.to_datetime(news_df['providerPublishTime'], unit='s')
-            return split_df(news_df, 3)
-        else:
-            return None
-    except Exception as e:
-        st.error(f"Error al obtener noticias para {ticker_symbol}: {e}")
+    Las noticias de cada ticker se cachean (util.news) y los tickers que
+    faltan se piden en paralelo. offline=True usa las respuestas grabadas.
+
+    Returns:
+        pd.DataFrame o None si no hay noticias (ver display_news_feed)
+    """
+    tickers = [t.strip().upper() for t in tickers if t.strip()]
+    service = get_news_service(offline)
+    news_df = service.get_news(tickers)
+    for ticker in tickers:
+        if ticker in service.errors:
+            st.error(f"Error al obtener noticias para {ticker}: {service.errors[ticker]}")
+    if news_df.empty:
         return None
+    return news_df
 
 
-def split_df(df, n_splits):
-    """
-    Split a DataFrame into n_splits separate DataFrames of approximately equal size.
-    
-    Args:
-        df (pd.DataFrame): Input DataFrame to split
-        n_splits (int): Number of splits desired
-        
-    Returns:
-        list: List of n_splits DataFrames
+def news_card_html(article):
     """
-    # Validate inputs
-    if not isinstance(n_splits, int) or n_splits <= 0:
-        raise ValueError("n_splits must be a positive integer")
-    
-    if n_splits > len(df):
-        raise ValueError("n_splits cannot be larger than number of rows in DataFrame")
-    
-    # Calculate the approx size of each split
-    split_size = len(df) // n_splits
-    remainder = len(df) % n_splits
-    
-    result = []
-    start = 0
-    
-    # Create the splits
-    for i in range(n_splits):
-        # Add one extra row to some splits if there's a remainder
-        end = start + split_size + (1 if i < remainder else 0)
-        result.append(df.iloc[start:end].copy())
-        start = end
-        
-    return result
-    
+    Tarjeta HTML de una noticia (un solo elemento de Streamlit por noticia)
 
+    La miniatura es un <img loading="lazy"> de ANCHO_MINIATURA px con la
+    resolución más pequeña que llega a ese ancho: el navegador solo la
+    descarga cuando la tarjeta se acerca a la pantalla.
+    """
+    img_url = thumbnail_url(article.get('thumbnail'))
+    if img_url:
+        imagen = (f'<img src="{html.escape(img_url)}" loading="lazy" decoding="async" alt="" '
+                  f'width="{ANCHO_MINIATURA}" height="{ANCHO_MINIATURA}" style="object-fit:cover;border-radius:4px">')
+    else:
+        imagen = "<p>🖼️ <em>No hay imagen disponible</em></p>"
+    related = article.get('relatedTickers')
+    relacionados = (f"<p><strong>Tickers relacionados:</strong> {html.escape(', '.join(related))}</p>"
+                    if isinstance(related, list) and related else "")
+    return (
+        f"{imagen}"
+        f"<p><strong>📑 {html.escape(str(article['title']))}</strong></p>"
+        f"<p><strong>Fuente:</strong> {html.escape(str(article['publisher']))}<br>"
+        f"<strong>Fecha:</strong> {article['providerPublishTime']:%Y-%m-%d %H:%M}</p>"
+        f'<p><a href="{html.escape(article["link"])}" target="_blank">Leer la noticia completa</a></p>'
+        f"{relacionados}<hr>"
+    )
 
-#CALCULADORA DE RIESGO ------------------------------------------------------------------------------------------------------
 
-def black_scholes(S, K, T, r, sigma, option_type='call'):
+@st.fragment
+def display_news_feed(news_df, n_columns=3, per_page=NOTICIAS_POR_PAGINA):
     """
-    Calcula el precio de una opción usando Black-Scholes
-    
-    Parámetros:
-    S: Precio actual del activo
-    K: Precio de ejercicio
-    T: Tiempo hasta vencimiento (en años)
-    r: Tasa libre de riesgo
-    sigma: Volatilidad
-    option_type: 'call' o 'put'
+    Noticias en n_columns columnas, por páginas
+
+    Se pintan las primeras per_page; "Cargar más noticias" añade otra página
+    y, como es un fragment, solo vuelve a ejecutar este bloque y no toda la
+    app. Las noticias se reparten por filas (la i-ésima va a la columna
+    i % n_columns), así que arriba quedan siempre las más recientes.
     """
-    d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-    d2 = d1 - sigma*np.sqrt(T)
-    
-    if option_type == 'call':
-        price = S*norm.cdf(d1) - K*np.exp(-r*T)*norm.cdf(d2)
-    else:
-        price = K*np.exp(-r*T)*norm.cdf(-d2) - S*norm.cdf(-d1)
-    
-    return price
+    feed = tuple(news_df['link'])
+    visibles = st.session_state.get('noticias_visibles')
+    if visibles is None or visibles[0] != feed:
+        visibles = st.session_state['noticias_visibles'] = (feed, per_page)
+    shown = min(visibles[1], len(news_df))
+
+    columns = st.columns(n_columns)
+    for i, article in enumerate(news_df.head(shown).to_dict('records')):
+        columns[i % n_columns].markdown(news_card_html(article), unsafe_allow_html=True)
+
+    if shown < len(news_df):
+        def load_more():
+            st.session_state['noticias_visibles'] = (feed, shown + per_page)
+
+        st.button(f"Cargar más noticias ({shown} de {len(news_df)})", on_click=load_more)
+
+
+#CALCULADORA DE RIESGO ------------------------------------------------------------------------------------------------------
 
-def calculate_greeks(S, K, T, r, sigma, option_type='call'):
+# Factores de las unidades crudas de util.greeks a las que muestra la app
+UNIDADES_APP = {
+    'theta': 1/365,   # Convertido a días
+    'vega': 1/100,    # Convertido a puntos porcentuales
+    'rho': 1/100,
+    'vanna': 1/100,
+    'volga': 1/100**2,
+    'charm': 1/365,
+}
+
+# Magnitudes que se pueden graficar en el análisis de sensibilidad
+MAGNITUDES_SENSIBILIDAD = {
+    'Precio': 'price',
+    'Delta': 'delta',
+    'Gamma': 'gamma',
+    'Theta': 'theta',
+    'Vega': 'vega',
+    'Rho': 'rho',
+}
+
+
+def calculate_greeks(S, K, T, r, sigma, option_type='call', american=False):
     """
-    Calcula los principales griegos de la opción
+    Calcula el precio y los griegos de la opción en las unidades que muestra la app
+
+    Acepta escalares o arrays (ver util.greeks.bs_greeks). Theta y charm se
+    dan por día; vega, rho y vanna por punto porcentual; volga por punto
+    porcentual de volatilidad al cuadrado.
+
+    Con american=True se valora con el árbol binomial (util.lattice) y solo
+    se devuelven los griegos de primer orden, para un contrato escalar.
     """
-    d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-    d2 = d1 - sigma*np.sqrt(T)
-    
-    # Delta
-    if option_type == 'call':
-        delta = norm.cdf(d1)
-    else:
-        delta = norm.cdf(d1) - 1
-    
-    # Gamma (igual para calls y puts)
-    gamma = norm.pdf(d1)/(S*sigma*np.sqrt(T))
-    
-    # Theta
-    if option_type == 'call':
-        theta = (-S*norm.pdf(d1)*sigma/(2*np.sqrt(T)) - 
-                r*K*np.exp(-r*T)*norm.cdf(d2))
+    if american:
+        greeks = lattice_greeks(S, K, T, r, sigma, option_type)
     else:
-        theta = (-S*norm.pdf(d1)*sigma/(2*np.sqrt(T)) + 
-                r*K*np.exp(-r*T)*norm.cdf(-d2))
-    
-    # Vega (igual para calls y puts)
-    vega = S*np.sqrt(T)*norm.pdf(d1)
-    
-    return {
-        'delta': delta,
-        'gamma': gamma,
-        'theta': theta/365,  # Convertido a días
-        'vega': vega/100    # Convertido a puntos porcentuales
-    }
+        greeks = bs_greeks(S, K, T, r, sigma, option_type)
+    return {name: value * UNIDADES_APP.get(name, 1) for name, value in greeks.items()}
+
+
+PAYOFFS_EXOTICOS = {
+    'Europea': 'european',
+    'Asiática (media aritmética)': 'asian',
+    'Barrera': 'barrier',
+    'Lookback (strike fijo)': 'lookback',
+}
+
+
+@st.cache_data(show_spinner="Simulando trayectorias...")
+def price_exotic(S, K, T, r, sigma, option_type, payoff, n_paths, barrier=None, barrier_type='up-and-out'):
+    """Precio Monte Carlo cacheado por parámetros (semilla fija: mismo resultado en cada rerun)"""
+    return price_monte_carlo(S, K, T, r, sigma, option_type, payoff, n_paths=n_paths,
+                             barrier=barrier, barrier_type=barrier_type, seed=42)
+
 
 def risk_calculator_tab():
+    import plotly.graph_objects as go
+
     st.header("Calculadora de Riesgo para Opciones")
     
     col1, col2 = st.columns(2)
@@ -411,14 +445,19 @@ def risk_calculator_tab():
         r = st.slider("Tasa libre de riesgo (%)", min_value=0.0, max_value=10.0, value=2.5) / 100
         sigma = st.slider("Volatilidad (%)", min_value=1.0, max_value=100.0, value=20.0) / 100
         option_type = st.selectbox("Tipo de opción", ['call', 'put'])
+        exercise_style = st.selectbox("Estilo de ejercicio", ['Europea', 'Americana'])
+        american = exercise_style == 'Americana'
 
-    # Calcular precio y griegos
-    price = black_scholes(S, K, T, r, sigma, option_type)
-    greeks = calculate_greeks(S, K, T, r, sigma, option_type)
+    # Calcular precio y griegos (una sola evaluación de d1/d2, o un lote del árbol si es americana)
+    greeks = calculate_greeks(S, K, T, r, sigma, option_type, american)
+    price = greeks['price']
     
     with col2:
         st.subheader("Resultados")
         st.metric("Precio de la Opción", f"${price:.2f}")
+        if american:
+            premium = price - black_scholes(S, K, T, r, sigma, option_type)
+            st.caption(f"Árbol binomial CRR con extrapolación de Richardson · prima por ejercicio anticipado: ${premium:.4f}")
         
         # Mostrar los griegos
         col_delta, col_gamma = st.columns(2)
@@ -432,7 +471,56 @@ def risk_calculator_tab():
             st.metric("Theta", f"{greeks['theta']:.3f}")
         with col_vega:
             st.metric("Vega", f"{greeks['vega']:.3f}")
-    
+
+        st.metric("Rho", f"{greeks['rho']:.3f}")
+
+        with st.expander("Griegos de segundo orden"):
+            if american:
+                st.info("Disponibles solo para ejercicio europeo (Black-Scholes).")
+            else:
+                col_vanna, col_volga, col_charm = st.columns(3)
+                with col_vanna:
+                    st.metric("Vanna", f"{greeks['vanna']:.4f}")
+                with col_volga:
+                    st.metric("Volga", f"{greeks['volga']:.4f}")
+                with col_charm:
+                    st.metric("Charm", f"{greeks['charm']:.4f}")
+
+        with st.expander("Volatilidad implícita"):
+            market_price = st.number_input("Precio de mercado de la opción ($)", min_value=0.0, value=float(round(price, 2)))
+            iv = implied_volatility(market_price, S, K, T, r, option_type)
+            if iv.converged:
+                st.metric("Volatilidad implícita", f"{iv.sigma * 100:.2f}%")
+                if american:
+                    st.caption("Calculada con el modelo europeo (Black-Scholes).")
+            else:
+                st.warning("El precio está fuera de los límites de no arbitraje para estos parámetros.")
+
+        with st.expander("Opciones exóticas (Monte Carlo)"):
+            payoff_label = st.selectbox("Tipo de payoff", list(PAYOFFS_EXOTICOS))
+            payoff = PAYOFFS_EXOTICOS[payoff_label]
+            barrier, barrier_type = None, 'up-and-out'
+            if payoff == 'barrier':
+                barrier_type = st.selectbox("Tipo de barrera", list(BARRIER_TYPES))
+                default_barrier = S * 1.2 if barrier_type.startswith('up') else S * 0.8
+                barrier = st.number_input("Nivel de la barrera ($)", min_value=0.0, value=float(round(default_barrier, 2)))
+            n_paths = st.select_slider("Número de trayectorias", options=[10_000, 50_000, 100_000, 250_000], value=50_000)
+
+            result = price_exotic(S, K, T, r, sigma, option_type, payoff, n_paths, barrier, barrier_type)
+            col_mc, col_se = st.columns(2)
+            with col_mc:
+                st.metric("Precio Monte Carlo", f"${result.price:.2f}")
+            with col_se:
+                st.metric("Error estándar", f"${result.std_error:.4f}")
+            if result.variance_reduction is None:
+                control = "sin variable de control"
+            else:
+                control = f"variable de control Black-Scholes (reducción de varianza x{result.variance_reduction:.1f})"
+            st.caption(
+                f"IC 95%: ${result.price - 1.96 * result.std_error:.2f} – ${result.price + 1.96 * result.std_error:.2f} · "
+                f"{result.n_paths:,} trayectorias antitéticas · {control} · {result.elapsed:.2f} s"
+            )
+
     # Análisis de sensibilidad
     st.subheader("Análisis de Sensibilidad")
     sensitivity_type = st.selectbox(
@@ -440,31 +528,38 @@ def risk_calculator_tab():
         ['Precio del subyacente', 'Volatilidad', 'Tiempo hasta vencimiento']
     )
     
-    if sensitivity_type == 'Precio del subyacente':
-        prices = np.linspace(S*0.7, S*1.3, 100)
-        values = [black_scholes(p, K, T, r, sigma, option_type) for p in prices]
-        x_label = "Precio del subyacente"
-        x_values = prices
-    elif sensitivity_type == 'Volatilidad':
-        vols = np.linspace(sigma*0.5, sigma*1.5, 100)
-        values = [black_scholes(S, K, T, r, v, option_type) for v in vols]
-        x_label = "Volatilidad"
-        x_values = vols * 100  # Convertir a porcentaje
-    else:
-        times = np.linspace(T*0.1, T*2, 100)
-        values = [black_scholes(S, K, t, r, sigma, option_type) for t in times]
-        x_label = "Días hasta vencimiento"
-        x_values = times * 365  # Convertir a días
-    
+    # Los tres cortes salen de la malla memorizada: cambiar de curva no valora nada,
+    # y al mover un slider solo se recalculan los cortes que dependen de él
+    grid = get_sensitivity_grid(K, r, option_type, sensitivity_bounds(S, K), american)
+    curves = grid.curves(S, sigma, T)
+
+    magnitudes = ['Precio'] if american else list(MAGNITUDES_SENSIBILIDAD)
+    magnitude = st.selectbox("Magnitud a graficar", magnitudes)
+    quantity = MAGNITUDES_SENSIBILIDAD[magnitude]
+
+    axis, x_label, x_scale, x_current = {
+        'Precio del subyacente': ('S', "Precio del subyacente", 1, S),
+        'Volatilidad': ('sigma', "Volatilidad", 100, sigma),  # Convertir a porcentaje
+        'Tiempo hasta vencimiento': ('T', "Días hasta vencimiento", 365, T),  # Convertir a días
+    }[sensitivity_type]
+    x_values = grid.axes[axis] * x_scale
+    values = curves[axis][quantity] * UNIDADES_APP.get(quantity, 1)
+
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x_values, y=values, mode='lines', name='Precio de la opción'))
+    fig.add_trace(go.Scatter(x=x_values, y=values, mode='lines', name=magnitude))
+    fig.add_vline(x=x_current * x_scale, line_dash='dash', line_color='gray')
     fig.update_layout(
         title=f"Sensibilidad al {sensitivity_type}",
         xaxis_title=x_label,
-        yaxis_title="Precio de la opción ($)",
+        yaxis_title=f"{magnitude} de la opción" + (" ($)" if quantity == 'price' else ""),
         hovermode='x'
     )
     st.plotly_chart(fig)
+
+    with st.expander("Superficie de sensibilidad (3D)"):
+        create_sensitivity_surface(S, K, T, r, sigma, option_type)
+        if american:
+            st.caption("Calculada con el modelo europeo (Black-Scholes).")
     
     # Añadir explicaciones
     with st.expander("ℹ️ Explicación de los Griegos"):
@@ -473,6 +568,10 @@ def risk_calculator_tab():
         - **Gamma**: Tasa de cambio del delta
         - **Theta**: Pérdida de valor por día debido al paso del tiempo
         - **Vega**: Cambio en el precio por cada 1% de cambio en la volatilidad
+        - **Rho**: Cambio en el precio por cada 1% de cambio en la tasa libre de riesgo
+        - **Vanna**: Cambio en el delta por cada 1% de cambio en la volatilidad
+        - **Volga**: Cambio en el vega por cada 1% de cambio en la volatilidad
+        - **Charm**: Cambio en el delta por cada día que pasa
         """)
 
 
@@ -489,12 +588,6 @@ def risk_calculator_tab():
 
 
 
-import streamlit as st
-import plotly.graph_objects as go
-import numpy as np
-from scipy.stats import norm
-import plotly.express as px
-
 def create_interactive_visualizations():
     st.header("Visualizaciones Interactivas de Opciones")
     
@@ -659,12 +752,114 @@ def create_strategy_explanation(strategy):
             - Exposición al decay temporal
             - Mejor cuando se espera alta volatilidad
             """
+        },
+        "Iron Condor": {
+            "descripcion": """
+            Un Iron Condor combina un Put Spread vendido y un Call Spread vendido: se venden un put y un call fuera del dinero 
+            y se compran otros dos más alejados como protección. Se cobra una prima neta.
+            """,
+            "cuando_usar": """
+            **¿Cuándo usar esta estrategia?**
+            - Cuando esperas que el precio se mantenga en un rango
+            - Cuando la volatilidad implícita es alta y esperas que baje
+            - Cuando buscas ingresos con riesgo definido
+            """,
+            "caracteristicas": """
+            **Características principales:**
+            - Beneficio máximo: Prima neta cobrada
+            - Pérdida máxima: Distancia entre strikes de un lado - Prima neta
+            - Dos puntos de equilibrio: Strikes vendidos ± Prima neta
+            - Delta: Cerca de cero dentro del rango
+            """,
+            "riesgos": """
+            **Riesgos y consideraciones:**
+            - Pérdida si el precio sale del rango por cualquiera de los lados
+            - Beneficio pequeño frente a la pérdida posible
+            - Cuatro patas: más comisiones y deslizamiento
+            """
+        },
+        "Mariposa": {
+            "descripcion": """
+            Una Mariposa (Butterfly) compra un call de strike bajo, vende dos en el strike central y compra uno de strike alto. 
+            Apuesta a que el precio termine cerca del strike central.
+            """,
+            "cuando_usar": """
+            **¿Cuándo usar esta estrategia?**
+            - Cuando esperas que el precio quede muy cerca de un nivel concreto
+            - Cuando buscas un costo bajo y riesgo definido
+            - Cerca del vencimiento, cuando el decay temporal juega a favor
+            """,
+            "caracteristicas": """
+            **Características principales:**
+            - Beneficio máximo: Distancia entre strikes - Prima neta pagada (en el strike central)
+            - Pérdida máxima: Prima neta pagada
+            - Dos puntos de equilibrio: Strike bajo + Prima neta y Strike alto - Prima neta
+            - Delta: Cerca de cero en el strike central
+            """,
+            "riesgos": """
+            **Riesgos y consideraciones:**
+            - La zona de beneficio es estrecha
+            - El beneficio máximo solo se alcanza cerca del vencimiento
+            - Puede tener problemas de liquidez en los strikes alejados
+            """
+        },
+        "Calendar Spread": {
+            "descripcion": """
+            Un Calendar Spread vende una opción de vencimiento cercano y compra otra del mismo strike con vencimiento más lejano. 
+            Aprovecha que la opción corta pierde valor temporal más rápido que la larga.
+            """,
+            "cuando_usar": """
+            **¿Cuándo usar esta estrategia?**
+            - Cuando esperas que el precio se mantenga cerca del strike a corto plazo
+            - Cuando esperas que suba la volatilidad del vencimiento lejano
+            - Para beneficiarse del decay temporal con riesgo limitado
+            """,
+            "caracteristicas": """
+            **Características principales:**
+            - Beneficio máximo: En el strike al vencimiento de la pata corta (depende de la volatilidad)
+            - Pérdida máxima: Prima neta pagada
+            - Puntos de equilibrio: Dependen del valor temporal de la pata larga
+            - Theta: Positivo cerca del strike
+            """,
+            "riesgos": """
+            **Riesgos y consideraciones:**
+            - Pérdida si el precio se aleja mucho del strike
+            - Sensible a cambios en la volatilidad de cada vencimiento
+            - Hay que gestionar la pata larga tras el primer vencimiento
+            """
+        },
+        "Ratio Spread": {
+            "descripcion": """
+            Un Ratio Spread compra un call y vende dos calls de strike más alto. 
+            Reduce (o elimina) el costo a cambio de quedar vendido en exceso por encima del strike alto.
+            """,
+            "cuando_usar": """
+            **¿Cuándo usar esta estrategia?**
+            - Cuando esperas una subida moderada hasta el strike alto, no más
+            - Cuando la volatilidad implícita de los strikes altos está cara
+            - Cuando quieres una estrategia alcista de bajo costo
+            """,
+            "caracteristicas": """
+            **Características principales:**
+            - Beneficio máximo: Distancia entre strikes + Prima neta (en el strike alto)
+            - Pérdida máxima: Ilimitada si el precio sube mucho
+            - Punto de equilibrio superior: Strike alto + Beneficio máximo
+            - Delta: Se vuelve negativo por encima del strike alto
+            """,
+            "riesgos": """
+            **Riesgos y consideraciones:**
+            - Riesgo ilimitado por la call vendida sin cubrir
+            - Puede requerir margen
+            - Peligroso ante subidas bruscas (gaps)
+            """
         }
     }
     
     return explanations.get(strategy, {})
 
 def create_payoff_diagram():
+    import plotly.graph_objects as go
+
     st.subheader("Diagrama de Payoff para Estrategias de Opciones")
     
     # Parámetros de la estrategia
@@ -673,34 +868,56 @@ def create_payoff_diagram():
     with col1:
         strategy = st.selectbox(
             "Seleccione la estrategia:",
-            ["Call Largo", "Put Largo", "Call Spread", "Put Spread", "Straddle", "Strangle"]
+            list(STRATEGIES)
         )
         
         stock_price = st.number_input("Precio actual del subyacente:", value=100.0)
         strike = st.number_input("Strike Price:", value=100.0)
+        width = st.number_input("Distancia entre strikes:", min_value=0.5, value=10.0)
         
     with col2:
-        premium = st.number_input("Prima de la opción:", value=5.0)
-        if strategy in ["Call Spread", "Put Spread", "Strangle"]:
-            strike2 = st.number_input("Strike Price 2:", value=110.0)
-            premium2 = st.number_input("Prima 2:", value=2.0)
-    
-    # Crear rango de precios para el eje X
-    price_range = np.linspace(stock_price * 0.5, stock_price * 1.5, 100)
-    
-    # Calcular payoff según la estrategia seleccionada
-    if strategy == "Call Largo":
-        payoff = np.maximum(price_range - strike, 0) - premium
-    elif strategy == "Put Largo":
-        payoff = np.maximum(strike - price_range, 0) - premium
-    elif strategy == "Call Spread":
-        payoff = (np.maximum(price_range - strike, 0) - premium) - (np.maximum(price_range - strike2, 0) - premium2)
-    elif strategy == "Put Spread":
-        payoff = (np.maximum(strike - price_range, 0) - premium) - (np.maximum(strike2 - price_range, 0) - premium2)
-    elif strategy == "Straddle":
-        payoff = np.maximum(price_range - strike, 0) + np.maximum(strike - price_range, 0) - (2 * premium)
-    else:  # Strangle
-        payoff = np.maximum(price_range - strike2, 0) + np.maximum(strike - price_range, 0) - (premium + premium2)
+        days = st.slider("Días hasta vencimiento:", min_value=1, max_value=365, value=90)
+        sigma = st.slider("Volatilidad (%):", min_value=1.0, max_value=100.0, value=25.0) / 100
+        r = st.slider("Tasa libre de riesgo (%):", min_value=0.0, max_value=10.0, value=2.5) / 100
+        elapsed = st.slider("Días transcurridos (P&L antes del vencimiento):", min_value=0, max_value=days, value=0)
+
+    # Patas de la estrategia: el preset con primas teóricas, editable para armar cualquier posición
+    legs = price_legs(preset_legs(strategy, strike, width, days / 365), stock_price, r, sigma)
+    st.markdown("**Patas de la estrategia** (edita, añade o elimina filas)")
+    edited = st.data_editor(
+        pd.DataFrame({
+            'Tipo': [leg.option_type for leg in legs],
+            'Lado': [leg.side for leg in legs],
+            'Strike': [leg.strike for leg in legs],
+            'Cantidad': [leg.quantity for leg in legs],
+            'Vencimiento (días)': [round(leg.expiry * 365) for leg in legs],
+            'Prima': [round(leg.premium, 2) for leg in legs],
+        }),
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            'Tipo': st.column_config.SelectboxColumn(options=['call', 'put'], required=True),
+            'Lado': st.column_config.SelectboxColumn(options=list(SIDES), required=True),
+            'Strike': st.column_config.NumberColumn(min_value=0.0, required=True),
+            'Cantidad': st.column_config.NumberColumn(min_value=0.0, required=True),
+            'Vencimiento (días)': st.column_config.NumberColumn(min_value=1, step=1, required=True),
+            'Prima': st.column_config.NumberColumn(min_value=0.0, format="%.2f", required=True),
+        },
+    ).dropna()
+    legs = [
+        Leg(row['Tipo'], row['Lado'], float(row['Strike']), float(row['Cantidad']), row['Vencimiento (días)'] / 365, float(row['Prima']))
+        for _, row in edited.iterrows()
+    ]
+    if not legs:
+        st.info("Añade al menos una pata para ver el diagrama.")
+        return
+
+    # Toda la matriz precios x patas en una sola pasada
+    matrix = LegMatrix.from_legs(legs)
+    price_range = np.linspace(stock_price * 0.5, stock_price * 1.5, 1000)
+    payoff = expiry_pnl(matrix, price_range, r, sigma)
+    analysis = analyze_strategy(matrix, r, sigma)
+    first_expiry = float(matrix.expiry.min())
     
     # Crear gráfico con Plotly
     fig = go.Figure()
@@ -710,12 +927,25 @@ def create_payoff_diagram():
         x=price_range,
         y=payoff,
         mode='lines',
-        name='Payoff',
+        name='Payoff al vencimiento',
         line=dict(color='blue')
     ))
+
+    # P&L hoy (o tras los días transcurridos) valorando las patas con Black-Scholes
+    if elapsed / 365 < first_expiry:
+        fig.add_trace(go.Scatter(
+            x=price_range,
+            y=strategy_pnl(matrix, price_range, elapsed / 365, r, sigma),
+            mode='lines',
+            name=f'P&L a {elapsed} días',
+            line=dict(color='orange', dash='dot')
+        ))
     
     # Añadir línea de breakeven
     fig.add_hline(y=0, line_dash="dash", line_color="red")
+    for breakeven in analysis.breakevens:
+        if price_range[0] <= breakeven <= price_range[-1]:
+            fig.add_vline(x=breakeven, line_dash="dot", line_color="gray")
     
     # Personalizar el diseño
     fig.update_layout(
@@ -727,6 +957,16 @@ def create_payoff_diagram():
     )
     
     st.plotly_chart(fig, use_container_width=True)
+
+    col_profit, col_loss, col_breakeven = st.columns(3)
+    with col_profit:
+        st.metric("Beneficio máximo", "Ilimitado" if np.isinf(analysis.max_profit) else f"${analysis.max_profit:.2f}")
+    with col_loss:
+        st.metric("Pérdida máxima", "Ilimitada" if np.isinf(analysis.max_loss) else f"${-analysis.max_loss:.2f}")
+    with col_breakeven:
+        st.metric("Puntos de equilibrio", ", ".join(f"${b:.2f}" for b in analysis.breakevens) or "Ninguno")
+    if not analysis.analytic:
+        st.caption("Patas con distintos vencimientos: resultados al primer vencimiento, calculados numéricamente.")
     
     # Mostrar explicación de la estrategia
     st.markdown("---")
@@ -759,7 +999,11 @@ def create_payoff_diagram():
             "Call Spread": {"riesgo": 0.3, "potencial": 0.5},
             "Put Spread": {"riesgo": 0.3, "potencial": 0.5},
             "Straddle": {"riesgo": 0.7, "potencial": 0.8},
-            "Strangle": {"riesgo": 0.6, "potencial": 0.8}
+            "Strangle": {"riesgo": 0.6, "potencial": 0.8},
+            "Iron Condor": {"riesgo": 0.3, "potencial": 0.3},
+            "Mariposa": {"riesgo": 0.2, "potencial": 0.6},
+            "Calendar Spread": {"riesgo": 0.3, "potencial": 0.4},
+            "Ratio Spread": {"riesgo": 0.8, "potencial": 0.5}
         }
         
         r_r = risk_reward.get(strategy, {"riesgo": 0.5, "potencial": 0.5})
@@ -1061,95 +1305,336 @@ def display_option_price_factors():
 
 
 #ANÁLISIS DE SENISIBLIIDAD-------------------------------------------------------------------------------------------------------------------------
-def create_sensitivity_analysis():
-    st.subheader("Análisis de Sensibilidad")
-    
-    # Parámetros
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        factor = st.selectbox(
-            "Factor a analizar:",
-            ["Volatilidad", "Tiempo", "Tasa de Interés"]
-        )
-        option_type = st.selectbox("Tipo de Opción:", ["Call", "Put"])
-        
-    with col2:
-        stock_price = st.number_input("Precio del subyacente:", value=100.0)
-        strike = st.number_input("Strike:", value=100.0)
-    
-    # Crear gráfico 3D
-    if factor == "Volatilidad":
-        x = np.linspace(0.1, 0.5, 20)  # Volatilidad
-        y = np.linspace(stock_price * 0.7, stock_price * 1.3, 20)  # Precio
-        X, Y = np.meshgrid(x, y)
-        Z = np.zeros_like(X)
-        
-        for i in range(len(x)):
-            for j in range(len(y)):
-                Z[j,i] = black_scholes(Y[j,i], strike, 0.25, 0.02, X[i], option_type.lower())
-        
-        fig = go.Figure(data=[go.Surface(x=X*100, y=Y, z=Z)])
+def create_sensitivity_surface(S, K, T, r, sigma, option_type):
+    """
+    Precio de la opción sobre una malla (factor, precio del subyacente)
+
+    Los factores que no se grafican toman los valores de la calculadora.
+    Primero se pinta una malla gruesa y luego la de alta resolución en el
+    mismo hueco.
+    """
+    import plotly.graph_objects as go
+
+    factor = st.selectbox("Factor a analizar:", list(SURFACE_FACTORS))
+    _, _, _, x_scale, x_title = SURFACE_FACTORS[factor]
+    params = (factor, S, K, option_type)
+    fixed = {'sigma': sigma, 'T': T, 'r': r}
+    refinadas = st.session_state.setdefault('superficies_refinadas', set())
+    placeholder = st.empty()
+
+    def draw(n_points):
+        x, y, Z = sensitivity_surface(*params, n_points, fixed)
+        fig = go.Figure(data=[go.Surface(x=x * x_scale, y=y, z=Z)])
         fig.update_layout(
             title='Superficie de Sensibilidad',
             scene = dict(
-                xaxis_title='Volatilidad (%)',
+                xaxis_title=x_title,
                 yaxis_title='Precio del Subyacente',
                 zaxis_title='Precio de la Opción'
             )
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        placeholder.plotly_chart(fig, use_container_width=True)
+
+    # La gruesa llega al navegador antes de calcular y enviar la fina; si la fina
+    # ya se dibujó en esta sesión (está en caché) se pinta directamente
+    key = (*params, tuple(fixed.values()))
+    if key not in refinadas:
+        draw(COARSE_POINTS)
+    draw(FINE_POINTS)
+    refinadas.add(key)
+
+def create_volatility_surface(offline=False):
+    import plotly.graph_objects as go
 
-def create_volatility_surface():
     st.subheader("Superficie de Volatilidad Implícita")
-    
-    # Generar datos de ejemplo para la superficie de volatilidad
-    strikes = np.linspace(80, 120, 20)
-    times = np.linspace(0.1, 1, 20)
+
+    offline = st.checkbox("Usar cadena de ejemplo (sin conexión)", value=offline)
+    if offline:
+        ticker = st.selectbox("Ticker de ejemplo:", fixture_tickers(), key="vol_surface_fixture")
+        if ticker is None:
+            st.info(f"No hay cadenas de ejemplo en {FIXTURES_DIR}")
+            return
+        source = get_chain_source(ticker, offline=True)
+        origen = ("sintética (sonrisa SVI valorada con Black-Scholes)" if source.source.startswith("synthetic")
+                  else "grabada de Yahoo Finance")
+        st.caption(f"Cadena de ejemplo {origen}, del {source.as_of:%Y-%m-%d}.")
+    else:
+        ticker = st.text_input("Ticker para la superficie de volatilidad:", "", key="vol_surface_ticker").upper()
+    if not ticker:
+        st.info("👆 Ingresa un ticker con opciones listadas (ej. SPY) para construir su superficie")
+        return
+
+    try:
+        with st.spinner(f"Ajustando la superficie de {ticker}..."):
+            surface = build_vol_surface(ticker, offline=offline)
+    except Exception as e:
+        st.error(f"No se pudo construir la superficie para {ticker}: {e}")
+        return
+
+    # Superficie ajustada (SVI por vencimiento) evaluada sobre una malla strike x plazo
+    strikes = np.linspace(surface.spot * 0.7, surface.spot * 1.3, 40)
+    times = np.linspace(surface.fits[0].T, surface.fits[-1].T, 40)
     X, Y = np.meshgrid(strikes, times)
-    
-    # Crear una superficie de volatilidad sintética
-    Z = 0.2 + 0.1 * np.exp(-((X - 100)**2)/1000) + 0.05 * np.exp(-((Y - 0.5)**2)/0.1)
-    
-    fig = go.Figure(data=[go.Surface(x=X, y=Y*252, z=Z*100)])
+    Z = surface.vol(X, Y)
+
+    fig = go.Figure(data=[go.Surface(x=X, y=Y*365, z=Z*100)])
     fig.update_layout(
-        title='Superficie de Volatilidad Implícita',
+        title=f'Superficie de Volatilidad Implícita - {ticker}',
         scene = dict(
             xaxis_title='Strike Price',
             yaxis_title='Días al Vencimiento',
             zaxis_title='Volatilidad Implícita (%)'
         )
     )
-    
+
     st.plotly_chart(fig, use_container_width=True)
 
-def black_scholes(S, K, T, r, sigma, option_type='call'):
+    st.dataframe(pd.DataFrame({
+        'Vencimiento': [f.expiry for f in surface.fits],
+        'Días': [round(f.T * 365) for f in surface.fits],
+        'Cotizaciones': [f.n_quotes for f in surface.fits],
+        'Vol ATM (%)': [float(surface.vol(f.forward, f.T)) * 100 for f in surface.fits],
+        'Error RMSE (vol)': [f.rmse for f in surface.fits],
+    }), hide_index=True)
+
+
+
+
+
+
+
+
+#EVALUADOR DE POSICIONES ---------------------------------------------------------------------------------------
+
+# Columnas de la cartera que se pueden editar en la tabla (el resto se muestra de solo lectura)
+COLUMNAS_EDITABLES = ['quantity', 'spot', 'volatility']
+
+
+def get_sectors():
     """
-    Calcula el precio de una opción usando el modelo Black-Scholes
-    
-    Parámetros:
-    S: Precio actual del activo
-    K: Precio de ejercicio
-    T: Tiempo hasta vencimiento (en años)
-    r: Tasa libre de riesgo
-    sigma: Volatilidad
-    option_type: 'call' o 'put'
+    Sector de cada ticker según el screener ya cargado, o None
+
+    No descarga ni espera a Finviz: usa la versión que tenga la caché (la de
+    otra sesión o la última foto en disco, ver seed_from_snapshot). Sin ella
+    la cartera usa su propia columna sector.
     """
-    d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-    d2 = d1 - sigma*np.sqrt(T)
-    
-    if option_type == 'call':
-        price = S*norm.cdf(d1) - K*np.exp(-r*T)*norm.cdf(d2)
-    else:
-        price = K*np.exp(-r*T)*norm.cdf(-d2) - S*norm.cdf(-d1)
-    
-    return price
+    entry = get_screener_cache().peek('')
+    return None if entry is None else entry[1]['Sector']
+
+
+def create_portfolio_view():
+    import plotly.graph_objects as go
 
+    st.subheader("Evaluador de Posiciones")
+    st.write("Carga tu cartera (CSV o Parquet) con las columnas: " + ", ".join(COLUMNAS_REQUERIDAS) + ".")
 
+    col1, col2 = st.columns(2)
+    with col1:
+        uploaded = st.file_uploader("Fichero de posiciones", type=['csv', 'parquet'])
+        use_sample = uploaded is None and st.checkbox("Usar cartera de ejemplo", value=False)
+    with col2:
+        valuation_date = st.date_input("Fecha de valoración", value=pd.Timestamp.today().date())
+        r = st.slider("Tasa libre de riesgo (%)", min_value=0.0, max_value=10.0, value=2.5, key="portfolio_rate") / 100
+
+    if uploaded is None and not use_sample:
+        st.info("👆 Sube un fichero de posiciones o usa la cartera de ejemplo")
+        st.session_state.pop('portfolio', None)
+        st.session_state.pop('portfolio_key', None)
+        return
+
+    # La cartera vive en la sesión: solo se revalora entera si cambia el fichero, la fecha o la tasa
+    source = uploaded if uploaded is not None else PORTFOLIO_EJEMPLO
+    key = (getattr(uploaded, 'file_id', PORTFOLIO_EJEMPLO), valuation_date, r)
+    if st.session_state.get('portfolio_key') != key:
+        try:
+            st.session_state['portfolio'] = Portfolio.from_file(source, valuation_date, r)
+        except Exception as e:
+            st.error(f"No se pudo leer la cartera: {e}")
+            return
+        st.session_state['portfolio_key'] = key
+    portfolio = st.session_state['portfolio']
+
+    totals = portfolio.totals()
+    cols = st.columns(5)
+    for col, (label, metric) in zip(cols, [("Valor", 'value'), ("Delta $", 'dollar_delta'), ("Gamma $ (1%)", 'dollar_gamma'),
+                                           ("Vega $ (1 pto)", 'dollar_vega'), ("Theta $ (día)", 'dollar_theta')]):
+        with col:
+            st.metric(label, f"${totals[metric]:,.0f}")
+
+    tab_underlying, tab_sector, tab_positions, tab_var = st.tabs(["Por subyacente", "Por sector", "Posiciones", "VaR"])
+
+    with tab_underlying:
+        by_underlying = portfolio.by_underlying()
+        fig = go.Figure(go.Bar(x=by_underlying.index, y=by_underlying['dollar_delta'], name='Delta $'))
+        fig.update_layout(title="Delta en dólares por subyacente", xaxis_title="Subyacente", yaxis_title="Delta $")
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(by_underlying.style.format("{:,.0f}"), use_container_width=True)
+
+    with tab_sector:
+        sectors = get_sectors() if st.checkbox("Sectores desde Finviz", value=True) else None
+        if sectors is None:
+            st.caption("Sectores del fichero de posiciones (el screener de Finviz aún no está cargado o está desactivado).")
+        st.dataframe(portfolio.by_sector(sectors).style.format("{:,.0f}"), use_container_width=True)
+
+    with tab_positions:
+        # Editar una fila solo revalora esa posición y ajusta los totales de su subyacente
+        view = portfolio.positions.join(portfolio.exposures.drop(columns='underlying'))
+        edited = st.data_editor(
+            view,
+            disabled=[col for col in view.columns if col not in COLUMNAS_EDITABLES],
+            use_container_width=True,
+        )
+        changed = (edited[COLUMNAS_EDITABLES] != view[COLUMNAS_EDITABLES]).any(axis=1)
+        if changed.any():
+            for position_id, row in edited.loc[changed, COLUMNAS_EDITABLES].iterrows():
+                portfolio.upsert(position_id, **row.to_dict())
+            st.rerun()
+        st.caption(f"Posiciones valoradas desde la carga: {portfolio.repriced:,}")
+
+    with tab_var:
+        create_var_view(portfolio, offline_default=uploaded is None)
+
+
+METODOS_VAR = {
+    'Paramétrico (delta-gamma)': 'parametric',
+    'Simulación histórica': 'historical',
+    'Monte Carlo (revaluación completa)': 'monte_carlo',
+}
+
+
+def create_var_view(portfolio, offline_default=False):
+    import plotly.graph_objects as go
+
+    col1, col2 = st.columns(2)
+    with col1:
+        method_label = st.selectbox("Método", list(METODOS_VAR))
+        confidence = st.select_slider("Nivel de confianza", options=[0.95, 0.975, 0.99], value=0.99,
+                                      format_func=lambda c: f"{c:.1%}")
+    with col2:
+        horizon = st.slider("Horizonte (días hábiles)", min_value=1, max_value=20, value=1)
+        n_scenarios = st.select_slider("Escenarios Monte Carlo", options=[1_000, 5_000, 10_000, 50_000], value=10_000)
+        offline = st.checkbox("Usar históricos de ejemplo (sin conexión)", value=offline_default)
+        n_workers = st.number_input("Procesos", min_value=1, max_value=os.cpu_count() or 1,
+                                    value=min(4, os.cpu_count() or 1), key="var_workers")
+
+    # El resultado solo se muestra mientras la cartera y los parámetros sean los del cálculo
+    # (el número de procesos no cambia el resultado)
+    key = (st.session_state.get('portfolio_key'), portfolio.version, method_label, confidence, horizon, n_scenarios,
+           offline)
+    if st.button("Calcular VaR"):
+        try:
+            with st.spinner("Revalorando la cartera..."):
+                st.session_state['var_result'] = (key, portfolio_var(
+                    portfolio, METODOS_VAR[method_label], confidence, horizon, n_scenarios, offline=offline,
+                    n_workers=int(n_workers), seed=0))
+        except Exception as e:
+            st.error(f"No se pudo calcular el VaR: {e}")
+
+    stored = st.session_state.get('var_result')
+    if stored is None or stored[0] != key:
+        return
+    result = stored[1]
+
+    col_var, col_es = st.columns(2)
+    with col_var:
+        st.metric(f"VaR {result.confidence:.1%} a {result.horizon_days} días", f"${result.var:,.0f}")
+    with col_es:
+        st.metric("Expected Shortfall", f"${result.es:,.0f}")
+    detalle = f"{result.n_scenarios:,} escenarios · " if result.n_scenarios else ""
+    st.caption(f"Método: {result.method} · {detalle}{result.elapsed * 1000:,.0f} ms")
+
+    if result.pnl is not None:
+        fig = go.Figure(go.Histogram(x=result.pnl, nbinsx=100, name='P&L'))
+        fig.add_vline(x=-result.var, line_dash="dash", line_color="red")
+        fig.update_layout(title="Distribución de P&L", xaxis_title="P&L ($)", yaxis_title="Escenarios")
+        st.plotly_chart(fig, use_container_width=True)
+
+
+#SIMULADOR DE ESCENARIOS ---------------------------------------------------------------------------------------
+
+def scenario_heatmap(spot_shocks, vol_shocks, pnl, rate_shock):
+    """Mapa de calor del P&L (volatilidad x spot) para un shock de tasa"""
+    import plotly.graph_objects as go
 
+    limit = np.nanmax(np.abs(pnl)) if np.isfinite(pnl).any() else 1.0
+    fig = go.Figure(go.Heatmap(
+        x=[f"{s:+.0%}" for s in spot_shocks],
+        y=[f"{v * 100:+.0f} pts" for v in vol_shocks],
+        z=pnl.T,
+        zmin=-limit, zmax=limit, zmid=0,
+        colorscale='RdYlGn',
+        colorbar=dict(title="P&L ($)"),
+        hovertemplate="Spot %{x}<br>Vol %{y}<br>P&L $%{z:,.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"P&L por escenario (tasa {rate_shock * 100:+.2f} pts)",
+        xaxis_title="Shock del subyacente",
+        yaxis_title="Shock de volatilidad",
+    )
+    return fig
 
 
+def create_scenario_view():
+    st.subheader("Simulador de Escenarios")
+    portfolio = st.session_state.get('portfolio')
+    if portfolio is None:
+        st.info("Carga una cartera en el Evaluador de Posiciones para simular escenarios")
+        return
+    st.write("Revalora todas las posiciones de la cartera bajo cada combinación de shocks de spot, volatilidad y tasa.")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        spot_range = st.slider("Shock de spot (%)", min_value=-50, max_value=50, value=(-30, 30))
+        spot_steps = st.slider("Puntos de spot", min_value=3, max_value=41, value=13)
+    with col2:
+        vol_range = st.slider("Shock de volatilidad (pts)", min_value=-20, max_value=50, value=(-10, 20))
+        vol_steps = st.slider("Puntos de volatilidad", min_value=3, max_value=31, value=7)
+    with col3:
+        rate_shocks = st.multiselect("Shocks de tasa (pts)", options=[-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0],
+                                     default=[-1.0, 0.0, 1.0])
+        horizon = st.slider("Horizonte (días)", min_value=0, max_value=90, value=0, key="scenario_horizon")
+        n_workers = st.number_input("Procesos", min_value=1, max_value=os.cpu_count() or 1,
+                                    value=min(4, os.cpu_count() or 1))
+
+    rate_shocks = sorted(rate_shocks) or [0.0]
+    rate_shown = st.select_slider("Tasa a mostrar (pts)", options=rate_shocks,
+                                  value=0.0 if 0.0 in rate_shocks else rate_shocks[0])
+
+    spot_shocks = np.linspace(*spot_range, spot_steps) / 100
+    vol_shocks = np.linspace(*vol_range, vol_steps) / 100
+    rates = np.array(rate_shocks) / 100
+    shape = (len(spot_shocks), len(vol_shocks), len(rates))
+    key = (st.session_state.get('portfolio_key'), portfolio.version, spot_range, spot_steps, vol_range, vol_steps,
+           tuple(rate_shocks), horizon)
+
+    chart = st.empty()
+    run = st.button("Simular escenarios")
+    if run:
+        scenarios = scenario_grid(spot_shocks, vol_shocks, rates)
+        pnl = np.full(len(scenarios), np.nan)
+        progress = st.progress(0.0)
+        done = 0
+        # Se pinta cada bloque según llega: el mapa se va rellenando
+        for start, stop, chunk in stream_scenarios(portfolio.arrays(), scenarios, horizon / 365,
+                                                    n_workers=int(n_workers)):
+            pnl[start:stop] = chunk
+            done += stop - start
+            progress.progress(done / len(scenarios), text=f"{done:,} de {len(scenarios):,} escenarios")
+            chart.plotly_chart(scenario_heatmap(spot_shocks, vol_shocks, pnl.reshape(shape)[:, :, rate_shocks.index(rate_shown)],
+                                                rate_shown / 100), use_container_width=True)
+        st.session_state['scenario_result'] = (key, pnl.reshape(shape))
+
+    result = st.session_state.get('scenario_result')
+    if result is None or result[0] != key:
+        return
+    pnl = result[1]
+    if not run:  # recién simulado, el último bloque ya dejó el mapa completo
+        chart.plotly_chart(scenario_heatmap(spot_shocks, vol_shocks, pnl[:, :, rate_shocks.index(rate_shown)],
+                                            rate_shown / 100), use_container_width=True)
+    worst = np.unravel_index(np.argmin(pnl), pnl.shape)
+    st.caption(f"{pnl.size:,} escenarios x {len(portfolio.positions):,} posiciones · peor escenario: spot "
+               f"{spot_shocks[worst[0]]:+.0%}, vol {vol_shocks[worst[1]] * 100:+.0f} pts, tasa "
+               f"{rates[worst[2]] * 100:+.2f} pts → ${pnl[worst]:,.0f}")
 
 
 #EXPLICACIÓN MATRIZ --------------------------------------------------------------------------------------------
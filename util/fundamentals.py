@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+from cachetools import TTLCache
+
+from util.fetch_util import RecordedFetcher, fetch_concurrently
+
+# Los fundamentales cambian poco durante el día: segundos hasta volver a pedirlos
+TTL_FUNDAMENTALES = 6 * 60 * 60
+# Tickers en memoria; al pasar de aquí se descarta el menos usado
+MAX_TICKERS_FUNDAMENTALES = 512
+MAX_WORKERS_FUNDAMENTALES = 8
+
+# Segundo nivel en disco que sobrevive a los reinicios (None para desactivarlo)
+FUNDAMENTALS_DB = "data/cache/fundamentals.sqlite"
+
+# Respuestas grabadas para trabajar sin conexión (ver benchmarks/record_fundamentals.py)
+FUNDAMENTALS_FIXTURE = "data/fixtures/fundamentals_sample.json"
+
+
+def yfinance_info(ticker):
+    """yf.Ticker(ticker).info: una de las llamadas más lentas de yfinance"""
+    import yfinance as yf  # Necesitas instalar esto: pip install yfinance
+
+    info = yf.Ticker(ticker).info
+    if not info:
+        raise LookupError(f"Sin información para {ticker}")
+    return info
+
+
+class RecordedInfo(RecordedFetcher):
+    """Sustituto de yfinance_info que devuelve fichas grabadas en JSON ({ticker: info})"""
+    campo = "info"
+    fixture = FUNDAMENTALS_FIXTURE
+
+    def copy(self, info):
+        return dict(info)
+
+    def missing(self, ticker):
+        raise LookupError(f"Sin información para {ticker}")
+
+
+class FundamentalsCache:
+    """
+    Fichas de yfinance (info) por ticker con dos niveles de caché.
+
+    - Memoria: TTL y, al llenarse, se descarta el ticker usado hace más tiempo.
+    - Disco (opcional): SQLite en `db_path`, para no volver a pedir todo al
+      reiniciar la app. Solo se usa si la ficha guardada no ha caducado.
+
+    `stats()` devuelve los aciertos de cada nivel y las descargas, para
+    ajustar el TTL y el tamaño. Las fichas se comparten entre sesiones: no
+    modificarlas.
+    """
+
+    def __init__(self, fetcher=yfinance_info, ttl=TTL_FUNDAMENTALES, max_tickers=MAX_TICKERS_FUNDAMENTALES,
+                 db_path=None, max_workers=MAX_WORKERS_FUNDAMENTALES, clock=time.time):
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self._clock = clock
+        self._memory = TTLCache(max_tickers, ttl, timer=clock)  # ticker -> (fetched_at, info)
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.errors = {}
+        self.hits = self.disk_hits = self.misses = 0
+        self._db = None
+        if db_path is not None:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fundamentals (ticker TEXT PRIMARY KEY, fetched_at REAL, info TEXT)")
+            self._db.commit()
+
+    def _fresh(self, fetched_at):
+        return self._clock() - fetched_at < self.ttl
+
+    def _cached(self, ticker):
+        # Llamar con self._lock tomado
+        entry = self._memory.get(ticker)
+        if entry is not None and self._fresh(entry[0]):
+            self.hits += 1
+            return entry[1]
+        if self._db is not None:
+            row = self._db.execute("SELECT fetched_at, info FROM fundamentals WHERE ticker = ?", (ticker,)).fetchone()
+            if row is not None and self._fresh(row[0]):
+                self.disk_hits += 1
+                info = json.loads(row[1])
+                self._memory[ticker] = (row[0], info)
+                return info
+        return None
+
+    def _store(self, ticker, info):
+        # Llamar con self._lock tomado
+        fetched_at = self._clock()
+        self._memory[ticker] = (fetched_at, info)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?)",
+                             (ticker, fetched_at, json.dumps(info, default=str)))
+            self._db.commit()
+
+    def get(self, ticker):
+        """Ficha de un ticker; si no está en caché se descarga (y propaga el error de la descarga)"""
+        ticker = ticker.strip().upper()
+        with self._lock:
+            info = self._cached(ticker)
+            if info is not None:
+                return info
+            self.misses += 1
+        info = self._fetcher(ticker)
+        with self._lock:
+            self._store(ticker, info)
+        return info
+
+    def prefetch(self, tickers):
+        """
+        Fichas de varios tickers: {ticker: info}
+
+        Los que no están en caché se descargan en paralelo; los que fallan
+        quedan en `errors` y no aparecen en el resultado.
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        with self._lock:
+            result = {t: info for t in tickers if (info := self._cached(t)) is not None}
+            missing = [t for t in tickers if t not in result]
+            self.misses += len(missing)
+        if not missing:
+            return result
+
+        fetched, failed = fetch_concurrently(self._fetcher, missing, self.max_workers, "fundamentals")
+        with self._lock:
+            self.errors.update(failed)
+            for ticker, info in fetched.items():
+                self.errors.pop(ticker, None)
+                self._store(ticker, info)
+                result[ticker] = info
+        return {t: result[t] for t in tickers if t in result}
+
+    def stats(self):
+        """Aciertos en memoria y en disco, descargas y tasa de acierto"""
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / total if total else 0.0,
+                'in_memory': len(self._memory),
+            }
+
+
+@st.cache_resource
+def get_fundamentals_cache(offline=False):
+    """Caché de fundamentales compartida por todas las sesiones (offline: fichas de FUNDAMENTALS_FIXTURE, sin disco)"""
+    if offline:
+        return FundamentalsCache(RecordedInfo.from_fixture())
+    return FundamentalsCache(yfinance_info, db_path=FUNDAMENTALS_DB)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from util.normal import norm_cdf, norm_pdf
+from util.pricing import _as_output, d1_d2, prepare_inputs
+
+GREEKS = ('price', 'delta', 'gamma', 'theta', 'vega', 'rho', 'vanna', 'volga', 'charm')
+
+
+def bs_greeks(S, K, T, r, sigma, option_type='call'):
+    """
+    Calcula precio y griegos Black-Scholes para arrays de contratos
+
+    Una sola evaluación de d1/d2 y de N(d1), N(d2), n(d1) alimenta todas las
+    sensibilidades. Las entradas admiten escalares o arrays (con broadcast),
+    igual que black_scholes.
+
+    Parámetros:
+    S: Precio actual del activo
+    K: Precio de ejercicio
+    T: Tiempo hasta vencimiento (en años)
+    r: Tasa libre de riesgo
+    sigma: Volatilidad
+    option_type: 'call' o 'put' (o array de tipos / array booleano, True = call)
+
+    Returns:
+        dict: price, delta, gamma, theta, vega, rho, vanna, volga, charm en
+        unidades "crudas": theta y charm por año (paso del tiempo), vega,
+        vanna y volga por 1.0 de volatilidad y rho por 1.0 de tasa.
+
+    Con T -> 0 o sigma -> 0 se usan los límites del valor intrínseco sobre el
+    forward descontado: delta 0/1, gamma, vega, vanna, volga y charm nulos.
+    """
+    S, K, T, r, sigma, call = prepare_inputs(S, K, T, r, sigma, option_type)
+    d1, d2, vol, degenerate = d1_d2(S, K, T, r, sigma)
+
+    discount = np.exp(-r * T)
+    discounted_K = K * discount
+    in_the_money = (S > discounted_K).astype(float)
+
+    cdf_d1 = np.where(degenerate, in_the_money, norm_cdf(d1))
+    cdf_d2 = np.where(degenerate, in_the_money, norm_cdf(d2))
+    pdf_d1 = np.where(degenerate, 0.0, norm_pdf(d1))
+
+    # Denominadores seguros: en los puntos degenerados el resultado se anula con pdf_d1 = 0
+    safe_vol = np.where(degenerate, 1.0, vol)
+    safe_sigma = np.where(degenerate, 1.0, sigma)
+    safe_T = np.where(degenerate, 1.0, T)
+    sqrt_T = np.sqrt(T)
+
+    call_price = S * cdf_d1 - discounted_K * cdf_d2
+    put_price = call_price - S + discounted_K  # paridad put-call
+    price = np.where(call, call_price, put_price)
+
+    delta = np.where(call, cdf_d1, cdf_d1 - 1.0)
+    gamma = np.where(degenerate, 0.0, pdf_d1 / (S * safe_vol))
+    vega = S * pdf_d1 * sqrt_T
+
+    decay = -S * pdf_d1 * sigma / (2 * np.where(degenerate, 1.0, sqrt_T))
+    theta = np.where(call, decay - r * discounted_K * cdf_d2, decay + r * discounted_K * (1.0 - cdf_d2))
+    rho = np.where(call, K * T * discount * cdf_d2, -K * T * discount * (1.0 - cdf_d2))
+
+    vanna = np.where(degenerate, 0.0, -pdf_d1 * d2 / safe_sigma)
+    volga = np.where(degenerate, 0.0, vega * d1 * d2 / safe_sigma)
+    charm = np.where(degenerate, 0.0, -pdf_d1 * (2 * r * T - d2 * vol) / (2 * safe_T * safe_vol))
+
+    return {
+        'price': _as_output(price),
+        'delta': _as_output(delta),
+        'gamma': _as_output(gamma),
+        'theta': _as_output(theta),
+        'vega': _as_output(vega),
+        'rho': _as_output(rho),
+        'vanna': _as_output(vanna),
+        'volga': _as_output(volga),
+        'charm': _as_output(charm),
+    }
@@ -0,0 +1,176 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from util.greeks import bs_greeks
+from util.normal import norm_cdf
+from util.pricing import prepare_inputs
+
+# Código del método con el que se resolvió cada punto
+SIN_SOLUCION = 0
+NEWTON = 1
+BRENT = 2
+FUERA_DE_LIMITES = 3
+METODOS = {SIN_SOLUCION: 'sin_solucion', NEWTON: 'newton', BRENT: 'brent', FUERA_DE_LIMITES: 'fuera_de_limites'}
+
+# Intervalo de búsqueda de la volatilidad
+SIGMA_MIN = 1e-6
+SIGMA_MAX = 10.0
+
+
+@dataclass
+class ImpliedVolResult:
+    """
+    Resultado de implied_volatility, un valor por cotización.
+
+    sigma: volatilidad implícita (NaN si no se pudo resolver)
+    converged: True si |precio modelo - precio mercado| <= tol
+    method: código del método (NEWTON, BRENT, FUERA_DE_LIMITES, SIN_SOLUCION)
+    iterations: iteraciones de Newton usadas (también las previas a pasar a Brent)
+    residual: |precio modelo - precio mercado| en la solución
+    """
+    sigma: np.ndarray
+    converged: np.ndarray
+    method: np.ndarray
+    iterations: np.ndarray
+    residual: np.ndarray
+
+    def summary(self):
+        """Diagnóstico de convergencia: puntos por método, iteraciones y residuo máximo"""
+        resumen = {'total': int(self.sigma.size)}
+        for codigo, nombre in METODOS.items():
+            resumen[nombre] = int(np.count_nonzero(self.method == codigo))
+        newton = self.method == NEWTON
+        resumen['iteraciones_newton_media'] = float(self.iterations[newton].mean()) if newton.any() else 0.0
+        resumen['iteraciones_newton_max'] = int(self.iterations[newton].max()) if newton.any() else 0
+        resumen['residuo_max'] = float(np.nanmax(self.residual)) if self.converged.any() else float('nan')
+        return resumen
+
+
+def _initial_guess(S, K, T, r):
+    """
+    Punto de inflexión del precio en sigma, sqrt(2|ln(F/K)|/T).
+
+    Desde ahí Newton converge de forma monótona (Manaster-Koehler).
+    """
+    forward = S * np.exp(r * T)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = np.sqrt(2 * np.abs(np.log(forward / K)) / T)
+    return np.clip(np.nan_to_num(guess, nan=0.2), 0.05, 3.0)
+
+
+def _black_scholes_scalar(S, K, T, r, sigma, call):
+    """Black-Scholes para un solo punto con math (sin overhead de NumPy), para Brent"""
+    vol = sigma * math.sqrt(T)
+    d1 = (math.log(S / K) + (r + sigma**2 / 2) * T) / vol
+    d2 = d1 - vol
+    discounted_K = K * math.exp(-r * T)
+    if call:
+        return S * norm_cdf(d1) - discounted_K * norm_cdf(d2)
+    return discounted_K * norm_cdf(-d2) - S * norm_cdf(-d1)
+
+
+def implied_volatility(price, S, K, T, r, option_type='call', tol=1e-8, max_iter=50):
+    """
+    Calcula la volatilidad implícita de arrays de cotizaciones en paralelo
+
+    Newton vectorizado (con el vega de util.greeks) sobre todos los puntos a
+    la vez; en cada iteración solo se recalculan los que aún no convergieron.
+    Los que no convergen (vega casi nulo, salto fuera del intervalo, máximo
+    de iteraciones) se resuelven uno a uno con Brent en [SIGMA_MIN, SIGMA_MAX].
+
+    Parámetros:
+    price: Precio de mercado de la opción
+    S: Precio actual del activo
+    K: Precio de ejercicio
+    T: Tiempo hasta vencimiento (en años)
+    r: Tasa libre de riesgo
+    option_type: 'call' o 'put' (o array de tipos / array booleano, True = call)
+    tol: Tolerancia absoluta en precio
+    max_iter: Máximo de iteraciones de Newton
+
+    Returns:
+        ImpliedVolResult
+
+    Los precios fuera de los límites de no arbitraje (por debajo del valor
+    intrínseco descontado o por encima de S / K*e^(-rT)) quedan en NaN con
+    método FUERA_DE_LIMITES.
+    """
+    S, K, T, r, _, call = prepare_inputs(S, K, T, r, 0.0, option_type)
+    price, S, K, T, r, call = np.broadcast_arrays(np.asarray(price, dtype=float), S, K, T, r, call)
+    shape = price.shape
+    price, S, K, T, r, call = (np.ravel(a) for a in (price, S, K, T, r, call))
+
+    n = price.size
+    sigma = np.full(n, np.nan)
+    method = np.full(n, SIN_SOLUCION, dtype=np.int8)
+    iterations = np.zeros(n, dtype=np.int16)
+    residual = np.full(n, np.nan)
+
+    # Límites de no arbitraje
+    discounted_K = K * np.exp(-r * T)
+    lower = np.where(call, np.maximum(S - discounted_K, 0.0), np.maximum(discounted_K - S, 0.0))
+    upper = np.where(call, S, discounted_K)
+    valid = (T > 0) & np.isfinite(price) & (price >= lower - tol) & (price <= upper + tol)
+    method[~valid] = FUERA_DE_LIMITES
+
+    # Newton vectorizado sobre los puntos activos
+    active = np.flatnonzero(valid)
+    current = _initial_guess(S[active], K[active], T[active], r[active])
+    for iteration in range(1, max_iter + 1):
+        if active.size == 0:
+            break
+        greeks = bs_greeks(S[active], K[active], T[active], r[active], current, call[active])
+        diff = greeks['price'] - price[active]
+        done = np.abs(diff) <= tol
+        sigma[active[done]] = current[done]
+        residual[active[done]] = np.abs(diff[done])
+        method[active[done]] = NEWTON
+        iterations[active[done]] = iteration - 1
+
+        vega = greeks['vega']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = diff / vega
+        updated = current - step
+        # Vega casi nulo o salto fuera del intervalo: se deja para Brent
+        stuck = ~done & ((vega < 1e-10) | ~np.isfinite(updated) | (updated <= SIGMA_MIN) | (updated >= SIGMA_MAX))
+        iterations[active[stuck]] = iteration
+        keep = ~done & ~stuck
+        active, current = active[keep], updated[keep]
+    iterations[active] = max_iter
+
+    # Brent para lo que Newton no resolvió
+    pending = np.flatnonzero(valid & (method == SIN_SOLUCION))
+    if pending.size:
+        from scipy.optimize import brentq
+
+        for i in pending:
+            def objetivo(vol, S=float(S[i]), K=float(K[i]), T=float(T[i]), r=float(r[i]), call=bool(call[i]), target=float(price[i])):
+                return _black_scholes_scalar(S, K, T, r, vol, call) - target
+
+            f_min, f_max = objetivo(SIGMA_MIN), objetivo(SIGMA_MAX)
+            # Precio pegado a un extremo (p. ej. al valor intrínseco): el extremo ya es solución
+            if abs(f_min) <= tol:
+                root = SIGMA_MIN
+            elif abs(f_max) <= tol:
+                root = SIGMA_MAX
+            elif f_min > 0 or f_max < 0:
+                continue
+            else:
+                try:
+                    root = brentq(objetivo, SIGMA_MIN, SIGMA_MAX, xtol=1e-12, maxiter=200)
+                except RuntimeError:
+                    continue
+            sigma[i] = root
+            residual[i] = abs(objetivo(root))
+            method[i] = BRENT
+
+    converged = (method == NEWTON) | ((method == BRENT) & (residual <= tol))
+    return ImpliedVolResult(
+        sigma=sigma.reshape(shape),
+        converged=converged.reshape(shape),
+        method=method.reshape(shape),
+        iterations=iterations.reshape(shape),
+        residual=residual.reshape(shape),
+    )
@@ -0,0 +1,180 @@
+import numpy as np
+
+from util.pricing import VOL_MINIMA, _as_output, black_scholes, prepare_inputs
+
+METHODS = ('binomial', 'trinomial')
+DEFAULT_STEPS = 500
+
+# Nodos por bloque de contratos (n_contratos * ancho del último nivel): acota la memoria de un lote
+BLOCK_NODES = 2_000_000
+
+
+def _exercise(spot, K, sign):
+    """Valor de ejercicio inmediato (puede ser negativo: solo se usa dentro de un max)"""
+    return sign * (spot - K)
+
+
+def _binomial(S, K, T, r, sigma, sign, american, steps, smooth):
+    """
+    Árbol CRR (u = e^(sigma*sqrt(dt)), d = 1/u) sobre un bloque de contratos.
+
+    Cada nivel es una sola operación sobre una matriz (contratos, nodos). Con
+    smooth=True el penúltimo nivel se valora con Black-Scholes a un paso
+    (árbol BBS), que elimina la oscilación par/impar de CRR y deja la
+    convergencia lista para Richardson.
+    """
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    disc = np.exp(-r * dt)
+    # Probabilidad neutral al riesgo; solo se sale de [0, 1] si sigma*sqrt(dt) < r*dt
+    p = np.clip((np.exp(r * dt) - 1 / u) / (u - 1 / u), 0.0, 1.0)
+
+    last = steps - 1 if smooth else steps
+    K, u, sign = K[:, None], u[:, None], sign[:, None]
+    spot = S[:, None] * u ** (2 * np.arange(last + 1) - last)
+    if smooth:
+        values = black_scholes(spot, K, dt[:, None], r[:, None], sigma[:, None], sign > 0)
+        if american:
+            np.maximum(values, _exercise(spot, K, sign), out=values)
+    else:
+        values = np.maximum(_exercise(spot, K, sign), 0.0)
+
+    p_up, p_down = (disc * p)[:, None], (disc * (1 - p))[:, None]
+    for _ in range(last):
+        values = p_up * values[:, 1:] + p_down * values[:, :-1]
+        if american:
+            spot = spot[:, :-1] * u  # S(i-1, j) = S(i, j) * u
+            np.maximum(values, _exercise(spot, K, sign), out=values)
+    return values[:, 0]
+
+
+def _trinomial(S, K, T, r, sigma, sign, american, steps, smooth):
+    """
+    Árbol trinomial de Boyle (u = e^(sigma*sqrt(2dt)), nodo central sin cambio).
+
+    Mismo esquema que _binomial: un nivel por operación vectorizada y
+    Black-Scholes en el penúltimo nivel con smooth=True.
+    """
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(2 * dt))
+    a, b = np.exp(sigma * np.sqrt(dt / 2)), np.exp(r * dt / 2)
+    p_up = ((b - 1 / a) / (a - 1 / a)) ** 2
+    p_down = ((a - b) / (a - 1 / a)) ** 2
+    disc = np.exp(-r * dt)
+
+    last = steps - 1 if smooth else steps
+    K, u, sign = K[:, None], u[:, None], sign[:, None]
+    spot = S[:, None] * u ** (np.arange(2 * last + 1) - last)
+    if smooth:
+        values = black_scholes(spot, K, dt[:, None], r[:, None], sigma[:, None], sign > 0)
+        if american:
+            np.maximum(values, _exercise(spot, K, sign), out=values)
+    else:
+        values = np.maximum(_exercise(spot, K, sign), 0.0)
+
+    w_up = (disc * p_up)[:, None]
+    w_down = (disc * p_down)[:, None]
+    w_mid = (disc * (1 - p_up - p_down))[:, None]
+    for _ in range(last):
+        values = w_down * values[:, :-2] + w_mid * values[:, 1:-1] + w_up * values[:, 2:]
+        if american:
+            spot = spot[:, 1:-1]  # S(i-1, j) = S(i, j+1)
+            np.maximum(values, _exercise(spot, K, sign), out=values)
+    return values[:, 0]
+
+
+def _tree(S, K, T, r, sigma, sign, american, steps, method, smooth):
+    """Valora los contratos en bloques de a lo sumo BLOCK_NODES nodos"""
+    width = (2 * steps + 1) if method == 'trinomial' else (steps + 1)
+    block = max(1, BLOCK_NODES // width)
+    engine = _trinomial if method == 'trinomial' else _binomial
+    out = np.empty(S.size)
+    for start in range(0, S.size, block):
+        sl = slice(start, start + block)
+        out[sl] = engine(S[sl], K[sl], T[sl], r[sl], sigma[sl], sign[sl], american, steps, smooth)
+    return out
+
+
+def lattice_price(S, K, T, r, sigma, option_type='call', american=True, steps=DEFAULT_STEPS,
+                  method='binomial', richardson=True, smooth=True):
+    """
+    Calcula el precio de opciones europeas o americanas con un árbol
+
+    Todas las entradas admiten escalares o arrays (con broadcast, igual que
+    black_scholes): un lote de contratos se valora a la vez, una operación
+    NumPy por nivel del árbol para todo el lote.
+
+    Parámetros:
+    S: Precio actual del activo
+    K: Precio de ejercicio
+    T: Tiempo hasta vencimiento (en años)
+    r: Tasa libre de riesgo
+    sigma: Volatilidad
+    option_type: 'call' o 'put' (o array de tipos / array booleano, True = call)
+    american: Permitir ejercicio anticipado
+    steps: Niveles del árbol
+    method: 'binomial' (CRR) o 'trinomial'
+    richardson: Extrapolar 2*P(steps) - P(steps/2)
+    smooth: Black-Scholes en el último paso (convergencia monótona en steps)
+
+    Con T -> 0 o sigma -> 0 se devuelve el valor determinista: el de
+    black_scholes y, si es americana, como mínimo el valor intrínseco actual.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido: {method}")
+    S, K, T, r, sigma, call = prepare_inputs(S, K, T, r, sigma, option_type)
+    shape = S.shape
+    S, K, T, r, sigma, call = (np.ravel(a) for a in (S, K, T, r, sigma, call))
+    sign = np.where(call, 1.0, -1.0)
+
+    price = np.asarray(black_scholes(S, K, T, r, sigma, call), dtype=float).reshape(-1)
+    if american:
+        np.maximum(price, _exercise(S, K, sign), out=price)
+
+    idx = np.flatnonzero(sigma * np.sqrt(T) > VOL_MINIMA)
+    if idx.size:
+        args = (S[idx], K[idx], T[idx], r[idx], sigma[idx], sign[idx], american)
+        steps = max(int(steps), 2)
+        value = _tree(*args, steps, method, smooth)
+        if richardson:
+            value = 2 * value - _tree(*args, steps // 2, method, smooth)
+        price[idx] = value
+
+    return _as_output(price.reshape(shape))
+
+
+def lattice_greeks(S, K, T, r, sigma, option_type='call', american=True, steps=DEFAULT_STEPS,
+                   method='binomial', richardson=True):
+    """
+    Precio y griegos de primer orden del árbol por diferencias centrales
+
+    Las 9 valoraciones (base y desplazamientos de S, T, sigma y r) se hacen
+    en un único lote de lattice_price. Solo admite un contrato escalar.
+
+    Returns:
+        dict: price, delta, gamma, theta, vega, rho en las mismas unidades
+        que util.greeks.bs_greeks (theta por año, vega y rho por 1.0).
+    """
+    h_S, h_T, h_sigma, h_r = 0.01 * S, min(1 / 365, T / 2), 0.001, 0.0001
+    bumps = np.array([
+        # S,          T,          sigma,          r
+        [S,           T,          sigma,          r],
+        [S + h_S,     T,          sigma,          r],
+        [S - h_S,     T,          sigma,          r],
+        [S,           T + h_T,    sigma,          r],
+        [S,           T - h_T,    sigma,          r],
+        [S,           T,          sigma + h_sigma, r],
+        [S,           T,          max(sigma - h_sigma, 0.0), r],
+        [S,           T,          sigma,          r + h_r],
+        [S,           T,          sigma,          r - h_r],
+    ], dtype=float)
+    p = lattice_price(bumps[:, 0], K, bumps[:, 1], bumps[:, 3], bumps[:, 2], option_type,
+                      american, steps, method, richardson)
+    return {
+        'price': p[0],
+        'delta': (p[1] - p[2]) / (2 * h_S),
+        'gamma': (p[1] - 2 * p[0] + p[2]) / h_S**2,
+        'theta': -(p[3] - p[4]) / (2 * h_T),
+        'vega': (p[5] - p[6]) / (bumps[5, 2] - bumps[6, 2]),
+        'rho': (p[7] - p[8]) / (2 * h_r),
+    }
@@ -0,0 +1,193 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from util.pricing import black_scholes
+
+PAYOFFS = ('european', 'asian', 'barrier', 'lookback')
+BARRIER_TYPES = ('up-and-out', 'down-and-out', 'up-and-in', 'down-and-in')
+
+# Trayectorias por bloque: memoria ~ CHUNK_SIZE * n_steps * 8 bytes
+CHUNK_SIZE = 20_000
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    Resultado de price_monte_carlo.
+
+    price / std_error: estimación final (con variable de control si se pidió)
+    price_plain / std_error_plain: la misma simulación sin variable de control
+    beta: coeficiente de la variable de control (0 si no se usó; nunca se usa con payoff='european')
+    n_paths: trayectorias simuladas (incluidas las antitéticas)
+    elapsed: segundos de simulación
+    """
+    price: float
+    std_error: float
+    price_plain: float
+    std_error_plain: float
+    beta: float
+    n_paths: int
+    elapsed: float
+
+    @property
+    def variance_reduction(self):
+        """
+        Cuántas veces menos varianza que la estimación sin variable de control
+
+        None si no se usó variable de control o si el error quedó en 0 (la
+        reducción no es medible).
+        """
+        if self.beta == 0 or self.std_error == 0:
+            return None
+        return (self.std_error_plain / self.std_error) ** 2
+
+
+def simulate_gbm(rng, S, T, r, sigma, n_paths, n_steps, antithetic=True):
+    """
+    Simula trayectorias de un movimiento browniano geométrico (medida riesgo neutral).
+
+    Returns:
+        np.ndarray: (n_paths, n_steps) con el precio en cada fecha de
+        observación (sin incluir S en t=0). Con antithetic=True la segunda
+        mitad de las filas usa los mismos shocks con signo contrario.
+    """
+    dt = T / n_steps
+    half = (n_paths + 1) // 2 if antithetic else n_paths
+    z = rng.standard_normal((half, n_steps))
+    if antithetic:
+        z = np.concatenate([z, -z])[:n_paths]
+    increments = (r - sigma**2 / 2) * dt + sigma * np.sqrt(dt) * z
+    return S * np.exp(np.cumsum(increments, axis=1))
+
+
+def path_payoff(paths, K, option_type='call', payoff='european', barrier=None, barrier_type='up-and-out'):
+    """
+    Payoff al vencimiento de cada trayectoria (sin descontar).
+
+    european: sobre el precio final
+    asian: sobre la media aritmética de las observaciones
+    barrier: europea que se activa/desactiva si el precio toca la barrera
+             (monitoreo discreto en las fechas simuladas)
+    lookback: strike fijo sobre el máximo (call) o el mínimo (put)
+    """
+    call = option_type == 'call'
+    if payoff == 'european':
+        underlying = paths[:, -1]
+    elif payoff == 'asian':
+        underlying = paths.mean(axis=1)
+    elif payoff == 'lookback':
+        underlying = paths.max(axis=1) if call else paths.min(axis=1)
+    elif payoff == 'barrier':
+        underlying = paths[:, -1]
+    else:
+        raise ValueError(f"Payoff desconocido: {payoff}")
+
+    value = np.maximum(underlying - K, 0.0) if call else np.maximum(K - underlying, 0.0)
+
+    if payoff == 'barrier':
+        if barrier is None:
+            raise ValueError("El payoff 'barrier' necesita el nivel de la barrera")
+        if barrier_type not in BARRIER_TYPES:
+            raise ValueError(f"Tipo de barrera desconocido: {barrier_type}")
+        touched = paths.max(axis=1) >= barrier if barrier_type.startswith('up') else paths.min(axis=1) <= barrier
+        alive = ~touched if barrier_type.endswith('out') else touched
+        value = np.where(alive, value, 0.0)
+
+    return value
+
+
+def _run_chunk(args):
+    """
+    Simula un bloque y devuelve sus sumas: n, ΣY, ΣY², ΣX, ΣX², ΣXY.
+
+    Y es el payoff descontado y X el de la call/put europea (variable de
+    control). Con antitéticas cada muestra es la media del par (z, -z), así
+    que las muestras siguen siendo independientes.
+    """
+    seed, n_paths, S, K, T, r, sigma, option_type, payoff, barrier, barrier_type, n_steps, antithetic = args
+    rng = np.random.default_rng(seed)
+    paths = simulate_gbm(rng, S, T, r, sigma, n_paths, n_steps, antithetic)
+    discount = np.exp(-r * T)
+    y = discount * path_payoff(paths, K, option_type, payoff, barrier, barrier_type)
+    x = discount * path_payoff(paths, K, option_type, 'european')
+    if antithetic:
+        half = n_paths // 2
+        y = (y[:half] + y[half:2 * half]) / 2
+        x = (x[:half] + x[half:2 * half]) / 2
+    return np.array([y.size, y.sum(), (y * y).sum(), x.sum(), (x * x).sum(), (x * y).sum()])
+
+
+def price_monte_carlo(S, K, T, r, sigma, option_type='call', payoff='european', n_paths=100_000,
+                      n_steps=None, antithetic=True, control_variate=True, barrier=None,
+                      barrier_type='up-and-out', chunk_size=CHUNK_SIZE, n_workers=1, seed=None):
+    """
+    Valora una opción (europea o dependiente de la trayectoria) por Monte Carlo
+
+    Las trayectorias se simulan en bloques de `chunk_size` para acotar la
+    memoria. Cada bloque tiene su propia semilla derivada de `seed`
+    (SeedSequence.spawn), así que el resultado es el mismo con 1 o con N
+    procesos. Con n_workers > 1 los bloques se reparten entre procesos.
+
+    Parámetros:
+    S, K, T, r, sigma, option_type: como en black_scholes
+    payoff: 'european', 'asian', 'barrier' o 'lookback'
+    n_paths: Número de trayectorias
+    n_steps: Fechas de observación (por defecto una por día hábil)
+    antithetic: Usar variables antitéticas
+    control_variate: Usar la opción europea (precio Black-Scholes exacto) como variable de control.
+        No se aplica a payoff='european': la variable de control sería el propio payoff
+        y el precio saldría exacto con error 0, sin decir nada de la simulación.
+    barrier, barrier_type: Nivel y tipo de barrera para payoff='barrier'
+
+    Returns:
+        MonteCarloResult
+    """
+    if payoff not in PAYOFFS:
+        raise ValueError(f"Payoff desconocido: {payoff}")
+    option_type = option_type.lower()
+    n_steps = n_steps or max(1, int(round(T * 252)))
+    if antithetic:
+        chunk_size += chunk_size % 2  # pares completos en cada bloque
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size + (n_paths % chunk_size) % 2 * antithetic)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, S, K, T, r, sigma, option_type, payoff, barrier, barrier_type, n_steps, antithetic)
+             for s, size in zip(seeds, sizes)]
+
+    start = time.perf_counter()
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            sums = np.sum(list(executor.map(_run_chunk, tasks)), axis=0)
+    else:
+        sums = np.sum([_run_chunk(task) for task in tasks], axis=0)
+    elapsed = time.perf_counter() - start
+
+    n, sum_y, sum_y2, sum_x, sum_x2, sum_xy = sums
+    mean_y, mean_x = sum_y / n, sum_x / n
+    var_y = max(sum_y2 / n - mean_y**2, 0.0) * n / max(n - 1, 1)
+    var_x = max(sum_x2 / n - mean_x**2, 0.0) * n / max(n - 1, 1)
+    cov_xy = (sum_xy / n - mean_x * mean_y) * n / max(n - 1, 1)
+
+    price_plain, std_error_plain = mean_y, np.sqrt(var_y / n)
+    beta = 0.0
+    price, std_error = price_plain, std_error_plain
+    if control_variate and payoff != 'european' and var_x > 0:
+        beta = cov_xy / var_x
+        expected_x = float(black_scholes(S, K, T, r, sigma, option_type))
+        price = mean_y - beta * (mean_x - expected_x)
+        std_error = np.sqrt(max(var_y - beta * cov_xy, 0.0) / n)
+
+    return MonteCarloResult(
+        price=float(price),
+        std_error=float(std_error),
+        price_plain=float(price_plain),
+        std_error_plain=float(std_error_plain),
+        beta=float(beta),
+        n_paths=int(sum(sizes)),
+        elapsed=elapsed,
+    )
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from cachetools import TTLCache
+
+from util.fetch_util import RecordedFetcher, fetch_concurrently
+
+# Caché de noticias por ticker: segundos hasta volver a pedirlas y número de tickers guardados
+TTL_NOTICIAS = 10 * 60
+MAX_TICKERS_NOTICIAS = 256
+
+# Tickers que se piden a la vez
+MAX_WORKERS_NOTICIAS = 8
+
+# Respuestas grabadas para trabajar sin conexión (ver benchmarks/record_news.py)
+NEWS_FIXTURE = "data/fixtures/news_sample.json"
+
+# Ancho (px) al que se pintan las miniaturas: se pide la resolución más pequeña que lo cubre
+ANCHO_MINIATURA = 140
+
+
+def yfinance_news(ticker):
+    """Noticias de un ticker en Yahoo Finance (lista de dicts como los devuelve yf.Ticker(...).news)"""
+    import yfinance as yf  # Necesitas instalar esto: pip install yfinance
+
+    return yf.Ticker(ticker).news or []
+
+
+def thumbnail_url(thumbnail, min_width=ANCHO_MINIATURA):
+    """
+    URL de la miniatura más pequeña con al menos min_width px de ancho
+
+    Si ninguna llega, la más ancha. None si la noticia no trae miniatura.
+    """
+    if not isinstance(thumbnail, dict):
+        return None
+    resolutions = [r for r in thumbnail.get('resolutions') or [] if r.get('url')]
+    if not resolutions:
+        return None
+    suficientes = [r for r in resolutions if r.get('width', 0) >= min_width]
+    if suficientes:
+        return min(suficientes, key=lambda r: r['width'])['url']
+    return max(resolutions, key=lambda r: r.get('width', 0))['url']
+
+
+class RecordedNews(RecordedFetcher):
+    """Sustituto de yfinance_news que devuelve respuestas grabadas en JSON ({ticker: [noticias]})"""
+    campo = "news"
+    fixture = NEWS_FIXTURE
+
+    def copy(self, articles):
+        return [dict(article) for article in articles]
+
+    def missing(self, ticker):
+        return []  # como yfinance: un ticker sin noticias no es un error
+
+
+class NewsService:
+    """
+    Noticias de varios tickers con caché TTL por ticker.
+
+    Los tickers que no están en caché se piden en paralelo (un hilo por
+    ticker, hasta max_workers). Un error en un ticker no se cachea: queda
+    en `errors` y se reintenta en la siguiente llamada. Las listas cacheadas
+    se comparten entre sesiones, así que no deben modificarse.
+    """
+
+    def __init__(self, fetcher=yfinance_news, ttl=TTL_NOTICIAS, max_tickers=MAX_TICKERS_NOTICIAS,
+                 max_workers=MAX_WORKERS_NOTICIAS, clock=time.monotonic):
+        self._fetcher = fetcher
+        self._cache = TTLCache(max_tickers, ttl, timer=clock)
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.errors = {}
+
+    def fetch(self, tickers):
+        """
+        Noticias de cada ticker: {ticker: lista de noticias}
+
+        Los tickers se normalizan a mayúsculas; un ticker con error no aparece.
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        with self._lock:
+            result = {t: self._cache[t] for t in tickers if t in self._cache}
+        missing = [t for t in tickers if t not in result]
+        if not missing:
+            return result
+
+        fetched, failed = fetch_concurrently(self._fetcher, missing, self.max_workers, "news")
+        with self._lock:
+            self.errors.update(failed)
+            for ticker, articles in fetched.items():
+                self.errors.pop(ticker, None)
+                self._cache[ticker] = articles
+                result[ticker] = articles
+        return {t: result[t] for t in tickers if t in result}
+
+    def get_news(self, tickers):
+        """
+        Noticias de todos los tickers juntas, sin repetir (por link), de la más reciente a la más antigua
+
+        Returns:
+            pd.DataFrame: una fila por noticia con providerPublishTime como
+            fecha y `tickers`, los tickers pedidos que la trajeron.
+        """
+        rows = [dict(article, ticker=ticker) for ticker, articles in self.fetch(tickers).items() for article in articles]
+        if not rows:
+            return pd.DataFrame()
+        news_df = pd.DataFrame(rows)
+        tickers_by_link = news_df.groupby('link', sort=False)['ticker'].agg(list)
+        news_df = news_df.drop_duplicates('link').drop(columns='ticker')
+        news_df['tickers'] = news_df['link'].map(tickers_by_link)
+        news_df['providerPublishTime'] = pd.to_datetime(news_df['providerPublishTime'], unit='s')
+        return news_df.sort_values('providerPublishTime', ascending=False, ignore_index=True)
+
+
+@st.cache_resource
+def get_news_service(offline=False):
+    """Servicio de noticias compartido por todas las sesiones (offline: respuestas de NEWS_FIXTURE)"""
+    return NewsService(RecordedNews.from_fixture() if offline else yfinance_news)
@@ -0,0 +1,246 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from util.greeks import bs_greeks
+from util.pricing import black_scholes
+
+# Columnas del fichero de posiciones
+COLUMNAS_REQUERIDAS = ('underlying', 'option_type', 'strike', 'expiry', 'quantity', 'spot', 'volatility')
+# Opcionales con su valor por defecto (rate: se usa la tasa de la cartera; sector: si Finviz no lo tiene)
+COLUMNAS_OPCIONALES = {'multiplier': 100.0, 'rate': np.nan, 'sector': None}
+
+# Griegos en dólares que se agregan
+METRICAS = ('value', 'dollar_delta', 'dollar_gamma', 'dollar_vega', 'dollar_theta')
+
+SIN_SECTOR = 'Sin sector'
+
+# Cartera de ejemplo (ver benchmarks/generate_portfolio.py)
+PORTFOLIO_EJEMPLO = "data/fixtures/portfolio_sample.csv"
+
+
+def load_positions(source, name=None):
+    """
+    Lee un fichero de posiciones CSV o Parquet (ruta o fichero subido)
+
+    Una fila por posición con las columnas de COLUMNAS_REQUERIDAS; quantity
+    es el número de contratos con signo (negativo = vendido), expiry la
+    fecha de vencimiento y volatility en decimal (0.25 = 25%). Si hay una
+    columna position_id se usa como índice.
+
+    Returns:
+        pd.DataFrame: posiciones normalizadas, indexadas por position_id
+    """
+    name = name or getattr(source, 'name', None) or str(source)
+    if os.path.splitext(name)[1].lower() in ('.parquet', '.pq'):
+        df = pd.read_parquet(source)
+    else:
+        df = pd.read_csv(source)
+    return normalize_positions(df)
+
+
+def normalize_positions(df):
+    """Valida las columnas, rellena las opcionales y normaliza tipos"""
+    df = df.rename(columns=str.lower)
+    faltan = [col for col in COLUMNAS_REQUERIDAS if col not in df.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas en el fichero de posiciones: {', '.join(faltan)}")
+
+    if 'position_id' in df.columns:
+        df = df.set_index('position_id')
+    df.index = df.index.astype(str)
+    df.index.name = 'position_id'
+    if not df.index.is_unique:
+        raise ValueError("position_id repetido en el fichero de posiciones")
+
+    for col, default in COLUMNAS_OPCIONALES.items():
+        if col not in df.columns:
+            df[col] = default
+    df['underlying'] = df['underlying'].astype(str).str.upper()
+    df['option_type'] = df['option_type'].astype(str).str.lower()
+    df['expiry'] = pd.to_datetime(df['expiry'])
+    for col in ('strike', 'quantity', 'spot', 'volatility', 'multiplier', 'rate'):
+        df[col] = df[col].astype(float)
+    return df[[*COLUMNAS_REQUERIDAS, *COLUMNAS_OPCIONALES]]
+
+
+def price_positions(positions, valuation_date, r=0.0):
+    """
+    Valora todas las posiciones en una sola llamada a bs_greeks
+
+    Returns:
+        pd.DataFrame: por posición, underlying, price y los griegos en
+        dólares: value (precio * unidades), dollar_delta (delta * S),
+        dollar_gamma (cambio de dollar_delta si S sube un 1%), dollar_vega
+        (por punto de volatilidad) y dollar_theta (por día), con unidades =
+        quantity * multiplier.
+    """
+    T = ((positions['expiry'] - pd.Timestamp(valuation_date)).dt.days / 365).to_numpy()
+    S = positions['spot'].to_numpy()
+    rate = positions['rate'].fillna(r).to_numpy()
+    greeks = bs_greeks(S, positions['strike'].to_numpy(), T, rate, positions['volatility'].to_numpy(),
+                       positions['option_type'].to_numpy())
+    units = (positions['quantity'] * positions['multiplier']).to_numpy()
+    price = np.atleast_1d(greeks['price'])
+    return pd.DataFrame({
+        'underlying': positions['underlying'],
+        'price': price,
+        'value': price * units,
+        'dollar_delta': greeks['delta'] * S * units,
+        'dollar_gamma': greeks['gamma'] * S**2 * 0.01 * units,
+        'dollar_vega': greeks['vega'] / 100 * units,
+        'dollar_theta': greeks['theta'] / 365 * units,
+    }, index=positions.index)
+
+
+@dataclass
+class PositionArrays:
+    """
+    La cartera como arrays planos (una entrada por posición) para revalorar escenarios.
+
+    underlying_idx indexa `underlyings`, las columnas de los escenarios de
+    retornos. price es el precio de hoy y units = quantity * multiplier.
+    """
+    S: np.ndarray
+    K: np.ndarray
+    T: np.ndarray
+    r: np.ndarray
+    sigma: np.ndarray
+    call: np.ndarray
+    units: np.ndarray
+    price: np.ndarray
+    underlying_idx: np.ndarray
+    underlyings: tuple
+
+
+def revalue(arrays, spot_returns, vol_shift=0.0, rate_shift=0.0, horizon=0.0):
+    """
+    P&L de la cartera en cada escenario, con revaluación completa
+
+    Toda la matriz escenarios x posiciones se valora en una llamada a
+    black_scholes.
+
+    Parámetros:
+    arrays: PositionArrays
+    spot_returns: Retornos logarítmicos del subyacente, (n_escenarios, n_subyacentes)
+    vol_shift: Cambio aditivo de volatilidad, escalar o (n_escenarios,)
+    rate_shift: Cambio aditivo de tasa, escalar o (n_escenarios,)
+    horizon: Años que pasan hasta el escenario
+
+    Returns:
+        np.ndarray: P&L por escenario, (n_escenarios,)
+    """
+    spot_returns = np.atleast_2d(spot_returns)
+    S = arrays.S * np.exp(spot_returns[:, arrays.underlying_idx])
+    vol_shift = np.asarray(vol_shift, dtype=float)
+    rate_shift = np.asarray(rate_shift, dtype=float)
+    sigma = arrays.sigma + (vol_shift[:, None] if vol_shift.ndim else vol_shift)
+    r = arrays.r + (rate_shift[:, None] if rate_shift.ndim else rate_shift)
+    value = black_scholes(S, arrays.K, arrays.T - horizon, r, sigma, arrays.call)
+    return (value - arrays.price) @ arrays.units
+
+
+class Portfolio:
+    """
+    Libro de posiciones con sus griegos en dólares agregados por subyacente.
+
+    La carga valora todo el libro en un lote. Después, upsert/remove solo
+    revaloran la posición tocada y ajustan los totales de su subyacente
+    restando la contribución vieja y sumando la nueva, sin recalcular el
+    resto. La agregación por sector parte de los totales por subyacente
+    (unas decenas de filas), no de las posiciones.
+    """
+
+    def __init__(self, positions, valuation_date=None, r=0.0):
+        self.valuation_date = pd.Timestamp(valuation_date or pd.Timestamp.today().normalize())
+        self.r = r
+        self.positions = normalize_positions(positions.reset_index() if positions.index.name == 'position_id' else positions)
+        self.exposures = price_positions(self.positions, self.valuation_date, r)
+        grouped = self.exposures.groupby('underlying')
+        self._by_underlying = grouped[list(METRICAS)].sum()
+        self._by_underlying['positions'] = grouped.size()
+        self.repriced = len(self.positions)  # posiciones valoradas desde la carga
+        self.version = 0  # cambia con cada upsert/remove: sirve de clave para resultados calculados sobre la cartera
+
+    @classmethod
+    def from_file(cls, source, valuation_date=None, r=0.0, name=None):
+        return cls(load_positions(source, name), valuation_date, r)
+
+    def _add(self, underlying, contribution, count):
+        if underlying not in self._by_underlying.index:
+            self._by_underlying.loc[underlying] = 0.0
+        self._by_underlying.loc[underlying, list(METRICAS)] += contribution
+        self._by_underlying.loc[underlying, 'positions'] += count
+        if self._by_underlying.loc[underlying, 'positions'] <= 0:
+            self._by_underlying = self._by_underlying.drop(underlying)
+
+    def upsert(self, position_id, **fields):
+        """Añade o modifica una posición y actualiza los agregados solo con ella"""
+        position_id = str(position_id)
+        if position_id in self.positions.index:
+            row = self.positions.loc[position_id].to_dict()
+            self._add(self.exposures.at[position_id, 'underlying'],
+                      -self.exposures.loc[position_id, list(METRICAS)].to_numpy(float), -1)
+        else:
+            row = {col: default for col, default in COLUMNAS_OPCIONALES.items()}
+        row.update(fields)
+        new = normalize_positions(pd.DataFrame([row], index=pd.Index([position_id], name='position_id')))
+
+        exposure = price_positions(new, self.valuation_date, self.r)
+        self.positions.loc[position_id] = new.loc[position_id]
+        self.exposures.loc[position_id] = exposure.loc[position_id]
+        self._add(exposure.at[position_id, 'underlying'], exposure.loc[position_id, list(METRICAS)].to_numpy(float), 1)
+        self.repriced += 1
+        self.version += 1
+
+    def remove(self, position_id):
+        position_id = str(position_id)
+        self._add(self.exposures.at[position_id, 'underlying'],
+                  -self.exposures.loc[position_id, list(METRICAS)].to_numpy(float), -1)
+        self.positions = self.positions.drop(position_id)
+        self.exposures = self.exposures.drop(position_id)
+        self.version += 1
+
+    def by_underlying(self):
+        """Totales por subyacente (copia)"""
+        df = self._by_underlying.copy()
+        df['positions'] = df['positions'].astype(int)
+        return df.sort_index()
+
+    def by_sector(self, sectors=None):
+        """
+        Totales por sector.
+
+        sectors: Serie ticker -> sector (p. ej. la columna 'Sector' de
+        get_finviz_dataframe). Los subyacentes que no aparecen usan la
+        columna sector del fichero, o SIN_SECTOR.
+        """
+        by_underlying = self.by_underlying()
+        from_file = self.positions.dropna(subset=['sector']).groupby('underlying')['sector'].first()
+        sector = pd.Series(SIN_SECTOR, index=by_underlying.index)
+        sector.update(from_file)
+        if sectors is not None:
+            sector.update(sectors.dropna())
+        return by_underlying.groupby(sector.rename('sector')).sum()
+
+    def totals(self):
+        return self._by_underlying[list(METRICAS)].sum()
+
+    def arrays(self):
+        """PositionArrays de la cartera actual, para revalorar escenarios (ver revalue)"""
+        positions = self.positions
+        underlying = pd.Categorical(positions['underlying'])
+        return PositionArrays(
+            S=positions['spot'].to_numpy(float),
+            K=positions['strike'].to_numpy(float),
+            T=((positions['expiry'] - self.valuation_date).dt.days / 365).to_numpy(float).clip(0.0),
+            r=positions['rate'].fillna(self.r).to_numpy(float),
+            sigma=positions['volatility'].to_numpy(float),
+            call=(positions['option_type'] == 'call').to_numpy(),
+            units=(positions['quantity'] * positions['multiplier']).to_numpy(float),
+            price=self.exposures['price'].to_numpy(float),
+            underlying_idx=underlying.codes.astype(np.intp),
+            underlyings=tuple(underlying.categories),
+        )
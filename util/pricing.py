@@ -0,0 +1,95 @@
+import numpy as np
+
+from util.normal import norm_cdf
+
+# Por debajo de este sigma*sqrt(T) la opción se valora como determinista
+VOL_MINIMA = 1e-12
+
+
+def is_call(option_type):
+    """
+    Convierte el tipo de opción en un array booleano (True = call).
+
+    Acepta 'call'/'put' (sin distinguir mayúsculas), un array de esos strings
+    o directamente un array booleano.
+    """
+    if isinstance(option_type, str):
+        return np.asarray(option_type.lower() == 'call')
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return option_type
+    return np.char.lower(option_type.astype(str)) == 'call'
+
+
+def prepare_inputs(S, K, T, r, sigma, option_type='call'):
+    """
+    Convierte las entradas a arrays float64 con la misma forma (broadcast).
+
+    Returns:
+        tuple: (S, K, T, r, sigma, call) con T y sigma acotados a >= 0
+    """
+    S, K, T, r, sigma, call = np.broadcast_arrays(
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.maximum(np.asarray(T, dtype=float), 0.0),
+        np.asarray(r, dtype=float),
+        np.maximum(np.asarray(sigma, dtype=float), 0.0),
+        is_call(option_type),
+    )
+    return S, K, T, r, sigma, call
+
+
+def d1_d2(S, K, T, r, sigma):
+    """
+    Calcula d1 y d2 de Black-Scholes sobre arrays ya preparados.
+
+    Returns:
+        tuple: (d1, d2, vol, degenerate) donde vol = sigma*sqrt(T) y
+        degenerate marca los puntos con vol ~ 0 (T -> 0 o sigma -> 0), en los
+        que d1/d2 no están definidos y no deben usarse.
+    """
+    vol = sigma * np.sqrt(T)
+    degenerate = vol <= VOL_MINIMA
+    safe_vol = np.where(degenerate, 1.0, vol)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / safe_vol
+    d2 = d1 - vol
+    return d1, d2, vol, degenerate
+
+
+def _as_output(value):
+    """Devuelve un escalar numpy si el resultado es 0-d, si no el array"""
+    return value[()] if value.ndim == 0 else value
+
+
+def black_scholes(S, K, T, r, sigma, option_type='call'):
+    """
+    Calcula el precio de una opción europea usando Black-Scholes
+
+    Todas las entradas admiten escalares o arrays y se hace broadcast entre
+    ellas, así que una malla completa se valora en una sola llamada.
+
+    Parámetros:
+    S: Precio actual del activo
+    K: Precio de ejercicio
+    T: Tiempo hasta vencimiento (en años)
+    r: Tasa libre de riesgo
+    sigma: Volatilidad
+    option_type: 'call' o 'put' (o array de tipos / array booleano, True = call)
+
+    Casos límite: con T -> 0 o sigma -> 0 la opción vale su valor intrínseco
+    sobre el forward descontado, max(S - K*e^(-rT), 0) para calls y
+    max(K*e^(-rT) - S, 0) para puts (con T = 0, el payoff al vencimiento).
+    """
+    S, K, T, r, sigma, call = prepare_inputs(S, K, T, r, sigma, option_type)
+    d1, d2, vol, degenerate = d1_d2(S, K, T, r, sigma)
+    discounted_K = K * np.exp(-r * T)
+
+    call_price = S * norm_cdf(d1) - discounted_K * norm_cdf(d2)
+    put_price = discounted_K * norm_cdf(-d2) - S * norm_cdf(-d1)
+    price = np.where(call, call_price, put_price)
+
+    intrinsic = np.where(call, np.maximum(S - discounted_K, 0.0), np.maximum(discounted_K - S, 0.0))
+    price = np.where(degenerate, intrinsic, price)
+
+    return _as_output(price)
@@ -0,0 +1,167 @@
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from util.risk_matrix import CATEGORIAS, IMPACT_FACTORS, NORMALIZACIONES, PROBABILITY_FACTORS, score_universe
+from util.snapshot_store import SNAPSHOT_DIR, list_snapshots, read_snapshot, snapshot_path, write_snapshot
+
+# Scores diarios por normalización: data/risk_history/normalization=<n>/date=YYYY-MM-DD/
+RISK_HISTORY_DIR = "data/risk_history"
+
+# Columnas del screener que hacen falta para puntuar una foto
+COLUMNAS_SCORE = ['Sector', 'Average Volume', 'Volume',
+                  *(col for col in (*IMPACT_FACTORS, *PROBABILITY_FACTORS) if col != 'Liquidity Ratio')]
+
+# Días de trayectoria que se dibujan por defecto en la matriz
+DIAS_TRAYECTORIA = 20
+
+
+def history_root(normalization, root=RISK_HISTORY_DIR):
+    return os.path.join(root, f"normalization={normalization}")
+
+
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def update_risk_history(normalization='universe', snapshots=SNAPSHOT_DIR, root=RISK_HISTORY_DIR):
+    """
+    Puntúa las fotos del screener que aún no tienen scores guardados
+
+    Cada día se puntúa una sola vez (score_universe sobre la foto de ese
+    día) y se guarda en su propia partición; solo se vuelve a puntuar un día
+    si su foto se reescribió después (otra descarga el mismo día).
+
+    Returns:
+        list: fechas puntuadas en esta llamada
+    """
+    if normalization not in NORMALIZACIONES:
+        raise ValueError(f"Normalización desconocida: {normalization}")
+    destino = history_root(normalization, root)
+    nuevas = []
+    for fecha in list_snapshots(snapshots):
+        puntuada = _mtime(snapshot_path(fecha, destino))
+        if puntuada is not None and puntuada >= _mtime(snapshot_path(fecha, snapshots)):
+            continue
+        scores = score_universe(read_snapshot(fecha, COLUMNAS_SCORE, root=snapshots), normalization)
+        frame = scores.to_frame().astype({'Impact Score': 'float32', 'Probability Score': 'float32'})
+        write_snapshot(frame, fecha, destino)
+        nuevas.append(fecha)
+    return nuevas
+
+
+@dataclass
+class ScoreTrails:
+    """
+    Trayectoria de los scores de unos tickers, una fila por foto (de la más antigua a la última).
+
+    category lleva el índice en CATEGORIAS (-1 si ese día no hay dato).
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    impact: np.ndarray
+    probability: np.ndarray
+    category: np.ndarray
+
+    def category_changes(self):
+        """Tickers cuya categoría cambió entre las dos últimas fotos, con la categoría de antes y la de ahora"""
+        if len(self.dates) < 2:
+            return pd.DataFrame(columns=['Antes', 'Ahora'], index=self.tickers[:0])
+        before, now = self.category[-2], self.category[-1]
+        changed = (before >= 0) & (now >= 0) & (before != now)
+        categorias = np.asarray(CATEGORIAS)
+        return pd.DataFrame({'Antes': categorias[before[changed]], 'Ahora': categorias[now[changed]]},
+                            index=self.tickers[changed])
+
+
+class RiskHistory:
+    """
+    Historia de scores de todo el universo en memoria, columnar por ticker.
+
+    Matrices fechas x tickers (impact, probability y el código de
+    categoría): la trayectoria de k tickers es tomar k columnas. sync()
+    puntúa solo las fotos nuevas y carga solo las particiones que no estaban
+    en memoria (o que se reescribieron), añadiendo sus filas.
+    """
+
+    def __init__(self, normalization='universe', snapshots=SNAPSHOT_DIR, root=RISK_HISTORY_DIR):
+        self.normalization = normalization
+        self.snapshots = snapshots
+        self.root = root
+        self.dates = pd.DatetimeIndex([])
+        self.tickers = pd.Index([], dtype=object, name='Ticker')
+        self.impact = np.empty((0, 0), dtype=np.float32)
+        self.probability = np.empty((0, 0), dtype=np.float32)
+        self.category = np.empty((0, 0), dtype=np.int8)
+        self._loaded = {}  # fecha -> mtime de la partición cargada
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Incorpora las fotos nuevas; devuelve cuántos días se cargaron"""
+        with self._lock:
+            update_risk_history(self.normalization, self.snapshots, self.root)
+            destino = history_root(self.normalization, self.root)
+            pendientes = {}
+            for fecha in list_snapshots(destino):
+                mtime = _mtime(snapshot_path(fecha, destino))
+                if self._loaded.get(fecha) != mtime:
+                    pendientes[fecha] = (mtime, read_snapshot(fecha, root=destino))
+            if pendientes:
+                self._add_rows({fecha: frame for fecha, (_, frame) in pendientes.items()})
+                self._loaded.update({fecha: mtime for fecha, (mtime, _) in pendientes.items()})
+            return len(pendientes)
+
+    def _add_rows(self, frames):
+        # Columnas para los tickers nuevos y filas para las fechas nuevas, con una sola copia de cada matriz
+        nuevos = pd.Index([], dtype=object)
+        for frame in frames.values():
+            nuevos = nuevos.union(frame.index.difference(self.tickers))
+        fechas = pd.DatetimeIndex(sorted(frames)).difference(self.dates)
+        pad = ((0, len(fechas)), (0, len(nuevos)))
+        if len(nuevos):
+            self.tickers = self.tickers.append(nuevos).rename('Ticker')
+        if len(nuevos) or len(fechas):
+            dates = self.dates.append(fechas)
+            order = np.argsort(dates, kind='stable')
+            self.dates = dates[order]
+            self.impact = np.pad(self.impact, pad, constant_values=np.nan)[order]
+            self.probability = np.pad(self.probability, pad, constant_values=np.nan)[order]
+            self.category = np.pad(self.category, pad, constant_values=-1)[order]
+
+        for fecha, frame in frames.items():
+            row = self.dates.get_loc(fecha)
+            self.impact[row], self.probability[row], self.category[row] = np.nan, np.nan, -1
+            columns = self.tickers.get_indexer(frame.index)
+            self.impact[row, columns] = frame['Impact Score'].to_numpy(np.float32)
+            self.probability[row, columns] = frame['Probability Score'].to_numpy(np.float32)
+            self.category[row, columns] = pd.Categorical(frame['Risk Category'], categories=CATEGORIAS).codes
+
+    def trails(self, tickers, days=None):
+        """
+        ScoreTrails de esos tickers en las últimas `days` fotos (todas si None)
+
+        Un ticker que no está en la historia queda sin datos (NaN / -1).
+        """
+        tickers = pd.Index(tickers, name='Ticker')
+        with self._lock:
+            start = 0 if days is None else max(len(self.dates) - days, 0)
+            columns = self.tickers.get_indexer(tickers)
+            missing = columns < 0
+
+            def take(matrix, fill):
+                values = matrix[start:, columns]
+                values[:, missing] = fill
+                return values
+
+            return ScoreTrails(self.dates[start:], tickers, take(self.impact, np.nan),
+                               take(self.probability, np.nan), take(self.category, -1))
+
+
+@st.cache_resource
+def get_risk_history(normalization='universe'):
+    """Historia de scores compartida por todas las sesiones (llamar a sync() antes de leerla)"""
+    return RiskHistory(normalization)
@@ -1,38 +1,204 @@
+from dataclasses import dataclass
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
+
+from util.finviz import get_finviz_snapshot
+
+# Factores de cada eje con su peso; 'Liquidity Ratio' = Average Volume / Volume
+IMPACT_FACTORS = {'Volatility (Month)': 0.4, 'Total Debt/Equity': 0.4, 'Market Cap': 0.2}
+PROBABILITY_FACTORS = {'Relative Strength Index (14)': 0.4, 'Liquidity Ratio': 0.3, 'Short Float': 0.3}
+
+# Por encima de este score el eje se considera alto (las líneas de cuadrante del gráfico)
+UMBRAL_RIESGO = 0.5
+
+# Categoría de cada cuadrante: alto impacto y probabilidad, solo impacto, solo probabilidad, ninguno
+CATEGORIAS = ("Alto riesgo", "Riesgo de impacto", "Riesgo de evento adverso", "Bajo riesgo")
+
+# Contra qué se normalizan los factores al puntuar el universo: todo el mercado o el sector del ticker
+NORMALIZACIONES = ('universe', 'sector')
+
+# Versiones del screener (filtros, descarga, normalización) con scores precalculados
+MAX_SNAPSHOTS = 8
+
+
+@dataclass
+class RiskScores:
+    """
+    Scores de la matriz de riesgo por ticker, compartidos por el gráfico y la tabla.
+
+    impact y probability están en [0, 1] (min-max sobre los tickers
+    evaluados); category es el cuadrante según UMBRAL_RIESGO.
+    """
+    index: pd.Index
+    impact: np.ndarray
+    probability: np.ndarray
+    category: np.ndarray
+
+    def select(self, tickers):
+        """Scores de un subconjunto de tickers, en ese orden (búsqueda en el índice, O(k))"""
+        positions = self.index.get_indexer(tickers)
+        if (positions < 0).any():
+            faltan = [t for t, p in zip(tickers, positions) if p < 0]
+            raise KeyError(f"Tickers sin score: {', '.join(map(str, faltan))}")
+        return RiskScores(self.index[positions], self.impact[positions], self.probability[positions],
+                          self.category[positions])
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'Impact Score': self.impact,
+            'Probability Score': self.probability,
+            'Risk Category': self.category,
+        }, index=self.index)
+
+
+def factor_matrix(df):
+    """Matriz (n_tickers, n_factores) con los factores de impacto y después los de probabilidad"""
+    columns = []
+    for name in (*IMPACT_FACTORS, *PROBABILITY_FACTORS):
+        if name == 'Liquidity Ratio':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                columns.append(df['Average Volume'].to_numpy(float) / df['Volume'].to_numpy(float))
+        else:
+            columns.append(df[name].to_numpy(float))
+    return np.column_stack(columns)
+
+
+def normalize_columns(X, groups=None):
+    """
+    Min-max de cada columna a [0, 1] en una pasada (una columna constante queda en 0, inf/NaN en NaN)
+
+    groups: etiqueta de grupo por fila (p. ej. el sector); si se indica, cada
+    fila se normaliza contra el mínimo y el máximo de su grupo.
+    """
+    X = np.where(np.isfinite(X), X, np.nan)
+    if not len(X):
+        return X
+    if groups is None:
+        lo = np.nanmin(X, axis=0)
+        span = np.nanmax(X, axis=0) - lo
+    else:
+        grouped = pd.DataFrame(X).groupby(np.asarray(groups), sort=False)
+        lo = grouped.transform('min').to_numpy()
+        span = grouped.transform('max').to_numpy() - lo
+    return (X - lo) / np.where(span > 0, span, np.inf)
+
+
+def categorize_risk(impact, probability, umbral=UMBRAL_RIESGO):
+    """Cuadrante de cada ticker (CATEGORIAS); un score desconocido (NaN) no cuenta como alto"""
+    high_impact = impact > umbral
+    high_probability = probability > umbral
+    return np.select(
+        [high_impact & high_probability, high_impact, high_probability],
+        CATEGORIAS[:3],
+        default=CATEGORIAS[3],
+    )
+
+
+def score_risk(df, groups=None):
+    """
+    Scores de impacto y probabilidad y categoría de todos los tickers de una vez
+
+    Todos los factores se normalizan juntos sobre una matriz NumPy y cada
+    score es el producto de su bloque de columnas por sus pesos. Sin groups
+    la normalización es contra los tickers de df (ver normalize_columns).
+
+    Returns:
+        RiskScores
+    """
+    normalized = normalize_columns(factor_matrix(df), groups)
+    n_impact = len(IMPACT_FACTORS)
+    impact = normalized[:, :n_impact] @ np.fromiter(IMPACT_FACTORS.values(), float)
+    probability = normalized[:, n_impact:] @ np.fromiter(PROBABILITY_FACTORS.values(), float)
+    return RiskScores(df.index, impact, probability, categorize_risk(impact, probability))
+
+
+def score_universe(df, normalization='universe'):
+    """
+    Scores de todo el screener, normalizados contra el universo completo o por sector
+
+    Así el score de un ticker no depende de qué otros tickers se estén
+    mirando: la selección se resuelve después con RiskScores.select.
+    """
+    if normalization not in NORMALIZACIONES:
+        raise ValueError(f"Normalización desconocida: {normalization}")
+    return score_risk(df, df['Sector'] if normalization == 'sector' else None)
+
+
+@st.cache_resource(max_entries=MAX_SNAPSHOTS, show_spinner=False)
+def _universe_scores(filtros, fetched_at, normalization, _df):
+    # fetched_at identifica la versión del screener: _df no se hashea
+    return score_universe(_df, normalization)
+
+
+def get_universe_scores(filtros='', normalization='universe', snapshot=None):
+    """
+    Scores precalculados del universo del screener para esos filtros
+
+    Se calculan una vez por descarga de Finviz (ScreenerCache.get_entry) y
+    se comparten entre sesiones hasta el siguiente refresco. No modificar.
+
+    Parámetros:
+    snapshot: (fetched_at, df) de get_finviz_snapshot ya leído por quien llama,
+        para que la tabla y los scores salgan de la misma versión del screener
+        aunque un refresco en segundo plano termine entre medias
+
+    Returns:
+        RiskScores: indexado por ticker
+    """
+    fetched_at, df = snapshot if snapshot is not None else get_finviz_snapshot(filtros)
+    return _universe_scores(filtros, fetched_at, normalization, df)
 
 
 def calculate_impact_score(df):
     """Calculate impact score based on volatility, leverage and market cap"""
-    # Normalize values between 0 and 1
-    volatility_norm = (df['Volatility (Month)'] - df['Volatility (Month)'].min()) / (df['Volatility (Month)'].max() - df['Volatility (Month)'].min())
-    leverage_norm = (df['Total Debt/Equity'] - df['Total Debt/Equity'].min()) / (df['Total Debt/Equity'].max() - df['Total Debt/Equity'].min())
-    mcap_norm = (df['Market Cap'] - df['Market Cap'].min()) / (df['Market Cap'].max() - df['Market Cap'].min())
-    
-    # Weighted average (adjust weights as needed)
-    impact_score = (0.4 * volatility_norm + 0.4 * leverage_norm + 0.2 * mcap_norm)
-    return impact_score
+    return pd.Series(score_risk(df).impact, index=df.index)
+
 
 def calculate_probability_score(df):
     """Calculate probability score based on RSI, liquidity ratio and short float"""
-    # Normalize values between 0 and 1
-    rsi_norm = (df['Relative Strength Index (14)'] - df['Relative Strength Index (14)'].min()) / (df['Relative Strength Index (14)'].max() - df['Relative Strength Index (14)'].min())
-    liquidity_ratio = df['Average Volume'] / df['Volume']
-    liquidity_norm = (liquidity_ratio - liquidity_ratio.min()) / (liquidity_ratio.max() - liquidity_ratio.min())
-    short_float_norm = (df['Short Float'] - df['Short Float'].min()) / (df['Short Float'].max() - df['Short Float'].min())
-    
-    # Weighted average (adjust weights as needed)
-    probability_score = (0.4 * rsi_norm + 0.3 * liquidity_norm + 0.3 * short_float_norm)
-    return probability_score
-
-def create_matrix(df):
-    """Create risk matrix visualization using plotly"""
-    impact_scores = calculate_impact_score(df)
-    probability_scores = calculate_probability_score(df)
+    return pd.Series(score_risk(df).probability, index=df.index)
+
+
+def create_matrix(df, scores=None, trails=None):
+    """
+    Create risk matrix visualization using plotly
+
+    scores: RiskScores ya calculados para df. trails: ScoreTrails de
+    util.risk_history para dibujar el recorrido de cada ticker y marcar los
+    que cambiaron de categoría desde la foto anterior.
+    """
+    import plotly.graph_objects as go
+
+    scores = scores if scores is not None else score_risk(df)
+    impact_scores = scores.impact
+    probability_scores = scores.probability
     
     fig = go.Figure()
+
+    if trails is not None and len(trails.dates) > 1:
+        # Todas las trayectorias en una sola traza, separadas por NaN
+        gap = np.full((1, len(trails.tickers)), np.nan)
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([trails.probability, gap]).ravel(order='F'),
+            y=np.concatenate([trails.impact, gap]).ravel(order='F'),
+            mode='lines',
+            line=dict(color='gray', width=1),
+            opacity=0.5,
+            hoverinfo='skip',
+        ))
+        changes = trails.category_changes()
+        if len(changes):
+            changed = scores.select(changes.index)
+            fig.add_trace(go.Scatter(
+                x=changed.probability,
+                y=changed.impact,
+                mode='markers',
+                marker=dict(size=18, color='rgba(0,0,0,0)', line=dict(color='red', width=2)),
+                text=changes.index + ": " + changes['Antes'] + " → " + changes['Ahora'],
+                hovertemplate="%{text}<extra></extra>",
+            ))
     
     # Add scatter plot
     fig.add_trace(go.Scatter(
@@ -55,8 +221,8 @@ def create_matrix(df):
     ))
     
     # Add quadrant lines
-    fig.add_hline(y=0.5, line_dash="dash", line_color="gray")
-    fig.add_vline(x=0.5, line_dash="dash", line_color="gray")
+    fig.add_hline(y=UMBRAL_RIESGO, line_dash="dash", line_color="gray")
+    fig.add_vline(x=UMBRAL_RIESGO, line_dash="dash", line_color="gray")
     
     # Update layout
     fig.update_layout(
@@ -0,0 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from util.portfolio import PositionArrays, revalue
+
+# Columnas de la matriz de escenarios
+SHOCKS = ('spot', 'vol', 'rate')
+
+# Escenarios por bloque: cada bloque que termina se devuelve al momento
+CHUNK_SCENARIOS = 64
+
+# Filas de la matriz de posiciones en memoria compartida (los campos numéricos de PositionArrays)
+CAMPOS_POSICION = tuple(f.name for f in fields(PositionArrays) if f.name != 'underlyings')
+
+
+def scenario_grid(spot_shocks=(0.0,), vol_shocks=(0.0,), rate_shocks=(0.0,)):
+    """
+    Producto cartesiano de shocks: matriz (n_escenarios, 3) con columnas SHOCKS
+
+    spot: retorno simple del subyacente (-0.1 = cae un 10%), el mismo para
+    todos los subyacentes. vol y rate: cambios aditivos (0.05 = +5 puntos).
+    Las filas van en orden spot x vol x rate (rate varía más rápido), así
+    que el P&L se puede reordenar con reshape(n_spot, n_vol, n_rate).
+    """
+    spot, vol, rate = np.meshgrid(spot_shocks, vol_shocks, rate_shocks, indexing='ij')
+    return np.column_stack([spot.ravel(), vol.ravel(), rate.ravel()]).astype(float)
+
+
+def revalue_scenarios(arrays, scenarios, horizon=0.0):
+    """
+    P&L de la cartera bajo cada fila de `scenarios` (ver scenario_grid)
+
+    La volatilidad que quede negativa tras el shock se trata como 0.
+    """
+    scenarios = np.atleast_2d(scenarios)
+    spot_returns = np.repeat(np.log1p(scenarios[:, :1]), len(arrays.underlyings), axis=1)
+    return revalue(arrays, spot_returns, scenarios[:, 1], scenarios[:, 2], horizon)
+
+
+class SharedScenarioData:
+    """
+    Posiciones y escenarios copiados una vez a memoria compartida.
+
+    Los procesos del pool se conectan por nombre (attach_shared) y leen
+    vistas NumPy sobre esos bloques: ni las posiciones ni los escenarios se
+    serializan ni se copian por tarea. Usar como context manager para liberar
+    la memoria al terminar.
+    """
+
+    def __init__(self, arrays, scenarios):
+        positions = np.vstack([np.asarray(getattr(arrays, name), dtype=float) for name in CAMPOS_POSICION])
+        scenarios = np.ascontiguousarray(scenarios, dtype=float)
+        self._blocks = []
+        self.spec = {
+            'positions': self._share(positions),
+            'scenarios': self._share(scenarios),
+            'underlyings': arrays.underlyings,
+        }
+
+    def _share(self, array):
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        self._blocks.append(block)
+        return block.name, array.shape
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name, shape):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=float, buffer=block.buf)
+
+
+# Estado de cada proceso del pool: vistas sobre la memoria compartida
+_worker_state = {}
+
+
+def attach_shared(spec, horizon):
+    """Initializer del pool: conecta con los bloques compartidos y arma PositionArrays sobre ellos"""
+    pos_block, positions = _attach(*spec['positions'])
+    scen_block, scenarios = _attach(*spec['scenarios'])
+    columns = dict(zip(CAMPOS_POSICION, positions))  # una fila contigua por campo
+    columns['call'] = columns['call'] > 0.5
+    columns['underlying_idx'] = columns['underlying_idx'].astype(np.intp)
+    _worker_state.update(
+        blocks=(pos_block, scen_block),  # mantener vivas las referencias
+        arrays=PositionArrays(**columns, underlyings=spec['underlyings']),
+        scenarios=scenarios,
+        horizon=horizon,
+    )
+
+
+def _revalue_range(bounds):
+    start, stop = bounds
+    state = _worker_state
+    return start, stop, revalue_scenarios(state['arrays'], state['scenarios'][start:stop], state['horizon'])
+
+
+def stream_scenarios(arrays, scenarios, horizon=0.0, chunk_size=CHUNK_SCENARIOS, n_workers=1):
+    """
+    Revalora la cartera bajo cada escenario y va devolviendo los bloques
+
+    Genera tuplas (inicio, fin, pnl) a medida que termina cada bloque de
+    escenarios (con varios procesos, no necesariamente en orden), para
+    poder pintar resultados parciales. Con n_workers > 1 las posiciones y
+    los escenarios viven en memoria compartida (SharedScenarioData) y cada
+    tarea solo envía el rango de filas.
+    """
+    scenarios = np.atleast_2d(np.asarray(scenarios, dtype=float))
+    ranges = [(start, min(start + chunk_size, len(scenarios))) for start in range(0, len(scenarios), chunk_size)]
+
+    if n_workers <= 1:
+        for start, stop in ranges:
+            yield start, stop, revalue_scenarios(arrays, scenarios[start:stop], horizon)
+        return
+
+    with SharedScenarioData(arrays, scenarios) as shared:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=attach_shared,
+                                 initargs=(shared.spec, horizon)) as executor:
+            futures = [executor.submit(_revalue_range, bounds) for bounds in ranges]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def run_scenarios(arrays, scenarios, horizon=0.0, chunk_size=CHUNK_SCENARIOS, n_workers=1):
+    """P&L de todos los escenarios en orden, (n_escenarios,)"""
+    pnl = np.empty(len(np.atleast_2d(scenarios)))
+    for start, stop, chunk in stream_scenarios(arrays, scenarios, horizon, chunk_size, n_workers):
+        pnl[start:stop] = chunk
+    return pnl
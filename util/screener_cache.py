@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenerCache:
+    """
+    Caché de resultados del screener indexada por el string de filtros.
+
+    - TTL: pasado `ttl` segundos una entrada se considera vieja.
+    - Stale-while-revalidate: una entrada vieja se sigue devolviendo al
+      instante mientras un hilo en segundo plano la vuelve a descargar.
+    - LRU: se guardan como máximo `max_entries` conjuntos de filtros.
+
+    Solo bloquea la primera vez que se piden unos filtros (no hay nada que
+    devolver todavía). Los DataFrames se comparten entre sesiones, así que
+    quien los use no debe modificarlos in-place.
+    """
+
+    def __init__(self, loader, ttl=900, max_entries=8, clock=time.monotonic):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # filtros -> (fetched_at, df)
+        self._lock = threading.Lock()
+        self._loading_locks = {}
+        self._refreshing = set()
+        self.last_error = None
+
+    def get(self, filtros):
+        return self.get_entry(filtros)[1]
+
+    def get_entry(self, filtros):
+        """
+        Como get, pero devuelve (fetched_at, df) de la misma versión.
+
+        fetched_at identifica la descarga: sirve de clave para memoizar
+        cálculos derivados del screener hasta el siguiente refresco.
+        """
+        with self._lock:
+            entry = self._entries.get(filtros)
+            if entry is not None:
+                self._entries.move_to_end(filtros)
+                if self._is_stale(entry):
+                    self._start_refresh(filtros)
+                return entry
+            loading_lock = self._loading_locks.setdefault(filtros, threading.Lock())
+
+        # Primera carga: bloqueante, una sola descarga aunque lleguen varias sesiones a la vez
+        with loading_lock:
+            with self._lock:
+                entry = self._entries.get(filtros)
+            if entry is not None:
+                return entry
+            df = self._loader(filtros)
+            return self._store(filtros, df)
+
+    def peek(self, filtros):
+        """(fetched_at, df) si ya hay una versión de esos filtros, o None; nunca descarga ni espera"""
+        with self._lock:
+            return self._entries.get(filtros)
+
+    def seed(self, filtros, df, age=None):
+        """
+        Carga una versión previa (p. ej. leída de disco) si aún no hay ninguna
+
+        age: segundos desde que se descargó. Si ya pasó el TTL (o no se sabe),
+        la primera lectura la devuelve al instante y la refresca en segundo plano.
+
+        Returns:
+            bool: True si se usó
+        """
+        age = self.ttl if age is None else max(age, 0.0)
+        with self._lock:
+            if filtros in self._entries:
+                return False
+            self._put(filtros, (self._clock() - age, df))
+            return True
+
+    def fetched_at(self, filtros):
+        """Momento (según `clock`) de la última descarga de esos filtros, o None"""
+        with self._lock:
+            entry = self._entries.get(filtros)
+            return entry[0] if entry is not None else None
+
+    def invalidate(self, filtros=None):
+        """Elimina una entrada, o todas si no se indican filtros"""
+        with self._lock:
+            if filtros is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(filtros, None)
+
+    def _is_stale(self, entry):
+        return self._clock() - entry[0] >= self.ttl
+
+    def _start_refresh(self, filtros):
+        # Llamar con self._lock tomado
+        if filtros in self._refreshing:
+            return
+        self._refreshing.add(filtros)
+        thread = threading.Thread(
+            target=self._refresh, args=(filtros,), name=f"screener-refresh-{filtros or 'all'}", daemon=True
+        )
+        thread.start()
+
+    def _refresh(self, filtros):
+        try:
+            df = self._loader(filtros)
+        except Exception as e:
+            # Se sigue sirviendo la versión anterior; se reintenta en la próxima lectura
+            self.last_error = e
+            logger.warning("Error al refrescar el screener (%r): %s", filtros, e)
+        else:
+            self._store(filtros, df)
+        finally:
+            with self._lock:
+                self._refreshing.discard(filtros)
+
+    def _put(self, filtros, entry):
+        # Llamar con self._lock tomado
+        self._entries[filtros] = entry
+        self._entries.move_to_end(filtros)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._loading_locks.pop(evicted, None)
+        return entry
+
+    def _store(self, filtros, df):
+        with self._lock:
+            return self._put(filtros, (self._clock(), df))
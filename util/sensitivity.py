@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from util.greeks import bs_greeks
+from util.lattice import lattice_price
+from util.pricing import black_scholes
+
+# Ejes de la malla: precio del subyacente, volatilidad y plazo (años)
+AXES = ('S', 'sigma', 'T')
+N_POINTS = 200
+
+# Límites fijos de los ejes de volatilidad y plazo (cubren los sliders de la calculadora)
+SIGMA_BOUNDS = (0.01, 1.5)
+T_BOUNDS = (1 / 365, 2.0)
+
+# Cortes memorizados por eje y mallas distintas que se conservan
+MAX_SLICES = 64
+MAX_GRIDS = 16
+
+# Pasos del árbol para las curvas de ejercicio americano
+LATTICE_STEPS = 200
+
+
+def price_bounds(S, K):
+    """
+    Límites del eje de precio: 50%-150% del strike, ampliados si S cae fuera.
+
+    No dependen de S mientras S esté dentro de ese rango, así que mover el
+    precio no invalida la malla.
+    """
+    lo = min(0.5 * K, 0.7 * S)
+    hi = max(1.5 * K, 1.3 * S)
+    return (lo, max(hi, lo + 1.0))
+
+
+def sensitivity_bounds(S, K):
+    """Límites de los tres ejes, en el orden de AXES"""
+    return (price_bounds(S, K), SIGMA_BOUNDS, T_BOUNDS)
+
+
+class SensitivityGrid:
+    """
+    Precio y griegos sobre los ejes de precio, volatilidad y plazo para un
+    (K, r, tipo de opción, estilo de ejercicio, límites) fijos.
+
+    Cada curva es un corte a lo largo de un eje con los otros dos fijos en
+    los valores actuales, y se memoriza por esos dos valores: la curva de
+    precio depende de (sigma, T), la de volatilidad de (S, T) y la de plazo
+    de (S, sigma). Al mover un slider solo se recalculan los cortes que
+    dependen de él, y cambiar de curva no valora nada nuevo.
+
+    Los cortes europeos llevan precio y griegos de util.greeks (unidades
+    crudas); los americanos solo el precio del árbol.
+    """
+
+    def __init__(self, K, r, option_type, bounds, american=False, n_points=N_POINTS, max_slices=MAX_SLICES):
+        self.K = K
+        self.r = r
+        self.option_type = option_type
+        self.american = american
+        self.axes = {axis: np.linspace(lo, hi, n_points) for axis, (lo, hi) in zip(AXES, bounds)}
+        self.max_slices = max_slices
+        self._slices = {axis: OrderedDict() for axis in AXES}
+        self._lock = threading.Lock()
+        self.computed = 0  # cortes valorados desde que se creó la malla
+
+    def _compute(self, axis, S, sigma, T):
+        point = {'S': S, 'sigma': sigma, 'T': T}
+        point[axis] = self.axes[axis]
+        if self.american:
+            price = lattice_price(point['S'], self.K, point['T'], self.r, point['sigma'], self.option_type,
+                                  steps=LATTICE_STEPS)
+            return {'price': np.broadcast_to(price, self.axes[axis].shape)}
+        greeks = bs_greeks(point['S'], self.K, point['T'], self.r, point['sigma'], self.option_type)
+        return {name: np.broadcast_to(value, self.axes[axis].shape) for name, value in greeks.items()}
+
+    def slice(self, axis, S, sigma, T):
+        """Curva a lo largo de `axis` con los otros dos parámetros fijos: dict nombre -> array"""
+        fixed = tuple(value for name, value in zip(AXES, (S, sigma, T)) if name != axis)
+        slices = self._slices[axis]
+        with self._lock:
+            curve = slices.get(fixed)
+            if curve is not None:
+                slices.move_to_end(fixed)
+                return curve
+
+        curve = self._compute(axis, S, sigma, T)
+        with self._lock:
+            self.computed += 1
+            slices[fixed] = curve
+            slices.move_to_end(fixed)
+            while len(slices) > self.max_slices:
+                slices.popitem(last=False)
+        return curve
+
+    def curves(self, S, sigma, T):
+        """Los tres cortes que pasan por (S, sigma, T): dict eje -> curva"""
+        return {axis: self.slice(axis, S, sigma, T) for axis in AXES}
+
+
+@st.cache_resource(max_entries=MAX_GRIDS)
+def get_sensitivity_grid(K, r, option_type, bounds, american=False):
+    """Malla compartida por todas las sesiones para esos (K, r, tipo, límites, estilo)"""
+    return SensitivityGrid(K, r, option_type, bounds, american)
+
+
+# Superficies 3D (precio del subyacente x factor): parámetro, límites, escala y título del eje
+SURFACE_FACTORS = {
+    'Volatilidad': ('sigma', 0.1, 0.5, 100, 'Volatilidad (%)'),
+    'Tiempo': ('T', 7 / 365, 1.0, 365, 'Días hasta vencimiento'),
+    'Tasa de Interés': ('r', 0.0, 0.10, 100, 'Tasa de interés (%)'),
+}
+# Valores de los parámetros que no varían en la superficie
+SURFACE_FIXED = {'sigma': 0.25, 'T': 0.25, 'r': 0.02}
+COARSE_POINTS = 40
+FINE_POINTS = 200
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def sensitivity_surface(factor, S, K, option_type, n_points=FINE_POINTS, fixed=None):
+    """
+    Precio de la opción sobre una malla (factor, precio del subyacente)
+
+    La malla entera (n_points x n_points) se valora en una sola llamada a
+    black_scholes y se cachea por parámetros. fixed: valores de sigma, T y r
+    que no varían (por defecto SURFACE_FIXED).
+
+    Returns:
+        tuple: (x, y, Z) con x los valores del factor, y los precios del
+        subyacente (70%-130% de S) y Z de forma (len(y), len(x))
+    """
+    param, lo, hi, _, _ = SURFACE_FACTORS[factor]
+    x = np.linspace(lo, hi, n_points)
+    y = np.linspace(S * 0.7, S * 1.3, n_points)
+    inputs = dict(SURFACE_FIXED, **(fixed or {}))
+    inputs[param] = x[None, :]
+    Z = black_scholes(y[:, None], K, inputs['T'], inputs['r'], inputs['sigma'], option_type)
+    return x, y, Z
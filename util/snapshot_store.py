@@ -0,0 +1,130 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Un directorio por día (date=YYYY-MM-DD) con el screener completo de ese día
+SNAPSHOT_DIR = "data/snapshots"
+ARCHIVO_SNAPSHOT = "snapshot.arrow"
+PREFIJO_PARTICION = "date="
+
+# Ratios que no necesitan doble precisión; Market Cap y los volúmenes se quedan en float64
+COLUMNAS_FLOAT32 = ('Volatility (Month)', 'Total Debt/Equity', 'Beta', 'Relative Strength Index (14)', 'Short Float',
+                    'Performance (Year)', 'Return on Assets', 'Return on Equity', 'Return on Investment')
+COLUMNAS_CATEGORIA = ('Sector',)
+
+
+def snapshot_path(date, root=SNAPSHOT_DIR):
+    return os.path.join(root, f"{PREFIJO_PARTICION}{pd.Timestamp(date):%Y-%m-%d}", ARCHIVO_SNAPSHOT)
+
+
+def compact_frame(df):
+    """El screener con tipos compactos: Sector categórico y ratios en float32"""
+    tipos = {col: 'float32' for col in COLUMNAS_FLOAT32 if col in df.columns}
+    tipos.update({col: 'category' for col in COLUMNAS_CATEGORIA if col in df.columns})
+    return df.astype(tipos)
+
+
+def write_snapshot(df, date=None, root=SNAPSHOT_DIR):
+    """
+    Guarda el screener (get_finviz_dataframe) como la foto del día
+
+    Arrow IPC sin comprimir, para poder leerlo con memory map sin copiar.
+    Una segunda descarga el mismo día reemplaza la foto de ese día; el
+    reemplazo es atómico (quien lea ve la versión vieja o la nueva entera).
+
+    Returns:
+        str: ruta del archivo escrito
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    path = snapshot_path(date if date is not None else pd.Timestamp.today(), root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(compact_frame(df).rename_axis('Ticker').reset_index(), preserve_index=False)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, path)
+    return path
+
+
+def write_snapshot_async(df, date=None, root=SNAPSHOT_DIR):
+    """write_snapshot en un hilo en segundo plano; devuelve el hilo (ya iniciado)"""
+    thread = threading.Thread(target=write_snapshot, args=(df, date, root), name="finviz-snapshot-store", daemon=True)
+    thread.start()
+    return thread
+
+
+def list_snapshots(root=SNAPSHOT_DIR):
+    """Fechas con foto guardada, de la más antigua a la más reciente"""
+    if not os.path.isdir(root):
+        return []
+    fechas = [
+        pd.Timestamp(name[len(PREFIJO_PARTICION):])
+        for name in os.listdir(root)
+        if name.startswith(PREFIJO_PARTICION) and os.path.exists(os.path.join(root, name, ARCHIVO_SNAPSHOT))
+    ]
+    return sorted(fechas)
+
+
+def _read_table(path, columns=None, tickers=None):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+
+    # memory map: solo se tocan las páginas de las columnas pedidas
+    table = feather.read_table(path, columns=None if columns is None else ['Ticker', *columns], memory_map=True)
+    if tickers is not None:
+        table = table.filter(pc.is_in(table['Ticker'], value_set=pa.array(list(tickers), pa.string())))
+    return table
+
+
+def read_snapshot(date=None, columns=None, tickers=None, root=SNAPSHOT_DIR):
+    """
+    Lee una foto del screener (la más reciente si no se indica fecha)
+
+    Parámetros:
+    columns: Columnas a leer (además de Ticker); None lee todas
+    tickers: Filtra esos tickers antes de pasar a pandas
+
+    Returns:
+        pd.DataFrame: indexado por Ticker, como get_finviz_dataframe pero con tipos compactos
+    """
+    if date is None:
+        fechas = list_snapshots(root)
+        if not fechas:
+            raise FileNotFoundError(f"No hay fotos del screener en {root}")
+        date = fechas[-1]
+    table = _read_table(snapshot_path(date, root), columns, tickers)
+    return table.to_pandas().set_index('Ticker')
+
+
+def factor_history(columns, tickers=None, start=None, end=None, root=SNAPSHOT_DIR):
+    """
+    Serie temporal de factores del screener a lo largo de las fotos guardadas
+
+    De cada partición solo se leen Ticker y `columns`.
+
+    Parámetros:
+    columns: Columna o lista de columnas (p. ej. 'Short Float', ['Beta', 'Short Float'])
+    tickers: Limitar a esos tickers
+    start, end: Rango de fechas (incluido)
+
+    Returns:
+        pd.DataFrame: indexado por (date, Ticker); con .unstack() queda fechas x tickers
+    """
+    import pyarrow as pa
+
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    fechas = [f for f in list_snapshots(root)
+              if (start is None or f >= pd.Timestamp(start)) and (end is None or f <= pd.Timestamp(end))]
+    tablas = []
+    for fecha in fechas:
+        table = _read_table(snapshot_path(fecha, root), columns, tickers)
+        tablas.append(table.append_column('date', pa.array(np.full(table.num_rows, np.datetime64(fecha, 'ns')))))
+    if not tablas:
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=['date', 'Ticker']))
+    # Las categorías de Sector pueden cambiar entre días: se unifican al concatenar
+    history = pa.concat_tables(tablas, promote_options='permissive').unify_dictionaries()
+    return history.to_pandas().set_index(['date', 'Ticker'])[columns]
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from util.pricing import black_scholes
+
+SIDES = {'long': 1.0, 'short': -1.0}
+
+# Puntos de la malla para estrategias con varios vencimientos (sin solución cerrada)
+N_NUMERIC = 20_001
+
+
+@dataclass(frozen=True)
+class Leg:
+    """
+    Una pata de la estrategia.
+
+    option_type: 'call' o 'put'
+    side: 'long' (comprada) o 'short' (vendida)
+    strike: Precio de ejercicio
+    quantity: Número de contratos (positivo)
+    expiry: Tiempo hasta vencimiento (en años)
+    premium: Prima por contrato, pagada si es long y cobrada si es short
+    """
+    option_type: str
+    side: str
+    strike: float
+    quantity: float = 1.0
+    expiry: float = 0.25
+    premium: float = 0.0
+
+
+@dataclass(frozen=True)
+class LegMatrix:
+    """Las patas como columnas de arrays (1, n_patas), listas para hacer broadcast contra precios"""
+    call: np.ndarray
+    weight: np.ndarray   # +cantidad si es long, -cantidad si es short
+    strike: np.ndarray
+    expiry: np.ndarray
+    premium: np.ndarray
+
+    @classmethod
+    def from_legs(cls, legs):
+        if not legs:
+            raise ValueError("La estrategia necesita al menos una pata")
+        for leg in legs:
+            if leg.side not in SIDES:
+                raise ValueError(f"Lado desconocido: {leg.side}")
+        row = lambda values, dtype=float: np.asarray(values, dtype=dtype)[None, :]
+        return cls(
+            call=row([leg.option_type.lower() == 'call' for leg in legs], bool),
+            weight=row([SIDES[leg.side] * leg.quantity for leg in legs]),
+            strike=row([leg.strike for leg in legs]),
+            expiry=row([leg.expiry for leg in legs]),
+            premium=row([leg.premium for leg in legs]),
+        )
+
+
+@dataclass
+class StrategyAnalysis:
+    """
+    Puntos de equilibrio y resultado extremo de la estrategia al primer vencimiento.
+
+    max_profit / max_loss valen inf / -inf si no están acotados. analytic es
+    False si se calcularon numéricamente (estrategias con varios vencimientos).
+    """
+    breakevens: list
+    max_profit: float
+    max_loss: float
+    analytic: bool
+
+
+def strategy_pnl(legs, prices, horizon=0.0, r=0.0, sigma=0.2):
+    """
+    P&L de la estrategia para cada precio del subyacente tras `horizon` años
+
+    Las patas ya vencidas valen su valor intrínseco y el resto se valoran con
+    Black-Scholes (mark-to-model) con el plazo que les quede. Toda la matriz
+    precios x patas se valora en una sola llamada.
+
+    Parámetros:
+    legs: Lista de Leg (o LegMatrix)
+    prices: Precios del subyacente
+    horizon: Tiempo transcurrido desde hoy (en años)
+    r, sigma: Tasa y volatilidad para las patas que siguen vivas
+
+    Returns:
+        np.ndarray: P&L con la forma de `prices`
+    """
+    m = legs if isinstance(legs, LegMatrix) else LegMatrix.from_legs(legs)
+    prices = np.asarray(prices, dtype=float)
+    value = black_scholes(prices.reshape(-1, 1), m.strike, m.expiry - horizon, r, sigma, m.call)
+    pnl = (np.atleast_2d(value) - m.premium) @ m.weight.ravel()
+    return pnl.reshape(prices.shape)
+
+
+def expiry_pnl(legs, prices, r=0.0, sigma=0.2):
+    """P&L al primer vencimiento de la estrategia (con una sola fecha, el payoff al vencimiento)"""
+    m = legs if isinstance(legs, LegMatrix) else LegMatrix.from_legs(legs)
+    return strategy_pnl(m, prices, float(m.expiry.min()), r, sigma)
+
+
+def _roots(x, y):
+    """Cruces por cero de una poligonal (x, y), interpolando linealmente"""
+    roots = list(x[y == 0])
+    change = np.flatnonzero(np.sign(y[:-1]) * np.sign(y[1:]) < 0)
+    roots += list(x[change] - y[change] * (x[change + 1] - x[change]) / (y[change + 1] - y[change]))
+    return sorted(float(v) for v in roots)
+
+
+def analyze_strategy(legs, r=0.0, sigma=0.2):
+    """
+    Puntos de equilibrio, beneficio máximo y pérdida máxima al primer vencimiento
+
+    Si todas las patas vencen a la vez el P&L es lineal a trozos con
+    quiebres en los strikes, así que basta evaluarlo en 0 y en cada strike y
+    conocer la pendiente final (calls long - calls short): los extremos están
+    en los quiebres o son infinitos, y los equilibrios son las raíces de cada
+    tramo. Con varios vencimientos (calendarios) las patas vivas tienen valor
+    temporal y se evalúa una malla densa hasta 4 veces el strike mayor.
+
+    Returns:
+        StrategyAnalysis
+    """
+    m = legs if isinstance(legs, LegMatrix) else LegMatrix.from_legs(legs)
+    single_expiry = np.all(m.expiry == m.expiry.min())
+
+    if single_expiry:
+        kinks = np.unique(np.concatenate([[0.0], m.strike.ravel()]))
+        values = expiry_pnl(m, kinks, r, sigma)
+        slope = float(m.weight[m.call].sum())  # pendiente a la derecha del último strike
+        breakevens = _roots(kinks, values)
+        # Último tramo, de kinks[-1] a infinito
+        if slope * values[-1] < 0:
+            breakevens.append(float(kinks[-1] - values[-1] / slope))
+        max_profit = np.inf if slope > 0 else float(values.max())
+        max_loss = -np.inf if slope < 0 else float(values.min())
+        return StrategyAnalysis(breakevens, max_profit, max_loss, analytic=True)
+
+    x = np.linspace(0.0, 4 * float(m.strike.max()), N_NUMERIC)
+    y = expiry_pnl(m, x, r, sigma)
+    # Pendiente al final de la malla: las patas vivas se comportan ya como lineales
+    slope = (y[-1] - y[-2]) / (x[-1] - x[-2])
+    max_profit = np.inf if slope > 1e-6 else float(y.max())
+    max_loss = -np.inf if slope < -1e-6 else float(y.min())
+    return StrategyAnalysis(_roots(x, y), max_profit, max_loss, analytic=False)
+
+
+def price_legs(legs, S, r=0.0, sigma=0.2):
+    """Devuelve las patas con la prima teórica de Black-Scholes a día de hoy"""
+    m = LegMatrix.from_legs(legs)
+    premiums = np.atleast_1d(black_scholes(S, m.strike.ravel(), m.expiry.ravel(), r, sigma, m.call.ravel()))
+    return [Leg(leg.option_type, leg.side, leg.strike, leg.quantity, leg.expiry, float(p))
+            for leg, p in zip(legs, premiums)]
+
+
+def preset_legs(strategy, strike, width, expiry):
+    """
+    Patas de las estrategias predefinidas (sin prima; ver price_legs)
+
+    strike es el strike central y width la distancia entre strikes. Para el
+    calendario, la pata larga vence `expiry` años después de la corta.
+    """
+    low, high = strike - width, strike + width
+    presets = {
+        "Call Largo": [Leg('call', 'long', strike, expiry=expiry)],
+        "Put Largo": [Leg('put', 'long', strike, expiry=expiry)],
+        "Call Spread": [Leg('call', 'long', strike, expiry=expiry), Leg('call', 'short', high, expiry=expiry)],
+        "Put Spread": [Leg('put', 'long', strike, expiry=expiry), Leg('put', 'short', low, expiry=expiry)],
+        "Straddle": [Leg('call', 'long', strike, expiry=expiry), Leg('put', 'long', strike, expiry=expiry)],
+        "Strangle": [Leg('put', 'long', low, expiry=expiry), Leg('call', 'long', high, expiry=expiry)],
+        "Iron Condor": [
+            Leg('put', 'long', low - width, expiry=expiry),
+            Leg('put', 'short', low, expiry=expiry),
+            Leg('call', 'short', high, expiry=expiry),
+            Leg('call', 'long', high + width, expiry=expiry),
+        ],
+        "Mariposa": [
+            Leg('call', 'long', low, expiry=expiry),
+            Leg('call', 'short', strike, quantity=2, expiry=expiry),
+            Leg('call', 'long', high, expiry=expiry),
+        ],
+        "Calendar Spread": [
+            Leg('call', 'short', strike, expiry=expiry),
+            Leg('call', 'long', strike, expiry=2 * expiry),
+        ],
+        "Ratio Spread": [
+            Leg('call', 'long', strike, expiry=expiry),
+            Leg('call', 'short', high, quantity=2, expiry=expiry),
+        ],
+    }
+    return presets[strategy]
+
+
+STRATEGIES = (
+    "Call Largo", "Put Largo", "Call Spread", "Put Spread", "Straddle", "Strangle",
+    "Iron Condor", "Mariposa", "Calendar Spread", "Ratio Spread",
+)
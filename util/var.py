@@ -0,0 +1,226 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from util.portfolio import revalue
+
+METHODS = ('parametric', 'historical', 'monte_carlo')
+
+# Caché de los históricos de precios (segundos)
+TTL_HISTORICOS = 24 * 60 * 60
+
+# Históricos grabados para trabajar sin conexión (ver benchmarks/generate_portfolio.py --history)
+HISTORY_FIXTURE = "data/fixtures/price_history_sample.csv"
+
+# Escenarios por bloque en la revaluación completa: memoria ~ CHUNK_SCENARIOS * n_posiciones * 8 bytes
+CHUNK_SCENARIOS = 1_000
+
+DIAS_HABILES = 252
+
+
+@dataclass
+class VaRResult:
+    """
+    VaR y Expected Shortfall de la cartera (pérdidas en positivo).
+
+    pnl: distribución de P&L simulada o histórica (None en el paramétrico)
+    """
+    method: str
+    confidence: float
+    horizon_days: int
+    var: float
+    es: float
+    pnl: np.ndarray = None
+    n_scenarios: int = 0
+    elapsed: float = 0.0
+
+
+@st.cache_data(ttl=TTL_HISTORICOS, show_spinner=False)
+def get_price_history(tickers, period="2y", offline=False):
+    """
+    Precios de cierre ajustados (fechas x tickers), cacheados por tickers y periodo
+
+    tickers: tupla de tickers. offline=True lee los históricos grabados de
+    HISTORY_FIXTURE en lugar de descargarlos de yfinance.
+    """
+    if offline:
+        prices = pd.read_csv(HISTORY_FIXTURE, index_col=0, parse_dates=True)
+    else:
+        import yfinance as yf  # Necesitas instalar esto: pip install yfinance
+
+        prices = yf.download(list(tickers), period=period, auto_adjust=True, progress=False)['Close']
+        if isinstance(prices, pd.Series):
+            prices = prices.to_frame(tickers[0])
+    faltan = [t for t in tickers if t not in prices.columns]
+    if faltan:
+        raise ValueError(f"Sin histórico de precios para: {', '.join(faltan)}")
+    return prices[list(tickers)].dropna()
+
+
+def log_returns(prices, horizon_days=1):
+    """Retornos logarítmicos a `horizon_days` días (ventanas solapadas), (n_fechas, n_tickers)"""
+    log_prices = np.log(prices.to_numpy(float))
+    return log_prices[horizon_days:] - log_prices[:-horizon_days]
+
+
+def _tail(pnl, confidence):
+    """VaR y ES empíricos de una distribución de P&L"""
+    losses = -np.asarray(pnl)
+    var = float(np.quantile(losses, confidence))
+    es = float(losses[losses >= var].mean())
+    return var, es
+
+
+def parametric_var(dollar_delta, dollar_gamma, cov, confidence=0.99, horizon_days=1, dollar_theta=0.0):
+    """
+    VaR delta-gamma(-theta) con la expansión de Cornish-Fisher
+
+    El P&L se aproxima por Q = theta*t + d'x + x'Gx/2 con x ~ N(0, cov*h) los
+    retornos de los subyacentes a h días hábiles, d el delta en dólares y G
+    diagonal con la gamma en dólares (gamma * S^2) de cada subyacente. Los
+    tres primeros momentos de Q son exactos; el cuantil se corrige por
+    asimetría y el ES se obtiene integrando los cuantiles de la cola.
+
+    Parámetros:
+    dollar_delta: Delta en dólares por subyacente (delta * S * unidades)
+    dollar_gamma: Gamma en dólares por subyacente, por 1% (como Portfolio.by_underlying)
+    cov: Covarianza diaria de los retornos de los subyacentes
+    horizon_days: Horizonte en días hábiles
+    dollar_theta: Theta en dólares por día natural (total de la cartera)
+
+    Returns:
+        VaRResult
+    """
+    from scipy.stats import norm
+
+    start = time.perf_counter()
+    d = np.asarray(dollar_delta, dtype=float)
+    g = np.asarray(dollar_gamma, dtype=float) * 100  # gamma * S^2 * unidades
+    sigma = np.asarray(cov, dtype=float) * horizon_days
+
+    gs = g[:, None] * sigma  # G @ cov
+    mean = 0.5 * np.trace(gs) + float(np.sum(dollar_theta)) * horizon_days * 365 / DIAS_HABILES
+    var_q = d @ sigma @ d + 0.5 * np.trace(gs @ gs)
+    third = 3 * d @ sigma @ (g * (sigma @ d)) + np.trace(gs @ gs @ gs)
+    std = np.sqrt(max(var_q, 0.0))
+    skew = third / std**3 if std > 0 else 0.0
+
+    def loss_quantile(alpha):
+        # Cuantil de la cola izquierda del P&L, corregido por asimetría
+        z = norm.ppf(alpha)
+        return -(mean + std * (z + (z**2 - 1) * skew / 6))
+
+    alpha = 1 - confidence
+    tail = np.linspace(alpha / 200, alpha, 200)
+    var = float(loss_quantile(alpha))
+    es = float(np.mean(loss_quantile(tail)))
+    return VaRResult('parametric', confidence, horizon_days, var, es, elapsed=time.perf_counter() - start)
+
+
+# Estado de cada proceso del pool: se envía una vez con el initializer, no con cada bloque
+_worker_state = {}
+
+
+def _init_worker(arrays, chol, horizon_years):
+    _worker_state.update(arrays=arrays, chol=chol, horizon=horizon_years)
+
+
+def _revalue_chunk(spot_returns):
+    state = _worker_state
+    return revalue(state['arrays'], spot_returns, horizon=state['horizon'])
+
+
+def _simulate_chunk(task):
+    seed, n = task
+    state = _worker_state
+    z = np.random.default_rng(seed).standard_normal((n, state['chol'].shape[0]))
+    return revalue(state['arrays'], z @ state['chol'].T, horizon=state['horizon'])
+
+
+def _run(function, tasks, arrays, chol, horizon_years, n_workers):
+    """Ejecuta los bloques en este proceso o en un pool, en orden"""
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(arrays, chol, horizon_years)) as executor:
+            return np.concatenate(list(executor.map(function, tasks)))
+    _init_worker(arrays, chol, horizon_years)
+    try:
+        return np.concatenate([function(task) for task in tasks])
+    finally:
+        _worker_state.clear()
+
+
+def historical_var(arrays, returns, confidence=0.99, horizon_days=1, chunk_size=CHUNK_SCENARIOS, n_workers=1):
+    """
+    VaR por simulación histórica con revaluación completa (horizonte en días hábiles)
+
+    Cada fecha del histórico es un escenario: los retornos a h días de
+    todos los subyacentes a la vez (se conserva la correlación real) se
+    aplican a la cartera y se revaloran todas las posiciones.
+
+    Parámetros:
+    arrays: PositionArrays de la cartera
+    returns: Retornos logarítmicos a h días, (n_fechas, n_subyacentes) en el orden de arrays.underlyings
+
+    Returns:
+        VaRResult
+    """
+    start = time.perf_counter()
+    returns = np.asarray(returns, dtype=float)
+    tasks = [returns[i:i + chunk_size] for i in range(0, len(returns), chunk_size)]
+    pnl = _run(_revalue_chunk, tasks, arrays, None, horizon_days / DIAS_HABILES, n_workers)
+    var, es = _tail(pnl, confidence)
+    return VaRResult('historical', confidence, horizon_days, var, es, pnl, len(pnl), time.perf_counter() - start)
+
+
+def monte_carlo_var(arrays, cov, confidence=0.99, horizon_days=1, n_scenarios=10_000,
+                    chunk_size=CHUNK_SCENARIOS, n_workers=1, seed=None):
+    """
+    VaR Monte Carlo con revaluación completa
+
+    Los retornos a h días se simulan normales con la covarianza diaria * h
+    (Cholesky) bloque a bloque, así que la memoria depende de chunk_size y
+    no del número de escenarios. Cada bloque tiene su propia semilla
+    (SeedSequence.spawn): el resultado no depende de n_workers.
+
+    Returns:
+        VaRResult
+    """
+    start = time.perf_counter()
+    cov = np.asarray(cov, dtype=float) * horizon_days
+    # Pequeño jitter por si la covarianza no es estrictamente definida positiva
+    chol = np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12)
+    sizes = [chunk_size] * (n_scenarios // chunk_size) + ([n_scenarios % chunk_size] if n_scenarios % chunk_size else [])
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    pnl = _run(_simulate_chunk, tasks, arrays, chol, horizon_days / DIAS_HABILES, n_workers)
+    var, es = _tail(pnl, confidence)
+    return VaRResult('monte_carlo', confidence, horizon_days, var, es, pnl, len(pnl), time.perf_counter() - start)
+
+
+def portfolio_var(portfolio, method='parametric', confidence=0.99, horizon_days=1, n_scenarios=10_000,
+                  offline=False, n_workers=1, seed=None):
+    """
+    VaR y ES de una util.portfolio.Portfolio con cualquiera de los tres métodos
+
+    Los tres usan el mismo histórico (get_price_history): el paramétrico y
+    el Monte Carlo para estimar la covarianza diaria, el histórico como
+    escenarios.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido: {method}")
+    arrays = portfolio.arrays()
+    prices = get_price_history(arrays.underlyings, offline=offline)
+
+    if method == 'historical':
+        return historical_var(arrays, log_returns(prices, horizon_days), confidence, horizon_days, n_workers=n_workers)
+
+    cov = np.cov(log_returns(prices), rowvar=False).reshape(len(arrays.underlyings), -1)
+    if method == 'parametric':
+        by_underlying = portfolio.by_underlying().reindex(list(arrays.underlyings))
+        return parametric_var(by_underlying['dollar_delta'], by_underlying['dollar_gamma'], cov, confidence,
+                              horizon_days, by_underlying['dollar_theta'])
+    return monte_carlo_var(arrays, cov, confidence, horizon_days, n_scenarios, n_workers=n_workers, seed=seed)
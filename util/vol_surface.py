@@ -0,0 +1,254 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from util.implied_vol import implied_volatility
+
+# Caché de los ajustes SVI por ticker y vencimiento (segundos)
+TTL_SUPERFICIE = 60 * 60
+
+# Cadenas de ejemplo para trabajar sin conexión: grabadas de yfinance o sintéticas
+# (campo "source" del JSON; ver benchmarks/record_option_chain.py)
+FIXTURES_DIR = "data/fixtures"
+
+# Malla de la superficie precalculada: log-moneyness k = ln(K/F) y tiempo en años
+K_GRID = np.linspace(-1.0, 1.0, 201)
+N_T_GRID = 121
+
+
+class RecordedTicker:
+    """
+    Sustituto de yf.Ticker que lee una cadena de opciones de ejemplo en JSON.
+
+    Expone lo mismo que usa este módulo: `options` (vencimientos) y
+    `option_chain(expiry)` con `calls`, `puts` y `underlying`. `as_of` es la
+    fecha de la cadena, para que los plazos no dependan de hoy. `source` dice
+    de dónde sale: 'yfinance' (grabada) o 'synthetic-svi' (generada).
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self.ticker = data["ticker"]
+        self.source = data.get("source", "yfinance")
+        self.options = tuple(data["options"])
+        self.as_of = datetime.fromisoformat(data["recorded_at"])
+
+    @classmethod
+    def from_fixture(cls, ticker, fixtures_dir=FIXTURES_DIR):
+        with open(os.path.join(fixtures_dir, f"option_chain_{ticker.upper()}.json")) as f:
+            return cls(json.load(f))
+
+    def option_chain(self, expiry):
+        chain = self._data["chains"][expiry]
+        return SimpleNamespace(
+            calls=pd.DataFrame(chain["calls"]),
+            puts=pd.DataFrame(chain["puts"]),
+            underlying=chain["underlying"],
+        )
+
+
+@dataclass(frozen=True)
+class SVIParams:
+    """Parámetros SVI 'raw' de un vencimiento: w(k) = a + b(rho(k-m) + sqrt((k-m)^2 + sigma^2))"""
+    a: float
+    b: float
+    rho: float
+    m: float
+    sigma: float
+
+    def total_variance(self, k):
+        k = np.asarray(k, dtype=float)
+        return self.a + self.b * (self.rho * (k - self.m) + np.sqrt((k - self.m) ** 2 + self.sigma**2))
+
+
+@dataclass(frozen=True)
+class ExpiryFit:
+    """Ajuste de un vencimiento: plazo, spot y forward usados, parámetros y nº de cotizaciones"""
+    expiry: str
+    T: float
+    spot: float
+    forward: float
+    params: SVIParams
+    n_quotes: int
+    rmse: float
+
+
+def fixture_tickers(fixtures_dir=FIXTURES_DIR):
+    """Tickers con cadena de ejemplo en fixtures_dir"""
+    if not os.path.isdir(fixtures_dir):
+        return []
+    return sorted(name[len("option_chain_"):-len(".json")] for name in os.listdir(fixtures_dir)
+                  if name.startswith("option_chain_") and name.endswith(".json"))
+
+
+def get_chain_source(ticker, offline=False):
+    """yf.Ticker en vivo, o la cadena de ejemplo de data/fixtures si offline=True"""
+    if offline:
+        return RecordedTicker.from_fixture(ticker)
+    import yfinance as yf  # Necesitas instalar esto: pip install yfinance
+
+    return yf.Ticker(ticker)
+
+
+def _valuation_date(source):
+    return getattr(source, "as_of", None) or datetime.now(timezone.utc)
+
+
+def _year_fraction(expiry, as_of):
+    vencimiento = datetime.fromisoformat(expiry).replace(hour=20, tzinfo=timezone.utc)  # cierre NY
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    return (vencimiento - as_of).total_seconds() / (365 * 24 * 3600)
+
+
+def load_expiry_quotes(source, expiry, r=0.0):
+    """
+    Cotizaciones OTM de un vencimiento con su volatilidad implícita.
+
+    Se usan puts por debajo del forward y calls por encima (las ITM tienen
+    poco valor temporal y su implícita es ruidosa). El precio es el mid
+    bid/ask, o el último precio si no hay bid/ask.
+
+    Returns:
+        tuple: (DataFrame con strike, price, call, k, iv; spot; T)
+    """
+    chain = source.option_chain(expiry)
+    spot = float(chain.underlying.get("regularMarketPrice"))
+    T = _year_fraction(expiry, _valuation_date(source))
+    forward = spot * np.exp(r * T)
+
+    frames = []
+    for df, call in ((chain.calls, True), (chain.puts, False)):
+        if df is None or df.empty:
+            continue
+        bid, ask = df["bid"].to_numpy(float), df["ask"].to_numpy(float)
+        price = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, df["lastPrice"].to_numpy(float))
+        strike = df["strike"].to_numpy(float)
+        otm = strike >= forward if call else strike < forward
+        frames.append(pd.DataFrame({"strike": strike, "price": price, "call": call})[otm & (price > 0)])
+
+    quotes = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["strike", "price", "call"])
+    if T <= 0 or quotes.empty:
+        return quotes.assign(k=[], iv=[]), spot, T
+
+    iv = implied_volatility(quotes["price"].to_numpy(), spot, quotes["strike"].to_numpy(), T, r, quotes["call"].to_numpy(bool))
+    quotes["iv"] = np.where(iv.converged, iv.sigma, np.nan)
+    quotes["k"] = np.log(quotes["strike"] / forward)
+    quotes = quotes.dropna(subset=["iv"]).sort_values("strike", ignore_index=True)
+    return quotes, spot, T
+
+
+def fit_svi(k, total_variance):
+    """
+    Ajusta un slice SVI por mínimos cuadrados sobre la varianza total.
+
+    Con menos de 5 puntos devuelve una varianza plana (b = 0).
+    """
+    from scipy.optimize import least_squares
+
+    k = np.asarray(k, dtype=float)
+    w = np.asarray(total_variance, dtype=float)
+    if k.size < 5:
+        return SVIParams(a=float(np.mean(w)) if w.size else 0.0, b=0.0, rho=0.0, m=0.0, sigma=0.1)
+
+    def residuals(x):
+        return SVIParams(*x).total_variance(k) - w
+
+    w_min, w_max = float(w.min()), float(w.max())
+    x0 = [w_min, 0.1, -0.3, float(k[np.argmin(w)]), 0.1]
+    bounds = ([-w_max, 0.0, -0.999, -2.0, 1e-4], [w_max, 5.0, 0.999, 2.0, 5.0])
+    result = least_squares(residuals, x0, bounds=bounds)
+    return SVIParams(*map(float, result.x))
+
+
+@st.cache_data(ttl=TTL_SUPERFICIE, show_spinner=False)
+def get_expiries(ticker, offline=False):
+    return tuple(get_chain_source(ticker, offline).options)
+
+
+@st.cache_data(ttl=TTL_SUPERFICIE, show_spinner=False)
+def fit_expiry(ticker, expiry, offline=False, r=0.0):
+    """Descarga un vencimiento, resuelve sus implícitas y ajusta SVI (cacheado por ticker y vencimiento)"""
+    quotes, spot, T = load_expiry_quotes(get_chain_source(ticker, offline), expiry, r)
+    if T <= 0 or quotes.empty:
+        return None
+    w = quotes["iv"].to_numpy() ** 2 * T
+    params = fit_svi(quotes["k"].to_numpy(), w)
+    rmse = float(np.sqrt(np.mean((np.sqrt(params.total_variance(quotes["k"]) / T) - quotes["iv"]) ** 2)))
+    return ExpiryFit(expiry, T, spot, spot * float(np.exp(r * T)), params, len(quotes), rmse)
+
+
+class VolSurface:
+    """
+    Superficie de volatilidad implícita sobre (strike, vencimiento).
+
+    Entre vencimientos interpola linealmente la varianza total a
+    log-moneyness constante; antes del primero y después del último mantiene
+    la volatilidad del vencimiento más cercano. La superficie se precalcula
+    en una malla uniforme (K_GRID x N_T_GRID), así que `vol(K, T)` es una
+    interpolación bilineal con índices calculados aritméticamente: O(1) por
+    punto y vectorizada, lista para pasarla como sigma a black_scholes.
+    """
+
+    def __init__(self, fits, r=0.0):
+        if not fits:
+            raise ValueError("Se necesita al menos un vencimiento ajustado")
+        self.fits = sorted(fits, key=lambda f: f.T)
+        self.spot = self.fits[0].spot
+        self.r = r
+        self.k_grid = K_GRID
+        self.t_grid = np.linspace(0.0, self.fits[-1].T, N_T_GRID)
+        self.vol_grid = self._build_grid()
+
+    def _build_grid(self):
+        Ts = np.array([f.T for f in self.fits])
+        # Varianza total de cada vencimiento en la malla de k: (n_vencimientos, n_k)
+        w = np.maximum(np.stack([f.params.total_variance(self.k_grid) for f in self.fits]), 1e-10)
+        vols = np.sqrt(w / Ts[:, None])
+
+        t = np.maximum(self.t_grid, 1e-10)
+        idx = np.clip(np.searchsorted(Ts, t), 1, len(Ts) - 1) if len(Ts) > 1 else np.zeros(t.size, dtype=int)
+        if len(Ts) > 1:
+            T0, T1 = Ts[idx - 1], Ts[idx]
+            weight = np.clip((t - T0) / (T1 - T0), 0.0, 1.0)[:, None]
+            w_t = (1 - weight) * w[idx - 1] + weight * w[idx]
+            grid = np.sqrt(w_t / t[:, None])
+            grid[t <= Ts[0]] = vols[0]
+            grid[t >= Ts[-1]] = vols[-1]
+        else:
+            grid = np.repeat(vols, t.size, axis=0)
+        return grid  # (n_t, n_k)
+
+    def vol(self, K, T):
+        """Volatilidad implícita interpolada para strikes K y plazos T (en años)"""
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        k = np.log(K / (self.spot * np.exp(self.r * T)))
+
+        k_pos = (np.clip(k, self.k_grid[0], self.k_grid[-1]) - self.k_grid[0]) / (self.k_grid[1] - self.k_grid[0])
+        t_pos = np.clip(T, 0.0, self.t_grid[-1]) / (self.t_grid[1] - self.t_grid[0])
+        i_k = np.minimum(k_pos.astype(int), self.k_grid.size - 2)
+        i_t = np.minimum(t_pos.astype(int), self.t_grid.size - 2)
+        f_k, f_t = k_pos - i_k, t_pos - i_t
+
+        g = self.vol_grid
+        value = ((1 - f_t) * ((1 - f_k) * g[i_t, i_k] + f_k * g[i_t, i_k + 1])
+                 + f_t * ((1 - f_k) * g[i_t + 1, i_k] + f_k * g[i_t + 1, i_k + 1]))
+        return value[()] if value.ndim == 0 else value
+
+
+def build_vol_surface(ticker, max_expiries=8, offline=False, r=0.0):
+    """
+    Construye la superficie de un ticker a partir de su cadena de opciones.
+
+    Cada vencimiento se ajusta (y se cachea) por separado con fit_expiry, así
+    que en un rerun solo se recalcula lo que haya caducado.
+    """
+    expiries = get_expiries(ticker, offline)[:max_expiries]
+    fits = [fit for fit in (fit_expiry(ticker, expiry, offline, r) for expiry in expiries) if fit is not None]
+    return VolSurface(fits, r)